@@ -0,0 +1,200 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import hashlib
+import tempfile
+import subprocess
+
+
+# This script allows to run IUPred using a cache of the scores
+# previously computed. It is intended to be provided to SLiMProb
+# in place of the IUPred executable (iupath option), and it expects
+# to be called the same way IUPred is called by SLiMProb:
+#
+#     iupred_cache.py <fasta_file> <iumethod>
+#
+# The cache is a folder in which the output of IUPred is saved
+# for each sequence, in a file named after the hash of the sequence
+# (in a subfolder named after the IUPred method), i.e.
+#
+#     <cache_folder>/<iumethod>/<hash[:2]>/<hash>.txt
+#
+# When the scores of a sequence have already been computed with the
+# same method, they are read from the cache and IUPred is not run.
+# Otherwise IUPred is run and its output is registered in the cache.
+#
+# NB: The following environment variables are used:
+#     - IUPRED_CACHE_FOLDER: The path to the cache folder. If this
+#                            variable is not set, IUPred is run
+#                            without using any cache.
+#     - IUPRED_EXECUTABLE: The path to the IUPred executable
+#                          (/iupred/iupred by default).
+# NB: This script may be run with both Python 2 and Python 3.
+
+
+# ===========================================
+# Constants
+# ===========================================
+
+# Environment variables
+IUPRED_CACHE_FOLDER_VARIABLE = 'IUPRED_CACHE_FOLDER'
+IUPRED_EXECUTABLE_VARIABLE = 'IUPRED_EXECUTABLE'
+
+# Default path to the IUPred executable
+DEFAULT_IUPRED_EXECUTABLE = '/iupred/iupred'
+
+# Extension of the files of the cache
+CACHE_FILE_EXTENSION = '.txt'
+# Extension of the files being written in the cache
+CACHE_TMP_EXTENSION = '.tmp'
+
+
+
+# ===========================================
+# Script
+# ===========================================
+
+## get_fasta_sequence
+#  ------------------
+#
+# This function allows to get the sequence contained in the fasta
+# file provided to IUPred. As IUPred only process the first sequence
+# of the file, any other sequence is ignored.
+#
+# @param fasta_file: String - The path to the fasta file.
+#
+# @return sequence: String - The sequence (in upper case).
+#
+def get_fasta_sequence( fasta_file ):
+
+    sequence = []
+    header_nb = 0
+    with open( fasta_file, 'r' ) as fasta:
+        for line in fasta:
+            line = line.strip()
+            if line.startswith( '>' ):
+                header_nb += 1
+                if ( header_nb > 1 ):
+                    break
+            elif ( line != '' ):
+                sequence.append( line )
+
+    return ''.join( sequence ).upper()
+
+
+
+## get_cache_file_path
+#  -------------------
+#
+# This function allows to get the path of the file of the cache
+# containing the IUPred output for a sequence and a method.
+#
+# @param cache_folder: String - The path to the cache folder.
+# @param sequence: String - The sequence.
+# @param iumethod: String - The IUPred method (long / short / glob).
+#
+# @return cache_file: String - The path to the file of the cache.
+#
+def get_cache_file_path( cache_folder, sequence, iumethod ):
+
+    sequence_hash = hashlib.sha1( sequence.encode( 'utf-8' ) ).hexdigest()
+
+    return os.path.join( cache_folder, iumethod, sequence_hash[ :2 ], sequence_hash + CACHE_FILE_EXTENSION )
+
+
+
+## write_cache_file
+#  ----------------
+#
+# This function allows to register the output of IUPred in the cache.
+# The output is first written in a temporary file which is then renamed,
+# so that concurrent jobs never read an incomplete file.
+#
+# @param cache_file: String - The path to the file of the cache.
+# @param iupred_output: Bytes - The output of IUPred.
+#
+def write_cache_file( cache_file, iupred_output ):
+
+    cache_subfolder = os.path.dirname( cache_file )
+    if ( not os.path.isdir( cache_subfolder ) ):
+        try:
+            os.makedirs( cache_subfolder )
+        except OSError:
+            # The folder may have been created by an other job in the meantime
+            if ( not os.path.isdir( cache_subfolder ) ):
+                raise
+
+    ( tmp_file_descriptor, tmp_file ) = tempfile.mkstemp( suffix = CACHE_TMP_EXTENSION,
+                                                          dir = cache_subfolder )
+    with os.fdopen( tmp_file_descriptor, 'wb' ) as cache_tmp_file:
+        cache_tmp_file.write( iupred_output )
+    os.rename( tmp_file, cache_file )
+
+
+
+## run_iupred
+#  ----------
+#
+# This function allows to get the output of IUPred for the sequence
+# contained in the fasta file, either from the cache or by running IUPred.
+#
+# @param args: List - The arguments provided to IUPred (path to the fasta file,
+#                     IUPred method and eventual additional arguments).
+#
+# @return iupred_output: Bytes - The output of IUPred.
+# @return returncode: Integer - The exit code of IUPred.
+#
+def run_iupred( args ):
+
+    iupred_executable = os.environ.get( IUPRED_EXECUTABLE_VARIABLE, DEFAULT_IUPRED_EXECUTABLE )
+    cache_folder = os.environ.get( IUPRED_CACHE_FOLDER_VARIABLE )
+
+    # If no cache has been defined or if the arguments
+    # are unexpected, run IUPred directly
+    if ( ( not cache_folder ) or ( len( args ) != 2 ) ):
+        process = subprocess.Popen( [ iupred_executable ] + args, stdout = subprocess.PIPE )
+        iupred_output = process.communicate()[ 0 ]
+        return ( iupred_output, process.returncode )
+
+    ( fasta_file, iumethod ) = args
+    sequence = get_fasta_sequence( fasta_file )
+    cache_file = get_cache_file_path( cache_folder = cache_folder,
+                                      sequence = sequence,
+                                      iumethod = iumethod )
+
+    # Get the output from the cache if it exists
+    if os.path.exists( cache_file ):
+        with open( cache_file, 'rb' ) as cached_output:
+            return ( cached_output.read(), 0 )
+
+    # Otherwise, run IUPred and register its output
+    # in the cache if it completed successfully
+    process = subprocess.Popen( [ iupred_executable ] + args, stdout = subprocess.PIPE )
+    iupred_output = process.communicate()[ 0 ]
+    if ( ( process.returncode == 0 ) and ( iupred_output.strip() != b'' ) ):
+        try:
+            write_cache_file( cache_file = cache_file,
+                              iupred_output = iupred_output )
+        except ( IOError, OSError ) as e:
+            sys.stderr.write( 'WARNING :: The IUPred output could not be registered in the cache (' +
+                              cache_file + '): ' + str( e ) + '\n' )
+
+    return ( iupred_output, process.returncode )
+
+
+
+# ===========================================
+# Run script
+# ===========================================
+
+if __name__ == '__main__':
+
+    ( iupred_output, returncode ) = run_iupred( sys.argv[ 1: ] )
+
+    stdout = getattr( sys.stdout, 'buffer', sys.stdout )
+    stdout.write( iupred_output )
+    stdout.flush()
+
+    sys.exit( returncode )
@@ -2,18 +2,25 @@
 # -*- coding: utf-8 -*-
 
 import os
+import sys
+import re
+import signal
 import datetime
 import time
 import shutil
+import tempfile
 from optparse import OptionParser
 
 import subprocess
+import threading
 
 from multiprocessing import Pool
 
 
 # This script allows to run SLiMProb on all randomized sequences
 # of a particular strain on one particular background.
+# Alternatively, the occurrences of the motifs may be searched using
+# the ELM regular expressions directly (see the scanner option).
 
 # NB: In order to work properly, this script expects the appropriate number
 #     of randomized sequences files to have been generated properly.
@@ -24,9 +31,67 @@ from multiprocessing import Pool
 # ===========================================
 
 # Default option values
-DEFAULT_SLIMPROB_EXTRAS = '0'
-DEFAULT_SLIMPROB_PICKLE = 'F'
-DEFAULT_SLIMPROB_SAVESPACE = '2'
+# - Maximum duration of a SLiMProb run in seconds (0: no time limit)
+DEFAULT_SLIMPROB_TIMEOUT = 0
+# - Number of times a failed SLiMProb run is started again
+DEFAULT_SLIMPROB_RETRIES = 2
+
+# Prefix of the folder created in the scratch folder for each execution 
+# of the script (see the scratch option)
+SCRATCH_FOLDER_PREFIX = 'detect_slim_'
+# Extension of the files being copied back from the scratch folder
+COPY_TMP_EXTENSION = '.tmp'
+
+# Manifest of the randomizations processed
+# NB: The manifest is a tab-separated file to which one line is appended
+#     each time the processing of a randomization ends. When the same 
+#     randomization is registered several times, the last line prevails.
+MANIFEST_HEADER = [ 'Iteration', 'Status', 'Attempts', 'Duration', 'Date' ]
+STATUS_SUCCEEDED = 'succeeded'
+STATUS_FAILED = 'failed'
+
+# Number of randomizations processed between two progress messages
+PROGRESS_LOG_INTERVAL = 1000
+
+# Packed randomized sequences files
+# (see the randomize_sequence.py script for more information)
+PACKED_FASTA_SUFFIX = '_random.packed.fasta'
+PACKED_INDEX_EXTENSION = '.idx'
+
+# Tools that may be used to detect the motifs in the randomized sequences
+# - slimprob: SLiMProb is run on each randomized fasta file
+# - regex: The ELM regular expressions are compiled once and the (masked)
+#          sequences are scanned directly. The disorder masking of the 
+#          randomized sequences is not computed again.
+SCANNER_SLIMPROB = 'slimprob'
+SCANNER_REGEX = 'regex'
+DEFAULT_SCANNER = SCANNER_SLIMPROB
+
+# Character used to mask the ordered residues
+MASKED_RESIDUE = 'X'
+
+# Extensions of the SLiMProb output files
+SLIMPROB_RES_EXTENSION = '.tsv'
+SLIMPROB_OCC_EXTENSION = '.occ.tsv'
+
+# Headers of the files written by the regex scanner
+# NB: These columns are a subset of the ones written by SLiMProb
+SCANNER_OCC_HEADER = [ 'Dataset', 'Motif', 'Seq', 'Start_Pos', 'End_Pos', 'Prot_Len', 'Pattern', 'Match' ]
+# NB: The summary result file is written in place of the SLiMProb result 
+#     file by the regex scanner and when SLiMProb is run in batches
+SUMMARY_RES_HEADER = [ 'Dataset', 'Motif', 'Pattern', 'N_Seq', 'N_Occ' ]
+
+# Batches of randomizations
+# - Default number of randomizations processed by a single SLiMProb run
+DEFAULT_BATCH_SIZE = 1
+# - Tag added to the sequence names to identify the randomization they belong to
+#   (the name P1__A1 of the randomization 12 is renamed RND12_P1__A1)
+BATCH_TAG_PREFIX = 'RND'
+BATCH_TAG_SEPARATOR = '_'
+
+# List of the ELM motifs compiled by each process of the regex scanner
+# (see the init_regex_scanner() function)
+ELM_MOTIFS = []
 
 # List of options allowed
 # -----------------------
@@ -35,6 +100,8 @@ DEFAULT_SLIMPROB_SAVESPACE = '2'
 ELM_MOTIFS_PARSED_FILE_OPTION = 'ELM_MOTIFS_PARSED_FILE'
 # Pattern of the path to the randomized sequences
 RANDOMIZED_FASTA_FILE_PATTERN_OPTION = 'RANDOMIZED_FASTA_FILE_PATTERN'
+# Path to the packed randomized sequences
+PACKED_FASTA_FILE_OPTION = 'PACKED_FASTA_FILE'
 # Pattern of the path to the randomized sequence SLiMProb folder
 RANDOMIZED_SQCE_SLIMPROB_FOLDER_PATTERN_OPTION = 'RANDOMIZED_SQCE_SLIMPROB_FOLDER_PATTERN'
 # Pattern of the path to the occurence file
@@ -62,9 +129,25 @@ SLIMPROB_EXTRAS_OPTION = 'SLIMPROB_EXTRAS'
 SLIMPROB_PICKLE_OPTION = 'SLIMPROB_PICKLE'
 # - savespace 
 SLIMPROB_SAVESPACE_OPTION = 'SLIMPROB_SAVESPACE'
+# Tool to use to detect the motifs
+SCANNER_OPTION = 'SCANNER'
+# Number of randomizations processed by a single SLiMProb run
+BATCH_SIZE_OPTION = 'BATCH_SIZE'
+# Maximum duration of a SLiMProb run
+SLIMPROB_TIMEOUT_OPTION = 'SLIMPROB_TIMEOUT'
+# Number of times a failed SLiMProb run is started again
+SLIMPROB_RETRIES_OPTION = 'SLIMPROB_RETRIES'
+# Path to the manifest file
+MANIFEST_FILE_OPTION = 'MANIFEST_FILE'
+# Number of the first randomization to process
+FIRST_ITERATION_OPTION = 'FIRST_ITERATION'
+# Path to the scratch folder
+SCRATCH_FOLDER_OPTION = 'SCRATCH_FOLDER'
 
 OPTION_LIST = [ [ '-m', '--motifs', 'store', 'string', ELM_MOTIFS_PARSED_FILE_OPTION, None, 'The path to the ELM motifs parsed file.' ],
                 [ '-s', '--seqinPattern', 'store', 'string', RANDOMIZED_FASTA_FILE_PATTERN_OPTION, None, 'The pattern of the paths to the randomized sequences fasta files.' ], 
+                [ '-P', '--packedSeqin', 'store', 'string', PACKED_FASTA_FILE_OPTION, None, ( 'The path to the packed randomized sequences fasta file.' +
+                                                                                               ' When provided, the seqinPattern option is ignored.' ) ],
                 [ '-r', '--resdirPattern', 'store', 'string', RANDOMIZED_SQCE_SLIMPROB_FOLDER_PATTERN_OPTION, None, 'The pattern of the paths to the SLiMProb (temporary) folders.' ],
                 [ '-o', '--resfilePattern', 'store', 'string', OCCURENCE_FILE_PATTERN_OPTION, None, 'The pattern of the paths to the occurrence files.' ],
                 [ '-l', '--logPattern', 'store', 'string', LOG_FILE_PATTERN_OPTION, None, 'The pattern of the paths to the log files.' ],
@@ -75,9 +158,31 @@ OPTION_LIST = [ [ '-m', '--motifs', 'store', 'string', ELM_MOTIFS_PARSED_FILE_OP
                 [ '-g', '--minregion', 'store', 'string', SLIMPROB_MINREGION_OPTION, None, 'The minregion SLiMProb argument.' ],
                 [ '-e', '--iumethod', 'store', 'string', SLIMPROB_IUMETHOD_OPTION, None, 'The iumethod SLiMProb argument.' ],
                 [ '-u', '--iucut', 'store', 'string', SLIMPROB_IUCUT_OPTION, None, 'The iucut SLiMProb argument.' ],
-                [ '-x', '--extras', 'store', 'string', SLIMPROB_EXTRAS_OPTION, None, 'The extras SLiMProb argument.' ],
-                [ '-p', '--pickle', 'store', 'string', SLIMPROB_PICKLE_OPTION, None, 'The pickle SLiMProb argument.' ],
-                [ '-d', '--savespace', 'store', 'string', SLIMPROB_SAVESPACE_OPTION, None, 'The savespace SLiMProb argument.' ] ]
+                [ '-x', '--extras', 'store', 'string', SLIMPROB_EXTRAS_OPTION, None, 'The extras SLiMProb argument (optional, \
+                                                                                 only forwarded to SLiMProb when provided).' ],
+                [ '-p', '--pickle', 'store', 'string', SLIMPROB_PICKLE_OPTION, None, 'The pickle SLiMProb argument (optional, \
+                                                                                 only forwarded to SLiMProb when provided).' ],
+                [ '-d', '--savespace', 'store', 'string', SLIMPROB_SAVESPACE_OPTION, None, 'The savespace SLiMProb argument (optional, \
+                                                                                    only forwarded to SLiMProb when provided).' ],
+                [ '-c', '--scanner', 'store', 'string', SCANNER_OPTION, None, ( 'The tool to use to detect the motifs (' + SCANNER_SLIMPROB + 
+                                                                                 ': run SLiMProb on each file, ' + SCANNER_REGEX + ': scan the masked' +
+                                                                                 ' sequences with the ELM regular expressions). ' +
+                                                                                 DEFAULT_SCANNER + ' by default.' ) ],
+                [ '-b', '--batchSize', 'store', 'string', BATCH_SIZE_OPTION, None, ( 'The number of randomizations processed by a single SLiMProb run' +
+                                                                                      ' (' + str( DEFAULT_BATCH_SIZE ) + ' by default). The batches are' +
+                                                                                      ' reduced if necessary to comply with the maxseq and maxsize options.' ) ],
+                [ '-T', '--timeout', 'store', 'string', SLIMPROB_TIMEOUT_OPTION, None, ( 'The maximum duration of a SLiMProb run in seconds, after which' +
+                                                                                          ' it is killed and considered as failed (no limit by default).' ) ],
+                [ '-a', '--retries', 'store', 'string', SLIMPROB_RETRIES_OPTION, None, ( 'The number of times a failed SLiMProb run is started again (' +
+                                                                                          str( DEFAULT_SLIMPROB_RETRIES ) + ' by default).' ) ],
+                [ '-f', '--manifest', 'store', 'string', MANIFEST_FILE_OPTION, None, ( 'The path to the manifest file registering the status of each randomization.' +
+                                                                                        ' When provided, the randomizations registered as succeeded in this file are' +
+                                                                                        ' skipped, otherwise the randomizations for which the result file exists are skipped.' ) ],
+                [ '-F', '--firstIteration', 'store', 'string', FIRST_ITERATION_OPTION, None, ( 'The number of the first randomization to process (0 by default).' +
+                                                                                              ' This allows to split the randomizations between several jobs.' ) ],
+                [ '-w', '--scratch', 'store', 'string', SCRATCH_FOLDER_OPTION, None, ( 'The path to a (node-local) scratch folder (e.g. /tmp, $TMPDIR or /dev/shm).' +
+                                                                                      ' When provided, SLiMProb is run in this folder and only its result and' +
+                                                                                      ' occurrence files are copied in the output folder.' ) ] ]
 
 
 
@@ -94,61 +199,114 @@ OPTION_LIST = [ [ '-m', '--motifs', 'store', 'string', ELM_MOTIFS_PARSED_FILE_OP
 # @param elm_motifs_parsed_file: String - The path to the ELM parsed file.
 # @param randomized_fasta_file_pattern: String - The pattern of the randomized fasta file.
 #                                                This path must contain the {sqce_nb} string.
+#                                                Ignored if a packed fasta file is provided.
 # @param randomized_sqces_slimprob_folder_pattern: String - The pattern of the path to the SLiMProb output directory.
 #                                                           This path must contain the {sqce_nb} string.
 # @param randomized_sqces_res_file_pattern: String - The pattern of the path to the occurrence file generated
 #                                                    by SLiMProb. This path must contain the {sqce_nb} string.
 # @param randomized_sqces_log_file_pattern: String - The pattern of the path to the log file. 
 #                                                    This path must contain the {sqce_nb} string.
-# @param randomization_count: Integer (>0) - The number of randomization that have been performed.
+# @param randomization_count: Integer (>0) - The number of randomizations to process.
 # @param maxsize: Integer (>0) - The maxsize parameter for SliMProb (see SLiMProb documentation).
 # @param maxseq: Integer (>0) - The maxseq parameter for SliMProb (see SLiMProb documentation).
 # @param minregion: Integer (>0) - The minregion parameter for SliMProb (see SLiMProb documentation).
 # @param iumethod: String - The iumethod (long / short) parameter for SliMProb (see SLiMProb documentation).
 # @param iucut: Float - The iucut parameter for SliMProb (see SLiMProb documentation).
-# @param extras: Integer - Should SLiMProb generate additional output files (alignments etc.)? 0 by default.
+# @param extras: Integer - Should SLiMProb generate additional output files (alignments etc.)? 
+#                          None by default (the SLiMProb default is used).
 #                          - 0 = No output beyond main results file
 #                          - 1 = Saved masked input sequences [*.masked.fas]
 #                          - 2 = Generate additional outputs (alignments etc.)
 #                          - 3 = Additional distance matrices for input sequences
-# @param pickle: String - Should SLiMProb save pickles (T/F)? F by default.
-# @param savespace: Integer - Shoud SLiMProb delete the "unneccessary" files following run. 2 by default.
+# @param pickle: String - Should SLiMProb save pickles (T/F)? None by default (the SLiMProb default is used).
+# @param savespace: Integer - Shoud SLiMProb delete the "unneccessary" files following run. 
+#                             None by default (the SLiMProb default is used).
 #                          - 0 = Delete no files
 #                          - 1 = Delete all bar *.upc and *.pickle files
 #                          - 2 = Delete all dataset-specific files including *.upc and *.pickle (not *.tar.gz)
+# @param packed_fasta_file: String - The path to the packed fasta file containing all the randomized 
+#                                    sequences. None by default.
+# @param scanner: String - The tool to use to detect the motifs (slimprob / regex). slimprob by default.
+#                          When using the regex scanner, the SLiMProb options are ignored.
+# @param batch_size: Integer (>0) - The number of randomizations processed by a single SLiMProb run.
+#                                   1 by default. Ignored when using the regex scanner.
+# @param timeout: Integer - The maximum duration of a SLiMProb run in seconds (0: no time limit).
+# @param retries: Integer - The number of times a failed SLiMProb run is started again.
+# @param manifest_file: String - The path to the manifest file. None by default.
+# @param first_iteration: Integer - The number of the first randomization to process. 0 by default.
+# @param scratch_folder: String - The path to the scratch folder in which SLiMProb has to be run. 
+#                                 None by default (SLiMProb is run in the SLiMProb output directories).
+#
+# @return failed_iterations: List - The sorted list of the randomizations that failed.
 #
 def run_slimprob_multithread( elm_motifs_parsed_file, randomized_fasta_file_pattern, randomized_sqces_slimprob_folder_pattern, \
                               randomized_sqces_res_file_pattern, randomized_sqces_log_file_pattern, randomization_count, \
-                              thread_nb, maxsize, maxseq, minregion, iumethod, iucut, extras, pickle, savespace ):
+                              thread_nb, maxsize, maxseq, minregion, iumethod, iucut, extras, pickle, savespace, \
+                              packed_fasta_file = None, scanner = DEFAULT_SCANNER, batch_size = DEFAULT_BATCH_SIZE, \
+                              timeout = DEFAULT_SLIMPROB_TIMEOUT, retries = DEFAULT_SLIMPROB_RETRIES, manifest_file = None, \
+                              first_iteration = 0, scratch_folder = None ):
         
     # Instantiate the list of arguments
     run_slimprob_args = []
     
+    # Create a folder specific to this execution in the scratch folder
+    if scratch_folder:
+        if not os.path.isdir( scratch_folder ):
+            os.makedirs( scratch_folder )
+        scratch_folder = tempfile.mkdtemp( prefix = SCRATCH_FOLDER_PREFIX, dir = scratch_folder )
+    
+    # Define how the SLiMProb runs have to be monitored
+    run_policy = ( timeout, retries, scratch_folder )
+    
+    # Get the list of randomizations already processed successfully
+    if manifest_file:
+        succeeded_iterations = read_manifest( manifest_file )
+    
+    # If the randomized sequences have been packed in a single file,
+    # load the index of this file and get the name of the strain
+    if packed_fasta_file:
+        packed_index = read_packed_index( packed_fasta_file + PACKED_INDEX_EXTENSION )
+        strain = os.path.basename( packed_fasta_file )[ :-len( PACKED_FASTA_SUFFIX ) ]
+    
     # Define the SLiMProb arguments common to all processes
     slimprob_common_args = { '--motifs': elm_motifs_parsed_file,
                              '--maxsize': str( maxsize ),
                              '--maxseq': str( maxseq ),
                              '--minregion': str( minregion ),
                              '--iumethod': iumethod,
-                             '--iucut': str( iucut ),
-                             '--extras': str( extras ),
-                             '--pickle': pickle,
-                             '--savespace': str( savespace ) }
+                             '--iucut': str( iucut ) }
+    
+    # Forward the optional SLiMProb arguments only when they have been provided
+    for ( arg_name, arg_value ) in [ ( '--extras', extras ), ( '--pickle', pickle ), ( '--savespace', savespace ) ]:
+        if ( arg_value is not None ):
+            slimprob_common_args[ arg_name ] = str( arg_value )
     
     # For each fasta file, start a new SLiMProb process with
     # the appropriate arguments
-    for random_nb in range( randomization_count ):
+    for random_nb in range( first_iteration, first_iteration + randomization_count ):
         
         # Get the path of the files and folders
-        seqin = randomized_fasta_file_pattern.format( sqce_nb = str( random_nb ) )
         resdir = randomized_sqces_slimprob_folder_pattern.format( sqce_nb = str( random_nb ) )
+        if packed_fasta_file:
+            # NB: The sequences of the iteration are extracted in the SLiMProb folder,
+            #     using the same file name as in the unpacked layout
+            seqin = os.path.join( resdir, strain + '_random_' + str( random_nb ) + '.fasta' )
+        else:
+            seqin = randomized_fasta_file_pattern.format( sqce_nb = str( random_nb ) )
         resfile = randomized_sqces_res_file_pattern.format( sqce_nb = str( random_nb ) )
         log = randomized_sqces_log_file_pattern.format( sqce_nb = str( random_nb ) )
                 
-        # If the ouput file has already been created, then skip this file
+        # If the randomization has already been processed, then skip this file
         # This allows to restart the current script if something when wrong during 
         # the execution but a part of the files have been correctly generated
-        if ( not os.path.exists( resfile ) ):
+        # NB: When a manifest is provided, it is used to know which randomizations
+        #     succeeded, otherwise the existence of the result file is checked
+        if manifest_file:
+            to_process = ( random_nb not in succeeded_iterations )
+        else:
+            to_process = ( not os.path.exists( resfile ) )
+        
+        if to_process:
             
             # Complete the dictionnary of arguments to provide to SLiMProb
             slimprob_args = { '--seqin': seqin,
@@ -157,20 +315,83 @@ def run_slimprob_multithread( elm_motifs_parsed_file, randomized_fasta_file_patt
                               '--log': log }
             slimprob_args.update( slimprob_common_args )
             
-            run_slimprob_args.append( slimprob_args )
+            # Register where the sequences of the iteration have to be extracted from
+            packed_source = None
+            if packed_fasta_file:
+                if ( random_nb not in packed_index.keys() ):
+                    raise Exception( 'The iteration ' + str( random_nb ) + ' is missing from the index of' +
+                                     ' the packed fasta file ' + packed_fasta_file + '.' )
+                ( offset, length ) = packed_index[ random_nb ]
+                packed_source = ( packed_fasta_file, offset, length )
+            
+            run_slimprob_args.append( ( random_nb, slimprob_args, packed_source, run_policy ) )
+    
+    # If requested, group the randomizations in batches 
+    # processed by a single SLiMProb run
+    if ( ( scanner == SCANNER_SLIMPROB ) and ( batch_size > 1 ) and run_slimprob_args ):
+        run_slimprob_args = get_slimprob_batches( run_slimprob_args, batch_size, maxsize, maxseq,
+                                                  randomized_sqces_slimprob_folder_pattern,
+                                                  randomized_sqces_res_file_pattern,
+                                                  randomized_sqces_log_file_pattern )
             
     # Instantiate the pool 
-    p = Pool( thread_nb )
-    messages = p.map( run_slimprob, run_slimprob_args )
+    # NB: When the regex scanner is used, the regular expressions 
+    #     are compiled once when each process is started
+    if ( scanner == SCANNER_REGEX ):
+        p = Pool( thread_nb, initializer = init_regex_scanner, initargs = ( elm_motifs_parsed_file, ) )
+        worker = run_regex_scanner
+    elif ( batch_size > 1 ):
+        p = Pool( thread_nb )
+        worker = run_slimprob_batch
+    else:
+        p = Pool( thread_nb )
+        worker = run_slimprob
+    
+    # Log the outcome of each task as soon as it ends, 
+    # and register it in the manifest
+    failed_iterations = []
+    processed_count = 0
+    
+    if manifest_file:
+        manifest = open_manifest( manifest_file )
+    
+    for ( random_nbs, status, attempts, duration, messages ) in p.imap_unordered( worker, run_slimprob_args ):
+        
+        if ( len( messages ) != 0 ):
+            print( '\n'.join( messages ) )
+        
+        for random_nb in random_nbs:
+            if manifest_file:
+                manifest.write( '\t'.join( [ str( random_nb ), status, str( attempts ), str( duration ),
+                                             datetime.datetime.now().strftime('%d-%m-%Y %H:%M:%S') ] ) + '\n' )
+            if ( status == STATUS_FAILED ):
+                failed_iterations.append( random_nb )
+        
+        if manifest_file:
+            manifest.flush()
+        
+        # Regularly log the progress
+        previous_count = processed_count
+        processed_count += len( random_nbs )
+        if ( int( processed_count / PROGRESS_LOG_INTERVAL ) > int( previous_count / PROGRESS_LOG_INTERVAL ) ):
+            print( datetime.datetime.now().strftime('%d-%m-%Y %H:%M:%S') +
+                   ':: INFO :: ' + str( processed_count ) + ' randomizations processed (' + 
+                   str( len( failed_iterations ) ) + ' failed)' )
+        
+        sys.stdout.flush()
+    
     p.close()
     
     # Wait for all processes to be completed
     p.join()
     
-    for message in messages:
-        if ( len( message ) != 0 ):
-            print( '\n'.join( message ) )
+    if manifest_file:
+        manifest.close()
+    
+    if scratch_folder:
+        shutil.rmtree( scratch_folder, ignore_errors = True )
     
+    return sorted( failed_iterations )
 
 
 
@@ -180,42 +401,786 @@ def run_slimprob_multithread( elm_motifs_parsed_file, randomized_fasta_file_patt
 #
 # This function allows to start SLiMProb using the arguments provided.
 # 
-# @param run_slimprob_args: Dictionary - The arguments to use to run SLiMProb.
+# @param run_slimprob_args: Tuple - The number of the randomization (Integer), the arguments 
+#                                   to use to run SLiMProb (Dictionary), the (packed fasta file, 
+#                                   offset, length) tuple from which the sequences have to be 
+#                                   extracted (None if the sequences are not packed) and the
+#                                   (timeout, retries, scratch folder) tuple defining how the 
+#                                   SLiMProb run has to be monitored.
+#
+# @return random_nbs: List - The list of the randomizations processed.
+# @return status: String - The status of the processing (succeeded / failed).
+# @return attempts: Integer - The number of times SLiMProb has been started.
+# @return duration: Float - The duration of the processing in seconds.
+# @return messages: List - The list of messages to log.
+#
+def run_slimprob( run_slimprob_args ):
+    
+    ( random_nb, slimprob_args, packed_source, run_policy ) = run_slimprob_args
+    
+    start_time = time.time()
+    
+    # Extract the sequences of the iteration from the packed file
+    # NB: As the SLiMProb folder is removed when a run fails, the 
+    #     sequences are extracted again before each attempt
+    if packed_source:
+        ( packed_fasta_file, offset, length ) = packed_source
+        prepare_input = lambda seqin: extract_packed_iteration( packed_fasta_file, offset, length, seqin )
+    else:
+        prepare_input = None
+    
+    ( succeeded, attempts, messages ) = execute_slimprob( slimprob_args, run_policy, prepare_input )
+    
+    status = ( STATUS_SUCCEEDED if succeeded else STATUS_FAILED )
+            
+    return ( [ random_nb ], status, attempts, round( time.time() - start_time, 2 ), messages )
+
+
+
+## execute_slimprob
+#  ----------------
 #
-def run_slimprob( slimprob_args ):
+# This function allows to run SLiMProb with the arguments provided, 
+# killing it if it exceeds the time limit and starting it again if it 
+# fails. A run is considered as successful if SLiMProb exits with a zero
+# exit code and both the result and occurrence files have been created.
+# Messages written on the standard error by successful runs are logged
+# as warnings.
+# When a scratch folder is provided, SLiMProb is run in this folder (see 
+# the get_staged_slimprob_args() function) and only the result and occurrence 
+# files are copied at their final location once the run succeeded (the log 
+# file being copied only if the run failed).
+#
+# @param slimprob_args: Dictionary - The arguments to use to run SLiMProb.
+# @param run_policy: Tuple - The maximum duration of a run in seconds (0: no time limit),
+#                            the number of times a failed run is started again and the
+#                            path to the scratch folder (None to run SLiMProb in place).
+# @param prepare_input: Function - A function to call with the path to the fasta file before
+#                                  each attempt (e.g. to write this file). None by default.
+#
+# @return succeeded: Boolean - Has SLiMProb been run successfully?
+# @return attempts: Integer - The number of times SLiMProb has been started.
+# @return messages: List - The list of messages to log.
+#
+def execute_slimprob( slimprob_args, run_policy, prepare_input = None ):
+    
+    ( timeout, retries, scratch_folder ) = run_policy
     
     # Instantiate a list that aims to store the messages to log
     messages = []
+    
+    # Get the path of the final result files
+    final_resfile = slimprob_args.get( '--resfile' )
+    final_occfile = final_resfile[ :-len( SLIMPROB_RES_EXTENSION ) ] + SLIMPROB_OCC_EXTENSION
+    final_log = slimprob_args.get( '--log' )
+    
+    # Run SLiMProb in the scratch folder if necessary
+    if scratch_folder:
+        slimprob_args = get_staged_slimprob_args( slimprob_args, scratch_folder )
+    
+    resdir = slimprob_args.get( '--resdir' )
+    resfile = slimprob_args.get( '--resfile' )
+    occfile = resfile[ :-len( SLIMPROB_RES_EXTENSION ) ] + SLIMPROB_OCC_EXTENSION
             
     # Convert the dictionary into a list
     slimprob_args_list = []
+    slimprob_param = []
     for ( opt, val ) in slimprob_args.items():
         slimprob_args_list += [ opt, val ]
+        slimprob_param.append( opt + ' ' + val )
     
-    # Run SLiMProb with the arguments provided and check the program
-    # did not return a non zero exit code
     slimprob_command = [ 'bash', 'compute_slim_probability/script/run_slimprob.sh' ] + slimprob_args_list
     
-    # Run the process
-    # If the process returns an error message, then log it and remove
-    # the occurrence file and the SLiMProb folder created.
-    run_slimprob = subprocess.Popen( slimprob_command, 
-                                     stdout = subprocess.PIPE,
-                                     stderr = subprocess.PIPE )
-    ( stdout, stderr ) = run_slimprob.communicate()
-    
-    if ( stderr != '' ):
-        slimprob_param = []
-        for ( param, value ) in slimprob_args.items():
-            slimprob_param.append( param + ' ' + value )
-        messages.append( 'ERROR :: The execution of SLiMProb with the following parameters:\n' +
-               '\n'.join( slimprob_param ) + '\nreturned the error message:\n' +
-               str( stderr ) + 'The files already created by SLiMProb will be removed.' )
-        # Remove the occurrence file created
-        if os.path.exists( slimprob_args.get( '--resdir' ) ):
-            shutil.rmtree( slimprob_args.get( '--resdir' ) )
+    attempts = 0
+    succeeded = False
+    
+    while ( ( not succeeded ) and ( attempts <= retries ) ):
+        
+        attempts += 1
+        
+        try:
+            if prepare_input:
+                prepare_input( slimprob_args.get( '--seqin' ) )
+            
+            # Run the process, and kill it if it exceeds the time limit
+            # NB: The process is started in its own process group, so all
+            #     its child processes (SLiMProb, IUPred...) may be killed
+            run_slimprob = subprocess.Popen( slimprob_command, 
+                                             stdout = subprocess.PIPE,
+                                             stderr = subprocess.PIPE,
+                                             preexec_fn = os.setsid )
+            timed_out = []
+            if timeout:
+                timer = threading.Timer( timeout, kill_process, [ run_slimprob, timed_out ] )
+                timer.start()
+            ( stdout, stderr ) = run_slimprob.communicate()
+            if timeout:
+                timer.cancel()
+            stderr = stderr.decode( 'utf-8', 'replace' )
+            
+            # Check the run succeeded
+            if timed_out:
+                error = 'SLiMProb has been killed after ' + str( timeout ) + ' seconds'
+            elif ( run_slimprob.returncode != 0 ):
+                error = 'SLiMProb returned the exit code ' + str( run_slimprob.returncode )
+            elif ( ( not os.path.exists( resfile ) ) or ( not os.path.exists( occfile ) ) ):
+                error = 'SLiMProb did not generate the result and occurrence files'
+            else:
+                error = None
+        
+        except Exception as e:
+            error = 'The execution of SLiMProb raised an exception: ' + str( e )
+            stderr = ''
+        
+        if error:
+            messages.append( 'ERROR :: The execution of SLiMProb (attempt ' + str( attempts ) + '/' + 
+                             str( retries + 1 ) + ') with the following parameters:\n' +
+                             '\n'.join( slimprob_param ) + '\nfailed: ' + error + '.\n' +
+                             ( 'SLiMProb returned the error message:\n' + stderr + '\n' if stderr else '' ) +
+                             'The files already created by SLiMProb will be removed.' )
+            # Remove the files and the SLiMProb folder created
+            for output_file in [ resfile, occfile ]:
+                if os.path.exists( output_file ):
+                    os.remove( output_file )
+            if os.path.exists( resdir ):
+                shutil.rmtree( resdir )
+        
+        else:
+            succeeded = True
+            if stderr:
+                messages.append( 'WARNING :: The execution of SLiMProb with the following parameters:\n' +
+                                 '\n'.join( slimprob_param ) + '\nsucceeded but returned the message:\n' +
+                                 stderr )
+    
+    # Copy the result files (or the log file if the run failed) 
+    # from the scratch folder and clean it
+    if scratch_folder:
+        try:
+            if succeeded:
+                # NB: The result file is copied last, as its existence is 
+                #     used to know if the randomization has already been processed
+                copy_from_scratch( occfile, final_occfile )
+                copy_from_scratch( resfile, final_resfile )
+            elif os.path.exists( slimprob_args.get( '--log' ) ):
+                copy_from_scratch( slimprob_args.get( '--log' ), final_log )
+        except Exception as e:
+            succeeded = False
+            messages.append( 'ERROR :: The files generated by SLiMProb in ' + resdir + 
+                             ' could not be copied from the scratch folder: ' + str( e ) )
+        
+        if os.path.exists( resdir ):
+            shutil.rmtree( resdir )
+        if os.path.exists( slimprob_args.get( '--log' ) ):
+            os.remove( slimprob_args.get( '--log' ) )
             
-    return messages
+    return ( succeeded, attempts, messages )
+
+
+
+## get_staged_slimprob_args
+#  ------------------------
+#
+# This function allows to get the arguments to use to run SLiMProb in
+# the scratch folder. The SLiMProb output directory (and the result files, 
+# that are written in it) is moved to the scratch folder, as well as the 
+# fasta file if it is written in the SLiMProb output directory (e.g. when 
+# it is extracted from a packed file). The log file is written next to the 
+# SLiMProb output directory, so it can be copied back if the run fails. 
+#
+# @param slimprob_args: Dictionary - The arguments to use to run SLiMProb.
+# @param scratch_folder: String - The path to the scratch folder.
+#
+# @return staged_slimprob_args: Dictionary - The arguments to use to run SLiMProb 
+#                                            in the scratch folder.
+#
+def get_staged_slimprob_args( slimprob_args, scratch_folder ):
+    
+    resdir = slimprob_args.get( '--resdir' )
+    seqin = slimprob_args.get( '--seqin' )
+    
+    staged_resdir = os.path.join( scratch_folder, os.path.basename( os.path.normpath( resdir ) ) )
+    
+    staged_slimprob_args = dict( slimprob_args )
+    staged_slimprob_args.update( { '--resdir': staged_resdir,
+                                   '--resfile': os.path.join( staged_resdir, os.path.basename( slimprob_args.get( '--resfile' ) ) ),
+                                   '--log': os.path.join( scratch_folder, os.path.basename( slimprob_args.get( '--log' ) ) ),
+                                   '--scratch': scratch_folder } )
+    if ( os.path.dirname( os.path.abspath( seqin ) ) == os.path.abspath( resdir ) ):
+        staged_slimprob_args[ '--seqin' ] = os.path.join( staged_resdir, os.path.basename( seqin ) )
+    
+    return staged_slimprob_args
+
+
+
+## copy_from_scratch
+#  -----------------
+#
+# This function allows to copy a file from the scratch folder to its final 
+# location. The file is first copied using a temporary name and then renamed, 
+# so an incomplete file may never be found at the final location.
+#
+# @param scratch_file: String - The path to the file in the scratch folder.
+# @param final_file: String - The final path of the file.
+#
+def copy_from_scratch( scratch_file, final_file ):
+    
+    basedir = os.path.dirname( final_file )
+    if ( basedir and ( not os.path.isdir( basedir ) ) ):
+        os.makedirs( basedir )
+    
+    shutil.copyfile( scratch_file, final_file + COPY_TMP_EXTENSION )
+    os.rename( final_file + COPY_TMP_EXTENSION, final_file )
+
+
+
+## kill_process
+#  ------------
+#
+# This function allows to kill a process which exceeded its time limit,
+# together with all the processes of its process group.
+#
+# @param process: Popen - The process to kill.
+# @param timed_out: List - A list to which True is appended to register 
+#                          that the process has been killed.
+#
+def kill_process( process, timed_out ):
+    
+    if ( process.poll() is None ):
+        timed_out.append( True )
+        try:
+            os.killpg( process.pid, signal.SIGKILL )
+        except OSError:
+            process.kill()
+
+
+
+## read_manifest
+#  -------------
+#
+# This function allows to get the randomizations registered as 
+# succeeded in the manifest file.
+#
+# @param manifest_file: String - The path to the manifest file.
+#
+# @return succeeded_iterations: Set - The set of randomizations which succeeded.
+#
+def read_manifest( manifest_file ):
+    
+    # Get the last status registered for each randomization
+    statuses = {}
+    
+    if os.path.exists( manifest_file ):
+        with open( manifest_file, 'r' ) as manifest:
+            # Skip the header
+            manifest.readline()
+            for line in manifest:
+                line = line.rstrip( '\n' ).split( '\t' )
+                # NB: The last line may be incomplete if the script has been killed
+                if ( len( line ) == len( MANIFEST_HEADER ) ):
+                    statuses[ int( line[ 0 ] ) ] = line[ 1 ]
+    
+    return set( [ random_nb for ( random_nb, status ) in statuses.items() if ( status == STATUS_SUCCEEDED ) ] )
+
+
+
+## open_manifest
+#  -------------
+#
+# This function allows to open the manifest file in order to append 
+# new lines to it. The header is written if the file is created.
+#
+# @param manifest_file: String - The path to the manifest file.
+#
+# @return manifest: File - The manifest file opened in append mode.
+#
+def open_manifest( manifest_file ):
+    
+    basedir = os.path.dirname( manifest_file )
+    if ( basedir and ( not os.path.isdir( basedir ) ) ):
+        os.makedirs( basedir )
+    
+    new_file = ( ( not os.path.exists( manifest_file ) ) or ( os.path.getsize( manifest_file ) == 0 ) )
+    
+    manifest = open( manifest_file, 'a' )
+    if new_file:
+        manifest.write( '\t'.join( MANIFEST_HEADER ) + '\n' )
+    else:
+        # Make sure a possibly incomplete last line is terminated
+        with open( manifest_file, 'rb' ) as previous_manifest:
+            previous_manifest.seek( -1, os.SEEK_END )
+            if ( previous_manifest.read( 1 ) != b'\n' ):
+                manifest.write( '\n' )
+    
+    return manifest
+
+
+
+## parse_elm_motifs
+#  ----------------
+#
+# This function allows to parse the ELM motifs file (as provided to SLiMProb)
+# and to compile the regular expression of each motif.
+# NB: The regular expressions are compiled within a lookahead assertion, 
+#     so all the occurrences are reported, including the overlapping ones
+#     (as SLiMProb does).
+#
+# @param elm_motifs_parsed_file: String - The path to the ELM parsed file.
+#
+# @return elm_motifs: List - The list of (motif name, pattern, compiled regex) tuples.
+#
+# @raise Exception: When the regular expression of a motif cannot be compiled.
+#
+def parse_elm_motifs( elm_motifs_parsed_file ):
+    
+    elm_motifs = []
+    
+    with open( elm_motifs_parsed_file, 'r' ) as motifs_file:
+        # Skip the header
+        motifs_file.readline()
+        for line in motifs_file:
+            line = line.rstrip( '\n' )
+            if line:
+                line = line.split( '\t' )
+                motif = line[ 0 ].strip( '"' )
+                pattern = line[ 1 ].strip( '"' )
+                try:
+                    regex = re.compile( '(?=(' + pattern + '))' )
+                except re.error as e:
+                    raise Exception( 'The regular expression of the motif ' + motif + 
+                                     ' (' + pattern + ') cannot be compiled: ' + str( e ) )
+                elm_motifs.append( ( motif, pattern, regex ) )
+    
+    return elm_motifs
+
+
+
+## init_regex_scanner
+#  ------------------
+#
+# This function is used as the initializer of the processes of the Pool
+# when the regex scanner is used. It compiles the ELM regular expressions
+# once for all the files processed by the process.
+#
+# @param elm_motifs_parsed_file: String - The path to the ELM parsed file.
+#
+def init_regex_scanner( elm_motifs_parsed_file ):
+    
+    global ELM_MOTIFS
+    ELM_MOTIFS = parse_elm_motifs( elm_motifs_parsed_file )
+
+
+
+## scan_sequence
+#  -------------
+#
+# This function allows to find all the occurrences of the motifs in one 
+# sequence. As the ordered residues are masked, the occurrences overlapping
+# a masked residue are discarded (as SLiMProb does).
+# NB: The regular expressions are run on the whole sequence (and not on each
+#     unmasked region independently), so that the patterns anchored with
+#     "^" or "$" only match at the actual termini of the sequence.
+#
+# @param sequence: String - The (masked) sequence.
+# @param elm_motifs: List - The list of (motif name, pattern, compiled regex) tuples.
+#
+# @return occurrences: List - The list of (motif name, pattern, start, end, match) 
+#                             tuples, using 1-based inclusive positions.
+#
+def scan_sequence( sequence, elm_motifs ):
+    
+    occurrences = []
+    
+    for ( motif, pattern, regex ) in elm_motifs:
+        for match in regex.finditer( sequence ):
+            matched = match.group( 1 )
+            # Empty matches and matches overlapping a masked 
+            # residue are not considered as occurrences
+            if ( matched and ( MASKED_RESIDUE not in matched ) ):
+                start = match.start() + 1
+                occurrences.append( ( motif, pattern, start, start + len( matched ) - 1, matched ) )
+    
+    return occurrences
+
+
+
+## run_regex_scanner
+#  -----------------
+#
+# This function allows to find the occurrences of the motifs in all the
+# sequences of a randomized fasta file and to write them in files having
+# the same paths as the SLiMProb result and occurrence files.
+#
+# @param run_slimprob_args: Tuple - The arguments used to run SLiMProb (see run_slimprob()).
+#                                   The run policy is ignored by the scanner.
+#
+# @return random_nbs, status, attempts, duration, messages: See run_slimprob().
+#
+def run_regex_scanner( run_slimprob_args ):
+    
+    ( random_nb, slimprob_args, packed_source, run_policy ) = run_slimprob_args
+    
+    start_time = time.time()
+    
+    messages = []
+    status = STATUS_SUCCEEDED
+    
+    seqin = slimprob_args.get( '--seqin' )
+    resfile = slimprob_args.get( '--resfile' )
+    occfile = resfile[ :-len( SLIMPROB_RES_EXTENSION ) ] + SLIMPROB_OCC_EXTENSION
+    
+    # The name of the dataset is the name of the fasta file (as for SLiMProb)
+    dataset = os.path.splitext( os.path.basename( seqin ) )[ 0 ]
+    
+    try:
+        # Get the sequences, either from the packed file or from the fasta file
+        sequences = parse_records( read_iteration_records( seqin, packed_source ) )
+        
+        basedir = os.path.dirname( resfile )
+        if ( basedir and ( not os.path.isdir( basedir ) ) ):
+            os.makedirs( basedir )
+        
+        # Count the occurrences and the sequences for each motif
+        motif_counts = {}
+        for ( motif, pattern, regex ) in ELM_MOTIFS:
+            motif_counts[ motif ] = [ pattern, set(), 0 ]
+        
+        with open( occfile, 'w' ) as occ_file:
+            occ_file.write( '\t'.join( SCANNER_OCC_HEADER ) + '\n' )
+            for ( seq_name, sequence ) in sequences:
+                for ( motif, pattern, start, end, matched ) in scan_sequence( sequence, ELM_MOTIFS ):
+                    occ_file.write( '\t'.join( [ dataset, motif, seq_name, str( start ), str( end ), 
+                                                 str( len( sequence ) ), pattern, matched ] ) + '\n' )
+                    motif_counts[ motif ][ 1 ].add( seq_name )
+                    motif_counts[ motif ][ 2 ] += 1
+        
+        # Write the result file last, as its existence is used 
+        # to know if the file has already been processed
+        with open( resfile, 'w' ) as res_file:
+            res_file.write( '\t'.join( SUMMARY_RES_HEADER ) + '\n' )
+            for ( motif, pattern, regex ) in ELM_MOTIFS:
+                ( pattern, seq_names, occ_count ) = motif_counts[ motif ]
+                res_file.write( '\t'.join( [ dataset, motif, pattern, 
+                                             str( len( seq_names ) ), str( occ_count ) ] ) + '\n' )
+    
+    except Exception as e:
+        status = STATUS_FAILED
+        messages.append( 'ERROR :: The scan of the motifs in the file ' + seqin + 
+                         ' returned the error message:\n' + str( e ) + 
+                         '\nThe files already created will be removed.' )
+        for output_file in [ occfile, resfile ]:
+            if os.path.exists( output_file ):
+                os.remove( output_file )
+    
+    return ( [ random_nb ], status, 1, round( time.time() - start_time, 2 ), messages )
+
+
+
+## read_iteration_records
+#  ----------------------
+#
+# This function allows to get the fasta records of one randomization,
+# either from its fasta file or from the packed fasta file.
+#
+# @param seqin: String - The path to the fasta file of the randomization.
+# @param packed_source: Tuple - The (packed fasta file, offset, length) tuple from which 
+#                               the records have to be read (None if the sequences 
+#                               are not packed).
+#
+# @return records: String - The content of the fasta file.
+#
+def read_iteration_records( seqin, packed_source ):
+    
+    if packed_source:
+        ( packed_fasta_file, offset, length ) = packed_source
+        with open( packed_fasta_file, 'rb' ) as packed_file:
+            packed_file.seek( offset )
+            records = packed_file.read( length )
+    else:
+        with open( seqin, 'rb' ) as fasta_file:
+            records = fasta_file.read()
+    
+    return records.decode( 'utf-8' )
+
+
+
+## parse_records
+#  -------------
+#
+# This function allows to parse fasta records.
+# NB: The name of the sequence is the first word of the header (as for SLiMProb).
+#
+# @param records: String - The content of a fasta file.
+#
+# @return sequences: List - The list of (name, sequence) tuples.
+#
+def parse_records( records ):
+    
+    sequences = []
+    for record in records.split( '>' ):
+        if record.strip():
+            record = record.split( '\n' )
+            sequences.append( ( record[ 0 ].split()[ 0 ], ''.join( record[ 1: ] ).strip() ) )
+    
+    return sequences
+
+
+
+## get_slimprob_batches
+#  --------------------
+#
+# This function allows to group the randomizations in batches of contiguous 
+# randomizations that will be processed by a single SLiMProb run. The size 
+# of the batches is reduced if necessary so the number of sequences and 
+# residues of each batch comply with the maxseq and maxsize SLiMProb options
+# (all the randomizations of a strain have the same sequence count and length).
+#
+# @param run_slimprob_args: List - The list of (random_nb, slimprob_args, packed_source, run_policy) 
+#                                  tuples of the randomizations to process.
+# @param batch_size: Integer (>0) - The maximum number of randomizations of a batch.
+# @param maxsize: Integer (>0) - The maxsize parameter for SliMProb.
+# @param maxseq: Integer (>0) - The maxseq parameter for SliMProb.
+# @param randomized_sqces_slimprob_folder_pattern: String - The pattern of the path to the SLiMProb output directory.
+# @param randomized_sqces_res_file_pattern: String - The pattern of the path to the result file.
+# @param randomized_sqces_log_file_pattern: String - The pattern of the path to the log file.
+#
+# @return run_slimprob_batch_args: List - The list of (batch_slimprob_args, randomizations, run_policy) 
+#                                         tuples, where randomizations is a list of (random_nb, 
+#                                         slimprob_args, packed_source) tuples.
+#
+def get_slimprob_batches( run_slimprob_args, batch_size, maxsize, maxseq, randomized_sqces_slimprob_folder_pattern, \
+                          randomized_sqces_res_file_pattern, randomized_sqces_log_file_pattern ):
+    
+    # Get the number of sequences and residues of one randomization
+    ( random_nb, slimprob_args, packed_source, run_policy ) = run_slimprob_args[ 0 ]
+    sequences = parse_records( read_iteration_records( slimprob_args.get( '--seqin' ), packed_source ) )
+    seq_count = max( 1, len( sequences ) )
+    residue_count = max( 1, sum( [ len( sequence ) for ( name, sequence ) in sequences ] ) )
+    
+    batch_size = max( 1, min( batch_size, int( maxseq / seq_count ), int( maxsize / residue_count ) ) )
+    
+    run_slimprob_batch_args = []
+    
+    for k in range( 0, len( run_slimprob_args ), batch_size ):
+        
+        randomizations = []
+        for ( random_nb, slimprob_args, packed_source, run_policy ) in run_slimprob_args[ k:k+batch_size ]:
+            randomizations.append( ( random_nb, slimprob_args, packed_source ) )
+        
+        batch_name = 'batch_' + str( randomizations[ 0 ][ 0 ] )
+        batch_resdir = randomized_sqces_slimprob_folder_pattern.format( sqce_nb = batch_name )
+        first_seqin = randomizations[ 0 ][ 1 ].get( '--seqin' )
+        
+        batch_slimprob_args = dict( randomizations[ 0 ][ 1 ] )
+        batch_slimprob_args.update( { '--seqin': os.path.join( batch_resdir, 
+                                                               os.path.splitext( os.path.basename( first_seqin ) )[ 0 ] + '_batch.fasta' ),
+                                      '--resdir': batch_resdir,
+                                      '--resfile': randomized_sqces_res_file_pattern.format( sqce_nb = batch_name ),
+                                      '--log': randomized_sqces_log_file_pattern.format( sqce_nb = batch_name ) } )
+        
+        run_slimprob_batch_args.append( ( batch_slimprob_args, randomizations, run_policy ) )
+    
+    print( 'DEBUG :: ' + str( len( run_slimprob_args ) ) + ' randomizations grouped in ' + 
+           str( len( run_slimprob_batch_args ) ) + ' batches of ' + str( batch_size ) + ' randomizations' )
+    
+    return run_slimprob_batch_args
+
+
+
+## run_slimprob_batch
+#  ------------------
+#
+# This function allows to run SLiMProb on a batch of randomizations.
+# The sequences of all the randomizations are written in a single fasta 
+# file, their names being prefixed with a tag identifying the randomization
+# (e.g. P1__A1 is renamed RND12_P1__A1 for the randomization 12). Once SLiMProb
+# has been run, the occurrences are demultiplexed back into the occurrence
+# file of each randomization, using the original sequence and dataset names.
+#
+# @param run_slimprob_batch_args: Tuple - The arguments to use to run SLiMProb on the batch 
+#                                         (Dictionary), the list of (random_nb, slimprob_args, 
+#                                         packed_source) tuples of the batch and the (timeout, 
+#                                         retries, scratch folder) tuple defining how the SLiMProb 
+#                                         run has to be monitored.
+#
+# @return random_nbs, status, attempts, duration, messages: See run_slimprob().
+#
+def run_slimprob_batch( run_slimprob_batch_args ):
+    
+    ( batch_slimprob_args, randomizations, run_policy ) = run_slimprob_batch_args
+    
+    start_time = time.time()
+    
+    random_nbs = [ random_nb for ( random_nb, slimprob_args, packed_source ) in randomizations ]
+    
+    batch_seqin = batch_slimprob_args.get( '--seqin' )
+    batch_resfile = batch_slimprob_args.get( '--resfile' )
+    batch_occfile = batch_resfile[ :-len( SLIMPROB_RES_EXTENSION ) ] + SLIMPROB_OCC_EXTENSION
+    
+    # Write the sequences of all the randomizations in the same fasta file
+    # NB: As the SLiMProb folder is removed when a run fails, the 
+    #     fasta file is written again before each attempt
+    def write_batch_input( batch_seqin ):
+        basedir = os.path.dirname( batch_seqin )
+        if ( basedir and ( not os.path.isdir( basedir ) ) ):
+            os.makedirs( basedir )
+        
+        with open( batch_seqin, 'w' ) as batch_file:
+            for ( random_nb, slimprob_args, packed_source ) in randomizations:
+                records = read_iteration_records( slimprob_args.get( '--seqin' ), packed_source )
+                tag = '>' + BATCH_TAG_PREFIX + str( random_nb ) + BATCH_TAG_SEPARATOR
+                batch_file.write( records.replace( '>', tag ) )
+    
+    # Run SLiMProb on the batch
+    ( succeeded, attempts, messages ) = execute_slimprob( batch_slimprob_args, run_policy, write_batch_input )
+    
+    if ( not succeeded ):
+        messages.append( 'ERROR :: The execution of SLiMProb on the batch ' + batch_seqin + ' failed.' +
+                         ' The ' + str( len( randomizations ) ) + ' randomizations of this batch' +
+                         ' will have to be processed again.' )
+        return ( random_nbs, STATUS_FAILED, attempts, round( time.time() - start_time, 2 ), messages )
+    
+    try:
+        demultiplex_batch_occurrences( batch_occfile, randomizations )
+    except Exception as e:
+        messages.append( 'ERROR :: The occurrences of the batch ' + batch_seqin + ' could not be split' +
+                         ' by randomization: ' + str( e ) + '\nThe ' + str( len( randomizations ) ) + 
+                         ' randomizations of this batch will have to be processed again.' )
+        for ( random_nb, slimprob_args, packed_source ) in randomizations:
+            resfile = slimprob_args.get( '--resfile' )
+            for output_file in [ resfile, resfile[ :-len( SLIMPROB_RES_EXTENSION ) ] + SLIMPROB_OCC_EXTENSION ]:
+                if os.path.exists( output_file ):
+                    os.remove( output_file )
+        return ( random_nbs, STATUS_FAILED, attempts, round( time.time() - start_time, 2 ), messages )
+    
+    # Remove the batch files
+    for batch_file in [ batch_resfile, batch_occfile ]:
+        if os.path.exists( batch_file ):
+            os.remove( batch_file )
+    if os.path.exists( batch_slimprob_args.get( '--resdir' ) ):
+        shutil.rmtree( batch_slimprob_args.get( '--resdir' ) )
+    
+    return ( random_nbs, STATUS_SUCCEEDED, attempts, round( time.time() - start_time, 2 ), messages )
+
+
+
+## demultiplex_batch_occurrences
+#  -----------------------------
+#
+# This function allows to split the occurrences found by SLiMProb on a batch 
+# into the occurrence file of each randomization, using the original sequence
+# and dataset names. A summary result file is also written for each randomization.
+#
+# @param batch_occfile: String - The path to the occurrence file of the batch.
+# @param randomizations: List - The list of (random_nb, slimprob_args, packed_source) 
+#                               tuples of the batch.
+#
+def demultiplex_batch_occurrences( batch_occfile, randomizations ):
+    
+    # Get the occurrences of each randomization
+    occurrences = {}
+    for ( random_nb, slimprob_args, packed_source ) in randomizations:
+        occurrences[ random_nb ] = []
+    
+    with open( batch_occfile, 'r' ) as occ_file:
+        header = occ_file.readline().rstrip( '\n' ).split( '\t' )
+        seq_index = header.index( 'Seq' )
+        
+        for line in occ_file:
+            line = line.rstrip( '\n' )
+            if line:
+                line = line.split( '\t' )
+                ( tag, seq_name ) = line[ seq_index ][ len( BATCH_TAG_PREFIX ): ].split( BATCH_TAG_SEPARATOR, 1 )
+                line[ seq_index ] = seq_name
+                occurrences[ int( tag ) ].append( line )
+    
+    # Write the occurrence and summary result files of each randomization
+    # NB: The result file is written last, as its existence is used 
+    #     to know if the randomization has already been processed
+    dataset_index = header.index( 'Dataset' )
+    motif_index = header.index( 'Motif' )
+    pattern_index = ( header.index( 'Pattern' ) if ( 'Pattern' in header ) else None )
+    
+    for ( random_nb, slimprob_args, packed_source ) in randomizations:
+        
+        dataset = os.path.splitext( os.path.basename( slimprob_args.get( '--seqin' ) ) )[ 0 ]
+        resfile = slimprob_args.get( '--resfile' )
+        occfile = resfile[ :-len( SLIMPROB_RES_EXTENSION ) ] + SLIMPROB_OCC_EXTENSION
+        
+        motif_counts = {}
+        
+        with open( occfile, 'w' ) as occ_file:
+            occ_file.write( '\t'.join( header ) + '\n' )
+            for line in occurrences[ random_nb ]:
+                line[ dataset_index ] = dataset
+                occ_file.write( '\t'.join( line ) + '\n' )
+                
+                motif = line[ motif_index ]
+                if ( motif not in motif_counts.keys() ):
+                    motif_counts[ motif ] = [ ( line[ pattern_index ] if ( pattern_index is not None ) else '' ), set(), 0 ]
+                motif_counts[ motif ][ 1 ].add( line[ seq_index ] )
+                motif_counts[ motif ][ 2 ] += 1
+        
+        with open( resfile, 'w' ) as res_file:
+            res_file.write( '\t'.join( SUMMARY_RES_HEADER ) + '\n' )
+            for motif in sorted( motif_counts.keys() ):
+                ( pattern, seq_names, occ_count ) = motif_counts[ motif ]
+                res_file.write( '\t'.join( [ dataset, motif, pattern, 
+                                             str( len( seq_names ) ), str( occ_count ) ] ) + '\n' )
+    
+
+
+
+## read_packed_index
+#  -----------------
+#
+# This function allows to read the index of a packed fasta file 
+# generated by the randomize_sequence.py script.
+#
+# @param packed_index_file: String - The path to the index file.
+#
+# @return packed_index: Dictionary - The (offset, length) in bytes of the records 
+#                                    of each iteration, indexed by iteration number.
+#
+def read_packed_index( packed_index_file ):
+    
+    packed_index = {}
+    
+    with open( packed_index_file, 'r' ) as index_file:
+        # Skip the header
+        index_file.readline()
+        for line in index_file:
+            line = line.rstrip( '\n' )
+            if line:
+                ( iteration, offset, length ) = line.split( '\t' )
+                packed_index[ int( iteration ) ] = ( int( offset ), int( length ) )
+    
+    return packed_index
+
+
+
+## extract_packed_iteration
+#  ------------------------
+#
+# This function allows to extract the sequences of one iteration from
+# a packed fasta file and to write them in a new fasta file.
+#
+# @param packed_fasta_file: String - The path to the packed fasta file.
+# @param offset: Integer - The offset (in bytes) of the first record of the iteration.
+# @param length: Integer - The length (in bytes) of the records of the iteration.
+# @param fasta_file: String - The path to the fasta file to write.
+#
+def extract_packed_iteration( packed_fasta_file, offset, length, fasta_file ):
+    
+    basedir = os.path.dirname( fasta_file )
+    if ( basedir and ( not os.path.isdir( basedir ) ) ):
+        os.makedirs( basedir )
+    
+    with open( packed_fasta_file, 'rb' ) as packed_file:
+        packed_file.seek( offset )
+        records = packed_file.read( length )
+    
+    with open( fasta_file, 'wb' ) as output_file:
+        output_file.write( records )
                 
 
 
@@ -245,9 +1210,21 @@ if __name__ == '__main__':
     if not elm_motifs_parsed_file:
         raise Exception( 'The path to the ELM parsed file has to be provided.' )
 
+    # Get the path to the packed randomized sequences
+    packed_fasta_file = option_dict.get( PACKED_FASTA_FILE_OPTION )
+    if packed_fasta_file:
+        if ( not packed_fasta_file.endswith( PACKED_FASTA_SUFFIX ) ):
+            raise Exception( 'The name of the packed randomized sequences fasta file' +
+                             ' has to end with "' + PACKED_FASTA_SUFFIX + '".' )
+        if ( not os.path.exists( packed_fasta_file + PACKED_INDEX_EXTENSION ) ):
+            raise Exception( 'The index of the packed randomized sequences fasta file (' +
+                             packed_fasta_file + PACKED_INDEX_EXTENSION + ') is missing.' )
+
     # Get the pattern of the path to the randomized sequences
     randomized_fasta_file_pattern = option_dict.get( RANDOMIZED_FASTA_FILE_PATTERN_OPTION )
-    if randomized_fasta_file_pattern:
+    if packed_fasta_file:
+        randomized_fasta_file_pattern = None
+    elif randomized_fasta_file_pattern:
         randomized_fasta_file_pattern = randomized_fasta_file_pattern.replace( '[', '{' ).replace( ']', '}' )
         if ( '{sqce_nb}' not in randomized_fasta_file_pattern ):
             raise Exception( 'The "schema" of the path to the randomized sequences fasta files' +
@@ -281,7 +1258,7 @@ if __name__ == '__main__':
     randomized_sqces_log_file_pattern = option_dict.get( LOG_FILE_PATTERN_OPTION )
     if randomized_sqces_log_file_pattern:
         randomized_sqces_log_file_pattern = randomized_sqces_log_file_pattern.replace( '[', '{' ).replace( ']', '}' )
-        if ( '{sqce_nb}' not in randomized_sqces_res_file_pattern ):
+        if ( '{sqce_nb}' not in randomized_sqces_log_file_pattern ):
             raise Exception( 'The "schema" of the path to the randomized SLiMProb log file' +
                              ' has to contain "{sqce_nb}".' )
     else:
@@ -371,43 +1348,126 @@ if __name__ == '__main__':
         if ( str( extras ) not in [ '0', '1', '2', '3' ] ):
             raise Exception( 'The extras parameter has to be an integer between 0 and 3.' )
     else:
-        extras = DEFAULT_SLIMPROB_EXTRAS
+        extras = None
     
     pickle = option_dict.get( SLIMPROB_PICKLE_OPTION )
     if pickle:
         if ( pickle not in [ 'T', 'F' ] ):
             raise Exception( 'The pickle parameter has to be a boolean equal to "T" or "F".' )
     else:
-        pickle = DEFAULT_SLIMPROB_PICKLE
+        pickle = None
     
     savespace = option_dict.get( SLIMPROB_SAVESPACE_OPTION )
     if savespace:
         if ( str( savespace ) not in [ '0', '1', '2' ] ):
             raise Exception( 'The savespace parameter has to be an integer between 0 and 2.' )
     else:
-        pickle = DEFAULT_SLIMPROB_SAVESPACE   
+        savespace = None
+    
+    scanner = option_dict.get( SCANNER_OPTION )
+    if scanner:
+        if ( scanner not in [ SCANNER_SLIMPROB, SCANNER_REGEX ] ):
+            raise Exception( 'The scanner parameter has to be equal to "' + SCANNER_SLIMPROB + 
+                             '" or "' + SCANNER_REGEX + '".' )
+    else:
+        scanner = DEFAULT_SCANNER
+    
+    batch_size = option_dict.get( BATCH_SIZE_OPTION )
+    if batch_size:
+        try:
+            batch_size = int( batch_size )
+        except:
+            raise Exception( 'The batch size has to be an integer.' )
+        else:
+            if ( batch_size <= 0 ):
+                raise Exception( 'The batch size has to be a positive integer.' )
+    else:
+        batch_size = DEFAULT_BATCH_SIZE
+    
+    timeout = option_dict.get( SLIMPROB_TIMEOUT_OPTION )
+    if timeout:
+        try:
+            timeout = int( timeout )
+        except:
+            raise Exception( 'The timeout has to be an integer.' )
+        else:
+            if ( timeout < 0 ):
+                raise Exception( 'The timeout has to be a positive integer (or 0 for no time limit).' )
+    else:
+        timeout = DEFAULT_SLIMPROB_TIMEOUT
+    
+    retries = option_dict.get( SLIMPROB_RETRIES_OPTION )
+    if retries:
+        try:
+            retries = int( retries )
+        except:
+            raise Exception( 'The number of retries has to be an integer.' )
+        else:
+            if ( retries < 0 ):
+                raise Exception( 'The number of retries has to be a positive integer.' )
+    else:
+        retries = DEFAULT_SLIMPROB_RETRIES
+    
+    manifest_file = option_dict.get( MANIFEST_FILE_OPTION )
+    
+    first_iteration = option_dict.get( FIRST_ITERATION_OPTION )
+    if first_iteration:
+        try:
+            first_iteration = int( first_iteration )
+        except:
+            raise Exception( 'The number of the first randomization has to be an integer.' )
+        else:
+            if ( first_iteration < 0 ):
+                raise Exception( 'The number of the first randomization has to be a positive integer.' )
+    else:
+        first_iteration = 0
+    
+    # Get the scratch folder
+    # NB: The environment variables (e.g. $TMPDIR) are expanded
+    scratch_folder = option_dict.get( SCRATCH_FOLDER_OPTION )
+    if scratch_folder:
+        scratch_folder = os.path.expandvars( scratch_folder )
+        if ( '$' in scratch_folder ):
+            raise Exception( 'The path to the scratch folder (' + scratch_folder + ')' +
+                             ' contains an environment variable which is not defined.' )
     
     # Compute the SLiM likelihoods
     print( datetime.datetime.now().strftime('%d-%m-%Y %H:%M:%S') +
            ':: INFO :: Starting the SLiMProb subprocesses' )
     print( 'DEBUG :: Number of threads available: ' + str( thread_nb ) )
     start_time = time.time()
-    run_slimprob_multithread( elm_motifs_parsed_file = elm_motifs_parsed_file, 
-                              randomized_fasta_file_pattern = randomized_fasta_file_pattern, 
-                              randomized_sqces_slimprob_folder_pattern = randomized_sqces_slimprob_folder_pattern,
-                              randomized_sqces_res_file_pattern = randomized_sqces_res_file_pattern,
-                              randomized_sqces_log_file_pattern = randomized_sqces_log_file_pattern, 
-                              randomization_count = randomization_count, 
-                              thread_nb = thread_nb,
-                              maxsize = maxsize, 
-                              maxseq = maxseq, 
-                              minregion = minregion, 
-                              iumethod = iumethod, 
-                              iucut = iucut,
-                              extras = extras,
-                              pickle = pickle,
-                              savespace = savespace )
+    failed_iterations = run_slimprob_multithread( elm_motifs_parsed_file = elm_motifs_parsed_file, 
+                                                  randomized_fasta_file_pattern = randomized_fasta_file_pattern, 
+                                                  randomized_sqces_slimprob_folder_pattern = randomized_sqces_slimprob_folder_pattern,
+                                                  randomized_sqces_res_file_pattern = randomized_sqces_res_file_pattern,
+                                                  randomized_sqces_log_file_pattern = randomized_sqces_log_file_pattern, 
+                                                  randomization_count = randomization_count, 
+                                                  thread_nb = thread_nb,
+                                                  maxsize = maxsize, 
+                                                  maxseq = maxseq, 
+                                                  minregion = minregion, 
+                                                  iumethod = iumethod, 
+                                                  iucut = iucut,
+                                                  extras = extras,
+                                                  pickle = pickle,
+                                                  savespace = savespace,
+                                                  packed_fasta_file = packed_fasta_file,
+                                                  scanner = scanner,
+                                                  batch_size = batch_size,
+                                                  timeout = timeout,
+                                                  retries = retries,
+                                                  manifest_file = manifest_file,
+                                                  first_iteration = first_iteration,
+                                                  scratch_folder = scratch_folder )
     print( datetime.datetime.now().strftime('%d-%m-%Y %H:%M:%S') +
            ':: INFO :: The SLiMProb subprocesses has finished (' + 
            str( round( time.time() - start_time, 2 ) ) + ' seconds)\n'  )
+    
+    # Make sure the failures are not silently ignored
+    if failed_iterations:
+        raise Exception( str( len( failed_iterations ) ) + ' randomizations failed (' + 
+                         ', '.join( map( str, failed_iterations[ :20 ] ) ) + 
+                         ( ', ...' if ( len( failed_iterations ) > 20 ) else '' ) + 
+                         '). Please see the log for more information. Starting this script again' +
+                         ' will only process the randomizations that have not succeeded.' )
     
\ No newline at end of file
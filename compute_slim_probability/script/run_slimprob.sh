@@ -74,6 +74,16 @@ echo "DEBUG :: Arguments provided $@"
 # 						 must have the same disorder state (minregion).
 # - iumethod: IUPred method to use (long/short).
 # - iucut: Float - Cut-off for IUPred results (iucut).
+# - extras: Integer - Additional output files to generate (extras, optional).
+# - pickle: T/F - Should SLiMProb save pickles (pickle, optional).
+# - savespace: Integer - Files to delete following the run (savespace, optional).
+#   NB: The extras, pickle and savespace arguments are only forwarded to 
+#       SLiMProb when they are provided, the SLiMProb defaults being used 
+#       otherwise.
+# - scratch: String - Path to a scratch folder used as temporary directory 
+#                     by the tools started (TMPDIR, optional).
+# - iucache: String - Path to the folder used as cache for the IUPred 
+#                     scores (optional).
 OPTIONS_LIST=(
   "motifs"
   "seqin"
@@ -85,6 +95,11 @@ OPTIONS_LIST=(
   "minregion"
   "iumethod"
   "iucut"
+  "extras"
+  "pickle"
+  "savespace"
+  "scratch"
+  "iucache"
 )
 
 # Parse the options
@@ -147,6 +162,31 @@ while [[ $# -gt 0 ]]; do
             iucut=$2
             shift 2
             ;;
+            
+        --extras)
+            extras=$2
+            shift 2
+            ;;
+            
+        --pickle)
+            pickle=$2
+            shift 2
+            ;;
+            
+        --savespace)
+            savespace=$2
+            shift 2
+            ;;
+            
+        --scratch)
+            scratch_dir=$2
+            shift 2
+            ;;
+
+        --iucache)
+            iupred_cache_dir=$2
+            shift 2
+            ;;
 
         *)
             break
@@ -167,6 +207,36 @@ export LANG=C.UTF-8
 export IUPred_PATH=/iupred
 export BLAST_PATH=/usr/ncbi-blast-2.7.1+/bin
 
+# Use the IUPred cache when a cache folder has been provided
+# NB: The cache is handled by a script run by SLiMProb in place 
+#     of the IUPred executable (see common/script/iupred/iupred_cache.py).
+#     As SLiMProb changes the working directory before running IUPred 
+#     (iuchdir option), the paths need to be absolute.
+iupred_executable=/$IUPred_PATH/iupred
+if [ -n "$iupred_cache_dir" ]; then
+  mkdir -p $iupred_cache_dir
+  export IUPRED_CACHE_FOLDER=$(cd $iupred_cache_dir && pwd)
+  export IUPRED_EXECUTABLE=$iupred_executable
+  iupred_executable=$(cd $(dirname $0)/../.. && pwd)/common/script/iupred/iupred_cache.py
+fi
+if [ -n "$scratch_dir" ]; then
+  export TMPDIR=$scratch_dir
+fi
+
+
+# Optional arguments
+# ------------------
+optional_args=""
+if [ -n "$extras" ]; then
+  optional_args="$optional_args extras=$extras"
+fi
+if [ -n "$pickle" ]; then
+  optional_args="$optional_args pickle=$pickle"
+fi
+if [ -n "$savespace" ]; then
+  optional_args="$optional_args savespace=$savespace"
+fi
+
 
 # Run SLiMProb
 # ------------
@@ -181,7 +251,10 @@ printf "SLiMProb will be run using the following options: \n\
              - maxseq: $maxseq \n\
              - minregion: $minregion \n\
              - iumethod: $iumethod \n\
-             - iucut: $iucut \n"
+             - iucut: $iucut \n\
+             - iucache: $iupred_cache_dir \n\
+             - scratch: $scratch_dir \n\
+             - optional arguments: $optional_args \n"
 
 python2.7 /SLiMSuite/slimsuite/tools/slimprob.py \
   motifs=$elm_motifs_parsed_file \
@@ -194,7 +267,7 @@ python2.7 /SLiMSuite/slimsuite/tools/slimprob.py \
   blastpath=$BLAST_PATH \
   blast+path=$BLAST_PATH \
   iuchdir=T \
-  iupath=/$IUPred_PATH/iupred \
+  iupath=$iupred_executable \
   walltime=0 \
   i=-1 \
   maxsize=$maxsize \
@@ -205,4 +278,5 @@ python2.7 /SLiMSuite/slimsuite/tools/slimprob.py \
   iumethod=$iumethod \
   efilter=F \
   iucut=$iucut \
-  slimcalc=IUP,Comp
+  slimcalc=IUP,Comp \
+  $optional_args
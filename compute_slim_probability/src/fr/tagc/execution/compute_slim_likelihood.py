@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import os
+import sys
 from optparse import OptionParser
 import pandas as pd
 
@@ -32,6 +33,9 @@ DEFAULT_BACKGROUND_FLAGS = [ BACKGROUND_FLAG_INTRA, BACKGROUND_FLAG_INTER ]
 # Default number of shuffling to perform
 DEFAULT_RANDOM_ITERATIONS = 10000
 
+# Header of the partial counts files
+PARTIAL_COUNTS_HEADER = [ 'motif', 'strain', 'sequence', 'viral_prot_count', 'rdm_occ', 'rdm_occ_counts' ]
+
 
 # List of options allowed
 # -----------------------
@@ -52,6 +56,14 @@ RANDOM_ITERATIONS_OPT = 'ITERATIONS_OPT'
 THREAD_NB_COUNT_OPTION = 'THREAD_NB_COUNT'
 # Distribution option
 GET_DISTRIBUTIONS_OPTION = 'GET_DISTRIBUTIONS'
+# Number of the first randomization
+FIRST_ITERATION_OPTION = 'FIRST_ITERATION'
+# Path to the partial counts file to write
+PARTIAL_COUNTS_OUTPUT_OPTION = 'PARTIAL_COUNTS_OUTPUT'
+# "Schema" of the path to the partial counts files
+PARTIAL_COUNTS_OPTION = 'PARTIAL_COUNTS'
+# Number of chunks of randomizations
+CHUNK_NB_OPTION = 'CHUNK_NB'
 
 OPTION_LIST = [ [ '-v', '--viralOcc', 'store', 'string', SLIM_NAT_OCC_PROT_OPTION, None, 'The "schema" of the path to the "natural" ("real") occurrences files. \
                                                                                           It must be a string containing "{strain}".' ],
@@ -63,7 +75,15 @@ OPTION_LIST = [ [ '-v', '--viralOcc', 'store', 'string', SLIM_NAT_OCC_PROT_OPTIO
                 [ '-s', '--strain', 'store', 'string', STRAIN_NAMES_OPTION, None, 'The comma-separated list of strains.' ],
                 [ '-n', '--shufflingNumber', 'store', 'string', RANDOM_ITERATIONS_OPT, None, 'The number of randomization performed.' ],
                 [ '-t', '--threads', 'store', 'string', THREAD_NB_COUNT_OPTION, None, 'The number of threads allocated to the SLiMProb processes.' ],
-                [ '-d', '--getDistributions', 'store', 'string', GET_DISTRIBUTIONS_OPTION, None, 'For each unique (motif, sequence) couple, get the number of occurrences for each shuffled sequence.' ] ]
+                [ '-d', '--getDistributions', 'store', 'string', GET_DISTRIBUTIONS_OPTION, None, 'For each unique (motif, sequence) couple, get the number of occurrences for each shuffled sequence.' ],
+                [ '-f', '--firstIteration', 'store', 'string', FIRST_ITERATION_OPTION, None, 'The number of the first randomization to parse (0 by default). Only used with --partialOutput.' ],
+                [ '-P', '--partialOutput', 'store', 'string', PARTIAL_COUNTS_OUTPUT_OPTION, None, 'The path to a partial counts file. When provided, the occurrence files of the \
+                                                                                                    randomizations of one single strain and background are counted and written in \
+                                                                                                    this file, instead of computing the SLiM likelihoods.' ],
+                [ '-p', '--partialCounts', 'store', 'string', PARTIAL_COUNTS_OPTION, None, 'The "schema" of the path to the partial counts files. When provided, these files \
+                                                                                            are summed instead of parsing the randomized occurrences files. It must be a string \
+                                                                                            containing "{background_flag}", "{strain}" and "{chunk}".' ],
+                [ '-c', '--chunks', 'store', 'string', CHUNK_NB_OPTION, None, 'The number of chunks of randomizations (partial counts files) of each strain. Only used with --partialCounts.' ] ]
     
 
 
@@ -78,6 +98,10 @@ OPTION_LIST = [ [ '-v', '--viralOcc', 'store', 'string', SLIM_NAT_OCC_PROT_OPTIO
 # for each viral ("real") sequence and all the occurrence files generated 
 # for each of the randomized sequences and to compute the likelihood of 
 # each SLiM existing in the viral sequences.
+# NB: When the schema of the path to the partial counts files is provided, 
+#     the occurrence files of the randomized sequences are not parsed. The 
+#     counts previously computed for each chunk of randomizations (see the
+#     compute_partial_counts() method) are summed instead.
 #
 # @param slim_occ_viral_prot_filepath: String - The "schema" of the path to the 
 #                                               viral ("real") occurrences files. 
@@ -93,31 +117,20 @@ OPTION_LIST = [ [ '-v', '--viralOcc', 'store', 'string', SLIM_NAT_OCC_PROT_OPTIO
 # @param random_iterations: Integer - The number of iterations performed
 # @param get_distributions: Boolean - Should the occurrence of motifs in shuffled 
 #                                     sequences be reported? False by default.
+# @param partial_counts_filepath: String - The "schema" of the path to the partial 
+#                                          counts files. None by default.
+#                                          NB: Must contain {background_flag}, {strain} and {chunk}
+# @param chunk_nb: Integer - The number of chunks of randomizations. None by default.
 #
 def parse_occ_files( slim_occ_viral_prot_filepath, slim_occ_random_sqces_filepath, occ_fqce_filepath, \
-                     background_flags, strains, random_iterations, thread_nb, get_distributions=False ):
+                     background_flags, strains, random_iterations, thread_nb, get_distributions=False, \
+                     partial_counts_filepath=None, chunk_nb=None ):
     
     # Instantiate a dictionary that associate to each unique (motif, strain, sequence) 
     # tuple, the number of occurrence in the "real" viral sequence.
     # i.e., Keys are (motif, strain, sequence) - 3-Tuple
     #       Values are Occurence count in viral sequence - Integer
-    slim_occ_all_viral_prot = {}
-    
-    # For each protein of each strain, get the number of occurrence 
-    # of each SLiM in its viral ("real") sequence.
-    for strain in strains:
-        
-        # For each unique (motif, sequence) couple, 
-        # get the number of occurrence of the SLiM
-        slim_occ_viral_prot = get_occ_count( ( slim_occ_viral_prot_filepath.format( strain = strain ),
-                                               strain ) )
-        
-        # Update the dictionary that register every (motif, strain, sequence) 
-        # couple existing
-        if isinstance( slim_occ_viral_prot, dict ):
-            slim_occ_all_viral_prot.update( slim_occ_viral_prot )
-        else:
-            raise slim_occ_viral_prot
+    slim_occ_all_viral_prot = get_viral_occ_counts( slim_occ_viral_prot_filepath, strains )
         
         
     # For each protein of each strain, compute the frequency at which a SLiM
@@ -144,56 +157,26 @@ def parse_occ_files( slim_occ_viral_prot_filepath, slim_occ_random_sqces_filepat
         # sequence for each SLiM. 
         
         for strain in strains:
-        
-            # First, instantiate the list of arguments to multi-process the count
-            # of time each motif has been detected on each sequence
-            get_occ_count_args = []
             
-            # Get the number of occurrences for each randomized sequences file
-            for iteration in range( random_iterations ):
-                get_occ_count_args.append( ( slim_occ_random_sqces_filepath.format( background_flag = background_flag,
-                                                                                    strain = strain,
-                                                                                    sqce_nb = iteration ),
-                                             strain ) )
-                
-            # Instantiate the pool
-            p = Pool( thread_nb )
-            slim_occ_random_sqce = p.map( get_occ_count, get_occ_count_args )
-            p.close()
-            
-            # Wait for all processes to be completed
-            p.join()
-            
-            # Check no exception has been raised by one of the process
-            for occ_count in slim_occ_random_sqce:
-                if isinstance( occ_count, Exception ):
-                    raise occ_count
+            # Sum the counts computed for each chunk of randomizations
+            if partial_counts_filepath:
+                for chunk in range( chunk_nb ):
+                    partial_counts_file = partial_counts_filepath.format( background_flag = background_flag,
+                                                                          strain = strain,
+                                                                          chunk = chunk )
+                    add_partial_counts( slim_occ_viral_prot_bckg, read_partial_counts( partial_counts_file ), 
+                                        partial_counts_file )
             
-            
-            # Add the information to the dictionary
-            for occ_count in slim_occ_random_sqce:
-                for ( key, val ) in slim_occ_viral_prot_bckg.items():
-                    if ( key[ 1 ] == strain ):
-                        # If this couple (motif, strain, sequence) has been reported
-                        # in the occurrence file, then add the number of occurrences to 
-                        # the list. This will be used to compute the empirical p-value
-                        # and to provide the distributions if asked.
-                        occ_random_count = occ_count.get( key )
-                            
-                        if ( occ_random_count ):
-                            slim_occ_viral_prot_bckg[ key ][ 2 ].append( occ_random_count )
-                        else:
-                            slim_occ_viral_prot_bckg[ key ][ 2 ].append( 0 )
-        
-        
-        # For each motif on each sequence registered in the dictionary,
-        # compute the number of times the motifs has been found at least
-        # the same number of time in the random sequences that in the 
-        # corresponding "real" sequence
-        for ( key, val ) in slim_occ_viral_prot_bckg.items():
-            occ_count_higher_than_viral_sqce = map( lambda x: x >= val[ 0 ], 
-                                                    val[ 2 ] )
-            slim_occ_viral_prot_bckg[ key ][ 1 ] = sum( occ_count_higher_than_viral_sqce )
+            # Otherwise parse the occurrence files of all the randomizations
+            else:
+                random_occ_counts = count_random_occ( slim_occ_all_viral_prot = slim_occ_all_viral_prot,
+                                                      slim_occ_random_sqces_filepath = slim_occ_random_sqces_filepath,
+                                                      background_flag = background_flag,
+                                                      strain = strain,
+                                                      first_iteration = 0,
+                                                      random_iterations = random_iterations,
+                                                      thread_nb = thread_nb )
+                add_partial_counts( slim_occ_viral_prot_bckg, random_occ_counts )
                                 
         # Compute the frequency of occurrence assuming a random distribution
         basedir = os.path.dirname( occ_fqce_filepath.format( background_flag = background_flag ) )
@@ -239,6 +222,256 @@ def parse_occ_files( slim_occ_viral_prot_filepath, slim_occ_random_sqces_filepat
                 
                 
 
+# compute_partial_counts
+# ----------------------
+#
+# This method allows to parse the occurrence files generated for a chunk 
+# of randomizations of one strain with one background and to write, for 
+# each (motif, strain, sequence) existing in the viral sequences, the 
+# number of randomized sequences in which the SLiM has been found at least 
+# the same number of time than in the viral ("real") sequence. The partial 
+# counts files of all the chunks are then summed by parse_occ_files().
+#
+# @param slim_occ_viral_prot_filepath: String - The "schema" of the path to the 
+#                                               viral ("real") occurrences files. 
+#                                               NB: Must contain {strain}
+# @param slim_occ_random_sqces_filepath: String - The "schema" of the path to the 
+#                                                 randomized occurrences files.
+#                                                 NB: Must contain {background_flag}, {strain} and {sqce_nb}
+# @param partial_counts_file: String - The path to the partial counts file to write.
+# @param background_flag: String - The background flag.
+# @param strain: String - The strain.
+# @param first_iteration: Integer - The number of the first iteration of the chunk.
+# @param random_iterations: Integer - The number of iterations of the chunk.
+# @param get_distributions: Boolean - Should the occurrence of motifs in shuffled 
+#                                     sequences be reported? False by default.
+#
+def compute_partial_counts( slim_occ_viral_prot_filepath, slim_occ_random_sqces_filepath, partial_counts_file, \
+                            background_flag, strain, first_iteration, random_iterations, thread_nb, get_distributions=False ):
+    
+    slim_occ_viral_prot = get_viral_occ_counts( slim_occ_viral_prot_filepath, [ strain ] )
+    
+    random_occ_counts = count_random_occ( slim_occ_all_viral_prot = slim_occ_viral_prot,
+                                          slim_occ_random_sqces_filepath = slim_occ_random_sqces_filepath,
+                                          background_flag = background_flag,
+                                          strain = strain,
+                                          first_iteration = first_iteration,
+                                          random_iterations = random_iterations,
+                                          thread_nb = thread_nb )
+    
+    basedir = os.path.dirname( partial_counts_file )
+    if ( basedir ) and ( not os.path.isdir( basedir ) ):
+        os.makedirs( basedir )
+    
+    with open( partial_counts_file, 'w' ) as output_file:
+        
+        output_file.write( '\t'.join( PARTIAL_COUNTS_HEADER ) + '\n' )
+        
+        for ( key, val ) in random_occ_counts.items():
+            
+            # Get the distribution of occurrences for this (motif, sequence) couple
+            if ( get_distributions ):
+                rdm_occ_distrib = ','.join( list( map( str, val[ 2 ] ) ) )
+            else:
+                rdm_occ_distrib = ''
+            
+            output_file.write( '\t'.join( list( map( str, [ key[ 0 ], key[ 1 ], key[ 2 ], val[ 0 ], 
+                                                            val[ 1 ], rdm_occ_distrib ] ) ) ) + '\n' )
+
+
+
+# get_viral_occ_counts
+# --------------------
+#
+# This method allows to get, for each protein of each strain, the number
+# of occurrence of each SLiM in its viral ("real") sequence.
+#
+# @param slim_occ_viral_prot_filepath: String - The "schema" of the path to the 
+#                                               viral ("real") occurrences files. 
+#                                               NB: Must contain {strain}
+# @param strains: List - The list of strains.
+#
+# @return slim_occ_all_viral_prot: Dictionary - A dictionary that associate to each
+#                                               unique (motif, strain, sequence) tuple
+#                                               the number of occurrence in the viral
+#                                               ("real") sequence.
+#
+# @raise Exception - When the occurrence file of a strain cannot be parsed.
+#
+def get_viral_occ_counts( slim_occ_viral_prot_filepath, strains ):
+    
+    slim_occ_all_viral_prot = {}
+    
+    for strain in strains:
+        
+        # For each unique (motif, sequence) couple, 
+        # get the number of occurrence of the SLiM
+        slim_occ_viral_prot = get_occ_count( ( slim_occ_viral_prot_filepath.format( strain = strain ),
+                                               strain ) )
+        
+        # Update the dictionary that register every (motif, strain, sequence) 
+        # couple existing
+        if isinstance( slim_occ_viral_prot, dict ):
+            slim_occ_all_viral_prot.update( slim_occ_viral_prot )
+        else:
+            raise slim_occ_viral_prot
+        
+    return slim_occ_all_viral_prot
+
+
+
+# count_random_occ
+# ----------------
+#
+# This method allows to parse the occurrence files of a range of randomizations
+# of one strain with one background and to count, for each (motif, strain, sequence)
+# existing in the viral sequences of this strain, the number of randomized sequences 
+# in which the SLiM has been found at least the same number of time than in the 
+# viral ("real") sequence.
+#
+# @param slim_occ_all_viral_prot: Dictionary - The number of occurrence of each 
+#                                              (motif, strain, sequence) in the viral 
+#                                              sequences (see get_viral_occ_counts()).
+# @param slim_occ_random_sqces_filepath: String - The "schema" of the path to the 
+#                                                 randomized occurrences files.
+#                                                 NB: Must contain {background_flag}, {strain} and {sqce_nb}
+# @param background_flag: String - The background flag.
+# @param strain: String - The strain.
+# @param first_iteration: Integer - The number of the first iteration.
+# @param random_iterations: Integer - The number of iterations.
+# @param thread_nb: Integer - The number of threads available.
+#
+# @return random_occ_counts: Dictionary - A dictionary that associate to each 
+#                                         (motif, strain, sequence) of the strain 
+#                                         a list containing the occurrence count in 
+#                                         the viral sequence, the number of shuffled
+#                                         sequences for which the motif occurrence is 
+#                                         higher than in the viral sequence and the 
+#                                         number of occurrences of the motif for each 
+#                                         shuffled sequence.
+#
+# @raise Exception - When one of the occurrence files cannot be parsed.
+#
+def count_random_occ( slim_occ_all_viral_prot, slim_occ_random_sqces_filepath, background_flag, strain, \
+                      first_iteration, random_iterations, thread_nb ):
+    
+    random_occ_counts = { key: [ val, 0, [] ] for ( key, val ) in slim_occ_all_viral_prot.items() \
+                          if ( key[ 1 ] == strain ) }
+    
+    # First, instantiate the list of arguments to multi-process the count
+    # of time each motif has been detected on each sequence
+    get_occ_count_args = []
+    
+    # Get the number of occurrences for each randomized sequences file
+    for iteration in range( first_iteration, first_iteration + random_iterations ):
+        get_occ_count_args.append( ( slim_occ_random_sqces_filepath.format( background_flag = background_flag,
+                                                                            strain = strain,
+                                                                            sqce_nb = iteration ),
+                                     strain ) )
+        
+    # Instantiate the pool
+    p = Pool( thread_nb )
+    slim_occ_random_sqce = p.map( get_occ_count, get_occ_count_args )
+    p.close()
+    
+    # Wait for all processes to be completed
+    p.join()
+    
+    # Check no exception has been raised by one of the process
+    for occ_count in slim_occ_random_sqce:
+        if isinstance( occ_count, Exception ):
+            raise occ_count
+    
+    
+    # Add the information to the dictionary
+    for occ_count in slim_occ_random_sqce:
+        for ( key, val ) in random_occ_counts.items():
+            # If this couple (motif, strain, sequence) has been reported
+            # in the occurrence file, then add the number of occurrences to 
+            # the list. This will be used to compute the empirical p-value
+            # and to provide the distributions if asked.
+            occ_random_count = occ_count.get( key, 0 )
+            
+            val[ 2 ].append( occ_random_count )
+            if ( occ_random_count >= val[ 0 ] ):
+                val[ 1 ] += 1
+    
+    return random_occ_counts
+
+
+
+# read_partial_counts
+# -------------------
+#
+# This method allows to read a partial counts file written by 
+# the compute_partial_counts() method.
+#
+# @param partial_counts_file: String - The path to the partial counts file.
+#
+# @return partial_counts: Dictionary - A dictionary that associate to each 
+#                                      (motif, strain, sequence) a list containing
+#                                      the occurrence count in the viral sequence, 
+#                                      the number of shuffled sequences for which 
+#                                      the motif occurrence is higher than in the 
+#                                      viral sequence and the number of occurrences 
+#                                      of the motif for each shuffled sequence (empty
+#                                      if the distributions have not been computed).
+#
+# @raise Exception - When the header of the file is not the one expected.
+#
+def read_partial_counts( partial_counts_file ):
+    
+    partial_counts = {}
+    
+    with open( partial_counts_file, 'r' ) as partial_file:
+        
+        header = partial_file.readline().rstrip( '\n' ).split( '\t' )
+        if ( header != PARTIAL_COUNTS_HEADER ):
+            raise Exception( 'The header of the partial counts file ' + partial_counts_file + 
+                             ' is not the one expected (' + ', '.join( PARTIAL_COUNTS_HEADER ) + ').' )
+        
+        for line in partial_file:
+            ( motif, strain, sequence, nat_occ, rdm_occ, rdm_occ_distrib ) = line.rstrip( '\n' ).split( '\t' )
+            if rdm_occ_distrib:
+                rdm_occ_distrib = list( map( int, rdm_occ_distrib.split( ',' ) ) )
+            else:
+                rdm_occ_distrib = []
+            partial_counts[ ( motif, strain, sequence ) ] = [ int( nat_occ ), int( rdm_occ ), rdm_occ_distrib ]
+    
+    return partial_counts
+
+
+
+# add_partial_counts
+# ------------------
+#
+# This method allows to add the counts computed on a range of
+# randomizations to the counts of all the randomizations.
+#
+# @param slim_occ_viral_prot_bckg: Dictionary - The counts of all the randomizations 
+#                                               (updated by this method).
+# @param partial_counts: Dictionary - The counts of the range of randomizations.
+# @param partial_counts_file: String - The path to the partial counts file (used to 
+#                                      report errors). None by default.
+#
+# @raise Exception - When a (motif, strain, sequence) does not exist in the viral 
+#                    sequences or has a different occurrence count.
+#
+def add_partial_counts( slim_occ_viral_prot_bckg, partial_counts, partial_counts_file=None ):
+    
+    for ( key, val ) in partial_counts.items():
+        
+        if ( slim_occ_viral_prot_bckg.get( key, [ None ] )[ 0 ] != val[ 0 ] ):
+            raise Exception( 'The counts of the motif ' + key[ 0 ] + ' on the sequence ' + key[ 2 ] + 
+                             ' (' + key[ 1 ] + ')' + 
+                             ( ' in the file ' + partial_counts_file if partial_counts_file else '' ) + 
+                             ' do not match the occurrences of this motif in the viral sequences.' )
+        
+        slim_occ_viral_prot_bckg[ key ][ 1 ] += val[ 1 ]
+        slim_occ_viral_prot_bckg[ key ][ 2 ].extend( val[ 2 ] )
+
+
+
 # get_occ_count
 # -------------
 #
@@ -346,7 +579,24 @@ if __name__ == '__main__':
         raise Exception( 'The "schema" of the path to the viral ("real") occurrences files' +
                          ' has to be provided.' )
     
+    # Get the path to the partial counts file to write
+    partial_counts_file = option_dict.get( PARTIAL_COUNTS_OUTPUT_OPTION )
+    
+    # Get the "schema" of the path to the partial counts files to sum
+    partial_counts_filepath = option_dict.get( PARTIAL_COUNTS_OPTION )
+    if partial_counts_filepath:
+        partial_counts_filepath = partial_counts_filepath.replace( '[', '{' ).replace( ']', '}' )
+        if ( ( '{background_flag}' not in partial_counts_filepath )
+             or ( '{strain}' not in partial_counts_filepath )
+             or ( '{chunk}' not in partial_counts_filepath ) ):
+            raise Exception( 'The "schema" of the path to the partial counts files' +
+                             ' has to contain "{background_flag}", "{strain}" and "{chunk}".' )
+        if partial_counts_file:
+            raise Exception( 'The partial counts files cannot be summed when a partial counts' +
+                             ' file has to be written.' )
+    
     # Get the "schema" of the path to the randomized occurrences files
+    # NB: These files are not necessary when the partial counts files are summed
     slim_occ_random_sqces_filepath = option_dict.get( SLIM_RANDOM_OCC_SQCES_OPTION )
     if slim_occ_random_sqces_filepath:
         slim_occ_random_sqces_filepath = slim_occ_random_sqces_filepath.replace( '[', '{' ).replace( ']', '}' )
@@ -355,17 +605,18 @@ if __name__ == '__main__':
              or ( '{sqce_nb}' not in slim_occ_random_sqces_filepath ) ):
             raise Exception( 'The "schema" of the path to the randomized occurrences files' +
                              ' has to contain "{background_flag}", "{strain}" and "{sqce_nb}".' )
-    else:
+    elif ( not partial_counts_filepath ):
         raise Exception( 'The "schema" of the path to the randomized occurrences files' +
                          ' has to be provided.' )
     
     # Get the "schema" of the path to the output file, containing the SLiM likelihood
+    # NB: This file is not necessary when a partial counts file has to be written
     occ_fqce_filepath = option_dict.get( SLIM_LIKELIHOOD_OUTPUT_OPTION )
     if occ_fqce_filepath:
         occ_fqce_filepath = occ_fqce_filepath.replace( '[', '{' ).replace( ']', '}' )
         if ( '{background_flag}' not in occ_fqce_filepath ):
             raise Exception( 'The "schema" of the path to the output file has to contain "{background_flag}".' )
-    else:
+    elif ( not partial_counts_file ):
         raise Exception( 'The "schema" of the path to the output file has to be provided.' )
     
     # Get the background flags 
@@ -417,6 +668,51 @@ if __name__ == '__main__':
             raise Exception( 'The get_distributions option (' + str( get_distributions ) + 
                              ') has to be a boolean.' )
     
+    # Get the number of the first randomization
+    first_iteration = option_dict.get( FIRST_ITERATION_OPTION )
+    if first_iteration:
+        try:
+            first_iteration = int( first_iteration )
+        except:
+            raise Exception( 'The number of the first randomization has to be an integer.' )
+        else:
+            if ( first_iteration < 0 ):
+                raise Exception( 'The number of the first randomization has to be a positive integer.' )
+    else:
+        first_iteration = 0
+    
+    # Get the number of chunks
+    chunk_nb = option_dict.get( CHUNK_NB_OPTION )
+    if partial_counts_filepath:
+        try:
+            chunk_nb = int( chunk_nb )
+        except:
+            raise Exception( 'The number of chunks has to be provided as an integer when the' +
+                             ' partial counts files are summed.' )
+        else:
+            if ( chunk_nb <= 0 ):
+                raise Exception( 'The number of chunks has to be a positive integer.' )
+    
+    # Count the occurrences for a chunk of randomizations
+    if partial_counts_file:
+        if ( ( len( background_flags ) != 1 ) or ( len( strains ) != 1 ) ):
+            raise Exception( 'One single background and one single strain have to be provided' +
+                             ' in order to write a partial counts file.' )
+        
+        print( 'INFO :: Starting to count the SLiM occurrences in the randomizations ' + 
+               str( first_iteration ) + ' to ' + str( first_iteration + random_iterations - 1 ) + '.' )
+        compute_partial_counts( slim_occ_viral_prot_filepath = slim_occ_viral_prot_filepath,
+                                slim_occ_random_sqces_filepath = slim_occ_random_sqces_filepath,
+                                partial_counts_file = partial_counts_file,
+                                background_flag = background_flags[ 0 ],
+                                strain = strains[ 0 ],
+                                first_iteration = first_iteration,
+                                random_iterations = random_iterations,
+                                thread_nb = thread_nb,
+                                get_distributions = get_distributions )
+        print( 'INFO :: The SLiM occurrences have been counted.' )
+        sys.exit( 0 )
+    
     # Compute the SLiM likelihoods
     print( 'INFO :: Starting to compute the SLiM probabilities.' )
     parse_occ_files( slim_occ_viral_prot_filepath = slim_occ_viral_prot_filepath, 
@@ -426,7 +722,9 @@ if __name__ == '__main__':
                      strains = strains, 
                      random_iterations = random_iterations,
                      thread_nb = thread_nb,
-                     get_distributions = get_distributions )
+                     get_distributions = get_distributions,
+                     partial_counts_filepath = partial_counts_filepath,
+                     chunk_nb = chunk_nb )
     print( 'INFO :: The SLiM probabilities have been computed.' )
 
     
\ No newline at end of file
@@ -1,12 +1,11 @@
 #!/usr/bin/python2.7
 
 import os, sys, string
+import shutil
 from optparse import OptionParser
 import fileinput
 import random
 
-from math import floor
-
 from multiprocessing import Pool
 
 
@@ -86,6 +85,28 @@ DEFAULT_ITERATIONS = 1000
 # Default maximum number of files generated by a single process
 DEFAULT_MAX_FILES_PER_PROCESS = 1000
 
+# Number of tasks to create for each thread when the residue budget
+# of the tasks is not provided. Creating several tasks per thread
+# allows the Pool to balance the work between the processes.
+DEFAULT_TASKS_PER_THREAD = 4
+
+## Output formats
+# - fasta: one fasta file per iteration ({strain}_random_{n}.fasta)
+# - packed: one fasta file containing all the iterations of a (background, strain) 
+#           couple ({strain}_random.packed.fasta) together with an index providing
+#           for each iteration the offset (in bytes) and the length of its records
+#           ({strain}_random.packed.fasta.idx)
+OUTPUT_FORMAT_FASTA = "fasta"
+OUTPUT_FORMAT_PACKED = "packed"
+DEFAULT_OUTPUT_FORMAT = OUTPUT_FORMAT_FASTA
+
+PACKED_FASTA_SUFFIX = "_random.packed.fasta"
+PACKED_INDEX_EXTENSION = ".idx"
+PACKED_INDEX_HEADER = "Iteration\tOffset\tLength\n"
+
+## Manifest listing the randomized sequences files generated
+MANIFEST_HEADER = "Background\tStrain\tFile\n"
+
 ## List of options allowed
 # Path to masked fasta files folder
 MASKED_FASTA_INPUT_FOLDER_OPTION = "MASKED_FASTA_INPUT_FOLDER"
@@ -105,6 +126,16 @@ BACKGROUND_CODE_OPTION = "BACKGROUND_CODE"
 MAXIMUM_FILES_GENERATED_OPTION = "MAXIMUM_FILES_GENERATED"
 # Number of threads available
 THREAD_NB_COUNT_OPTION = "THREAD_NB_COUNT"
+# Format of the randomized sequences files
+OUTPUT_FORMAT_OPTION = "OUTPUT_FORMAT"
+# Maximum number of residues to shuffle by one process
+MAXIMUM_RESIDUES_OPTION = "MAXIMUM_RESIDUES"
+# Only print the plan of the randomization
+DRY_RUN_OPTION = "DRY_RUN"
+# Number of the first iteration to perform
+FIRST_ITERATION_OPTION = "FIRST_ITERATION"
+# Path to the manifest file
+MANIFEST_FILE_OPTION = "MANIFEST_FILE"
 
 OPTION_LIST = [ [ "-i", "--input", "store", "string", MASKED_FASTA_INPUT_FOLDER_OPTION, None, "The path of the folder containing fasta masked files." ],
                 [ "-d", "--disorder", "store", "string", DISORDER_CONTENT_FOLDER_OPTION, None, "The path of the folder where the disorder files have to be written." ],
@@ -117,7 +148,18 @@ OPTION_LIST = [ [ "-i", "--input", "store", "string", MASKED_FASTA_INPUT_FOLDER_
                                                                                                                                    BACKGROUND_CODE_INTER_ONLY + ": inter background only)." +
                                                                                                                                    BACKGROUND_CODE_INTRA_AND_INTER + ": both intra and inter backgrounds)." ) ],
                 [ '-t', '--threads', 'store', 'string', THREAD_NB_COUNT_OPTION, None, 'The number of threads allocated to the SLiMProb processes.' ],
-                [ "-m", "--maxFiles", "store", "string", MAXIMUM_FILES_GENERATED_OPTION, None, "The maximum number of files generated by a single process." ] ]
+                [ "-m", "--maxFiles", "store", "string", MAXIMUM_FILES_GENERATED_OPTION, None, "The maximum number of files generated by a single process." ],
+                [ "-f", "--outputFormat", "store", "string", OUTPUT_FORMAT_OPTION, None, ( "The format of the randomized sequences files (" + OUTPUT_FORMAT_FASTA + ": one fasta file per iteration, " +
+                                                                                           OUTPUT_FORMAT_PACKED + ": one indexed fasta file per background and strain). " + 
+                                                                                           DEFAULT_OUTPUT_FORMAT + " by default." ) ],
+                [ "-R", "--maxResidues", "store", "string", MAXIMUM_RESIDUES_OPTION, None, ( "The maximum number of residues shuffled by a single process. By default, " +
+                                                                                             "the total number of residues is split in " + str( DEFAULT_TASKS_PER_THREAD ) +
+                                                                                             " tasks per thread." ) ],
+                [ "-D", "--dryRun", "store_true", None, DRY_RUN_OPTION, False, "Print the plan of the randomization (tasks, iterations and residues) and exit." ],
+                [ "-F", "--firstIteration", "store", "string", FIRST_ITERATION_OPTION, None, ( "The number of the first iteration to perform (0 by default). " +
+                                                                                             "This allows to split the randomizations between several jobs." ) ],
+                [ "-M", "--manifest", "store", "string", MANIFEST_FILE_OPTION, None, "The path of a file listing the randomized sequences files generated. This file is \
+                                                                                      written once all the files have been generated. Leave empty if you do not intend to generate it." ] ]
 
 
 
@@ -133,22 +175,40 @@ def randomize(arg_list):
       sequence_dict,
       disorder_background,
       background_flag,
-      multiplier ) = arg_list
+      first_iteration,
+      output_format ) = arg_list
 
     ## this function takes as input the sequence positions dictionaries, the reference
     ## background of disordered residues and the number of iterations.
+    ##
+    ## When the packed output format is used, all the iterations are written in a 
+    ## single (partial) file and the list of (iteration, offset, length) of each
+    ## iteration in this file is returned, so main() can merge the partial files.
     
     print strain,background_flag
     
+    ## the random generator is seeded again for each task, as the processes
+    ## forked by the Pool otherwise all start with the same state.
+    random.seed()
+    
+    strain_folder = os.path.join( randomized_sequences_folder, background_flag, strain)
+    if not os.path.isdir(strain_folder):
+        os.makedirs(strain_folder)
+    
+    packed_index = []
+    if ( output_format == OUTPUT_FORMAT_PACKED ):
+        part_file_path = os.path.join( strain_folder, 
+                                       strain + PACKED_FASTA_SUFFIX + '.part_' + str( first_iteration ) )
+        output = open( part_file_path, 'w')
+    
     for n in range(iterations):
     
-        if not os.path.isdir(os.path.join( randomized_sequences_folder, background_flag, strain)):
-            os.makedirs(os.path.join( randomized_sequences_folder, background_flag, strain))
-        output = open( os.path.join( randomized_sequences_folder, 
-                                     background_flag, 
-                                     strain, 
-                                     strain + '_random_' + str( iterations * multiplier + n) + '.fasta'
-                                     ), 'w')
+        if ( output_format == OUTPUT_FORMAT_PACKED ):
+            iteration_offset = output.tell()
+        else:
+            output = open( os.path.join( strain_folder, 
+                                         strain + '_random_' + str( first_iteration + n) + '.fasta'
+                                         ), 'w')
         
         #print sequence_disorder_dict
         
@@ -205,12 +265,202 @@ def randomize(arg_list):
             ## strain and iteration
             output.write('>'+seq+'\n'+random_sequence+'\n')
         
+        if ( output_format == OUTPUT_FORMAT_PACKED ):
+            packed_index.append( ( first_iteration + n, 
+                                   iteration_offset, 
+                                   output.tell() - iteration_offset ) )
+        else:
+            output.close()
+    
+    if ( output_format == OUTPUT_FORMAT_PACKED ):
         output.close()
+        return ( background_flag, strain, part_file_path, packed_index )
+    
+    return None
+
+
+
+## write_packed_files
+#  ------------------
+#
+# This function merges the partial packed files generated by the randomize() 
+# processes into one single packed fasta file for each (background, strain) couple
+# and writes the index associated with this file.
+#
+# @param packed_parts: List - The list of (background_flag, strain, part_file_path, packed_index)
+#                             tuples returned by the randomize() function.
+# @param randomized_sequences_folder: String - The path to the randomized sequences folder.
+#
+def write_packed_files( packed_parts, randomized_sequences_folder ):
+    
+    # Group the partial files by (background, strain) couple
+    parts_by_strain = {}
+    for ( background_flag, strain, part_file_path, packed_index ) in packed_parts:
+        parts_by_strain.setdefault( ( background_flag, strain ), [] ).append( ( packed_index, part_file_path ) )
+    
+    for ( ( background_flag, strain ), parts ) in parts_by_strain.items():
+        
+        packed_file_path = os.path.join( randomized_sequences_folder, 
+                                         background_flag, 
+                                         strain, 
+                                         strain + PACKED_FASTA_SUFFIX )
+        
+        # Concatenate the partial files in the order of the iterations,
+        # and shift the offsets of the partial indexes accordingly
+        parts.sort( key = lambda part: part[0][0][0] if part[0] else -1 )
+        
+        packed_file = open( packed_file_path, 'wb' )
+        index_file = open( packed_file_path + PACKED_INDEX_EXTENSION, 'w' )
+        index_file.write( PACKED_INDEX_HEADER )
         
+        for ( packed_index, part_file_path ) in parts:
+            part_offset = packed_file.tell()
+            with open( part_file_path, 'rb' ) as part_file:
+                shutil.copyfileobj( part_file, packed_file )
+            for ( iteration, offset, length ) in packed_index:
+                index_file.write( str( iteration ) + '\t' + str( part_offset + offset ) + '\t' + str( length ) + '\n' )
+            os.remove( part_file_path )
+        
+        packed_file.close()
+        index_file.close()
+        
+
+
+## write_manifest
+#  --------------
+#
+# This function writes the list of the randomized sequences files generated
+# for each (background, strain) couple. The manifest is first written in a 
+# temporary file, so it is only available once complete.
+#
+# @param tasks: List - The list of (background_flag, strain, first_iteration, iterations, residues)
+#                      tasks performed (see plan_randomization()).
+# @param randomized_sequences_folder: String - The path to the randomized sequences folder.
+# @param output_format: String - The format of the randomized sequences files.
+# @param manifest_file_path: String - The path to the manifest file.
+#
+def write_manifest( tasks, randomized_sequences_folder, output_format, manifest_file_path ):
+    
+    manifest_tmp_file_path = manifest_file_path + '.tmp'
+    manifest_file = open( manifest_tmp_file_path, 'w' )
+    manifest_file.write( MANIFEST_HEADER )
+    
+    packed_strains = set()
+    for ( background_flag, strain, first_iteration, iterations, residues ) in tasks:
+        
+        strain_folder = os.path.join( randomized_sequences_folder, background_flag, strain )
+        
+        if ( output_format == OUTPUT_FORMAT_PACKED ):
+            if ( ( background_flag, strain ) in packed_strains ):
+                continue
+            packed_strains.add( ( background_flag, strain ) )
+            packed_file_path = os.path.join( strain_folder, strain + PACKED_FASTA_SUFFIX )
+            file_paths = [ packed_file_path, packed_file_path + PACKED_INDEX_EXTENSION ]
+        else:
+            file_paths = [ os.path.join( strain_folder, strain + '_random_' + str( n ) + '.fasta' ) 
+                           for n in xrange( first_iteration, first_iteration + iterations ) ]
+        
+        for file_path in file_paths:
+            manifest_file.write( background_flag + '\t' + strain + '\t' + file_path + '\n' )
+    
+    manifest_file.close()
+    os.rename( manifest_tmp_file_path, manifest_file_path )
+        
+
+
+## plan_randomization
+#  ------------------
+#
+# This function splits the randomization of each (background, strain) couple into
+# tasks of contiguous, non-overlapping iteration ranges covering 
+# [first_iteration, first_iteration + iterations[.
+# The tasks are sized according to the number of residues they have to shuffle, 
+# so strains with long sequences are split into more tasks than the others. The
+# tasks are returned sorted by decreasing number of residues, so the largest tasks
+# are started first by the Pool.
+#
+# @param strain_residue_dict: Dictionary - The number of residues of each strain.
+# @param background_flags: List - The backgrounds to use.
+# @param iterations: Integer - The number of iterations to perform.
+# @param thread_nb: Integer - The number of threads available.
+# @param max_files_per_process: Integer - The maximum number of iterations of a task.
+# @param max_residues_per_process: Integer - The maximum number of residues shuffled by a 
+#                                            task (computed from the number of threads if None).
+# @param first_iteration: Integer - The number of the first iteration (0 by default).
+#
+# @return tasks: List - The list of (background_flag, strain, first_iteration, iterations_nb, residues).
+#
+def plan_randomization( strain_residue_dict, background_flags, iterations, thread_nb, \
+                        max_files_per_process, max_residues_per_process = None, first_iteration = 0 ):
+    
+    # Define the residue budget of a task
+    if not max_residues_per_process:
+        total_residues = sum( strain_residue_dict.values() ) * iterations * len( background_flags )
+        task_count = thread_nb * DEFAULT_TASKS_PER_THREAD
+        max_residues_per_process = max( 1, int( ( total_residues + task_count - 1 ) / task_count ) )
+    
+    tasks = []
+    
+    for background_flag in background_flags:
+        for strain in sorted( strain_residue_dict.keys() ):
+            
+            residues_per_iteration = strain_residue_dict[strain]
+            
+            # Number of iterations of the larger tasks of this strain
+            if ( residues_per_iteration > 0 ):
+                iterations_per_task = max( 1, int( max_residues_per_process / residues_per_iteration ) )
+            else:
+                iterations_per_task = iterations
+            if max_files_per_process:
+                iterations_per_task = min( iterations_per_task, max_files_per_process )
+            
+            # Split the iterations evenly in contiguous ranges
+            task_count = int( ( iterations + iterations_per_task - 1 ) / iterations_per_task )
+            ( base_size, extra ) = divmod( iterations, task_count )
+            
+            task_first_iteration = first_iteration
+            for k in range( task_count ):
+                iterations_nb = base_size + ( 1 if k < extra else 0 )
+                tasks.append( ( background_flag, 
+                                strain, 
+                                task_first_iteration, 
+                                iterations_nb, 
+                                iterations_nb * residues_per_iteration ) )
+                task_first_iteration += iterations_nb
+    
+    tasks.sort( key = lambda task: task[4], reverse = True )
+    
+    return tasks
+
+
+
+## print_randomization_plan
+#  ------------------------
+#
+# This function prints the plan of the randomization computed by plan_randomization().
+#
+# @param tasks: List - The list of tasks.
+# @param thread_nb: Integer - The number of threads available.
+#
+def print_randomization_plan( tasks, thread_nb ):
+    
+    print 'randomization plan:'
+    print 'Background\tStrain\tFirst_iteration\tLast_iteration\tIterations\tResidues'
+    for ( background_flag, strain, first_iteration, iterations_nb, residues ) in sorted( tasks ):
+        print ( background_flag + '\t' + strain + '\t' + str( first_iteration ) + '\t' + 
+                str( first_iteration + iterations_nb - 1 ) + '\t' + str( iterations_nb ) + '\t' + str( residues ) )
+    
+    total_residues = sum( [ task[4] for task in tasks ] )
+    print ( str( len( tasks ) ) + ' tasks, ' + str( total_residues ) + ' residues, ' + 
+            str( thread_nb ) + ' threads (' + str( total_residues / max( 1, thread_nb ) ) + ' residues per thread, ' +
+            'largest task: ' + str( tasks[0][4] if tasks else 0 ) + ' residues)' )
+
 
 
 def main( masked_fasta_input_folder, disorder_content_folder, randomized_sequences_folder, \
-          strains, iterations, background_code, thread_nb, max_files_per_process):
+          strains, iterations, background_code, thread_nb, max_files_per_process, \
+          output_format = DEFAULT_OUTPUT_FORMAT, max_residues_per_process = None, dry_run = False, \
+          first_iteration = 0, manifest_file_path = None ):
         
     # Dictionaries to store strain-level data
     strain_fragment_dict = {}
@@ -235,8 +485,10 @@ def main( masked_fasta_input_folder, disorder_content_folder, randomized_sequenc
         masked_sequences = open( os.path.join( masked_fasta_input_folder, strain+'.FreqDis.masked.fas'), 'r')
 
         ## Output file for storing disorder fractions.
-        disorder_file = open( os.path.join( disorder_content_folder, strain+'_iupred.txt'), 'w')
-        disorder_file.write('Strain\tUniProt_ID\tUniProt_AC\tdisorder_fraction\n')
+        ## NB: The disorder content is not written when no folder is provided.
+        if disorder_content_folder:
+            disorder_file = open( os.path.join( disorder_content_folder, strain+'_iupred.txt'), 'w')
+            disorder_file.write('Strain\tUniProt_ID\tUniProt_AC\tdisorder_fraction\n')
         
         ## processing the "true" sequence FASTA file
                     
@@ -327,13 +579,14 @@ def main( masked_fasta_input_folder, disorder_content_folder, randomized_sequenc
         strain_position_dict[strain] = sequence_position_dict
         
         ## writing disorder content to file
-        for disorder_fraction_id in disorder_fraction_dict:
-        
-            disorder_fraction = disorder_fraction_dict[disorder_fraction_id]
-        
-            disorder_file.write(strain+'\t'+disorder_fraction_id+'\t'+str(disorder_fraction)+'\n')
+        if disorder_content_folder:
+            for disorder_fraction_id in disorder_fraction_dict:
+            
+                disorder_fraction = disorder_fraction_dict[disorder_fraction_id]
             
-        disorder_file.close()
+                disorder_file.write(strain+'\t'+disorder_fraction_id+'\t'+str(disorder_fraction)+'\n')
+                
+            disorder_file.close()
 
         #print sequence_fragment_dict
         #print disorder_fraction_dict
@@ -352,64 +605,67 @@ def main( masked_fasta_input_folder, disorder_content_folder, randomized_sequenc
     # Perform the randomization
     # -------------------------
         
-    dividend = int( floor( iterations / max_files_per_process ) )
-    remainder = iterations % max_files_per_process
+    ## The iterations of each (background, strain) couple are split into contiguous
+    ## ranges, sized according to the number of residues to shuffle.
     
-    iteration_multiplier_couples = []
+    background_flags = []
+    if ( background_code in [BACKGROUND_CODE_INTRA_ONLY, BACKGROUND_CODE_INTRA_AND_INTER]):
+        background_flags.append( BACKGROUND_FLAG_INTRA )
+    if ( background_code in [BACKGROUND_CODE_INTER_ONLY, BACKGROUND_CODE_INTRA_AND_INTER]):
+        background_flags.append( BACKGROUND_FLAG_INTER )
     
-    if ( iterations < max_files_per_process ):
-        iteration_multiplier_couples.append( ( iterations, 0 ) )
-    else:
-        for k in range( dividend ):
-            iteration_multiplier_couples.append( ( max_files_per_process, k ) )
-        if ( remainder != 0 ):
-            iteration_multiplier_couples.append( ( remainder, dividend + 1 ) )
+    strain_residue_dict = {}
+    for s in strain_position_dict:
+        strain_residue_dict[s] = sum( [ len( positions ) for positions in strain_position_dict[s].values() ] )
     
+    tasks = plan_randomization( strain_residue_dict, background_flags, iterations, thread_nb, 
+                                max_files_per_process, max_residues_per_process, first_iteration )
+    
+    print_randomization_plan( tasks, thread_nb )
+    
+    if dry_run:
+        return
     
     # Instantiate the list of arguments
     randomize_args = []
     
-    for ( iterations_nb, multiplier ) in iteration_multiplier_couples:
-        
-        for s in strain_position_dict:
+    for ( background_flag, s, first_iteration, iterations_nb, residues ) in tasks:
         
-            ## The randomisation function is called twice per background model. 
-            ## Nothing is returned to main()
-            ##
-            ## TODO: this could be optimised, although not necessary for DIME (only one 
-            ## threshold is used.
-            
-            ## background intra-strain (pick the specific background for each strain)
-            if ( background_code in [BACKGROUND_CODE_INTRA_ONLY, BACKGROUND_CODE_INTRA_AND_INTER]):
-                randomize_args.append( ( iterations_nb,
-                                         randomized_sequences_folder,
-                                         s,
-                                         strain_fragment_dict[s],
-                                         strain_position_dict[s],
-                                         background_disorder_intra_dict[s],
-                                         BACKGROUND_FLAG_INTRA,
-                                         multiplier
-                                        ) )
+        ## background intra-strain (pick the specific background for each strain)
+        ## or background inter-strain
+        if ( background_flag == BACKGROUND_FLAG_INTRA ):
+            disorder_background = background_disorder_intra_dict[s]
+        else:
+            disorder_background = background_disorder_inter
         
-            ## background inter_strain
-            if ( background_code in [BACKGROUND_CODE_INTER_ONLY, BACKGROUND_CODE_INTRA_AND_INTER]):
-                randomize_args.append( ( iterations_nb,
-                                         randomized_sequences_folder,
-                                         s,
-                                         strain_fragment_dict[s],
-                                         strain_position_dict[s],
-                                         background_disorder_inter,
-                                         BACKGROUND_FLAG_INTER,
-                                         multiplier
-                                        ) )
+        randomize_args.append( ( iterations_nb,
+                                 randomized_sequences_folder,
+                                 s,
+                                 strain_fragment_dict[s],
+                                 strain_position_dict[s],
+                                 disorder_background,
+                                 background_flag,
+                                 first_iteration,
+                                 output_format
+                                ) )
         
     # Instantiate the pool
     p = Pool( thread_nb )
-    p.map( randomize, randomize_args )
+    # NB: The tasks are provided one by one to the processes, in order
+    #     to keep the largest tasks at the beginning of the queue
+    packed_parts = p.map( randomize, randomize_args, 1 )
     p.close()
     
     # Wait for all processes to be completed
     p.join()
+    
+    # Merge the partial packed files and write their index
+    if ( output_format == OUTPUT_FORMAT_PACKED ):
+        write_packed_files( packed_parts, randomized_sequences_folder )
+    
+    # List the files generated
+    if manifest_file_path:
+        write_manifest( tasks, randomized_sequences_folder, output_format, manifest_file_path )
             
 
 
@@ -436,15 +692,20 @@ if __name__ == '__main__':
     # Get the path of the output directories 
     # - Directory in which files that report the disorder content 
     #   for each protein of each strain have to be written.
+    #   NB: The disorder content is not written if this option is not provided.
     disorder_content_folder = option_dict[DISORDER_CONTENT_FOLDER_OPTION]
-    if not os.path.isdir(disorder_content_folder):
+    if disorder_content_folder and not os.path.isdir(disorder_content_folder):
         os.makedirs(disorder_content_folder)
     
     # - Directory in which fasta files containing randomized sequences
     #   for each protein of each strain have to be written.
+    #   NB: This option is not necessary when only the plan of the randomization is printed.
     randomized_sequences_folder = option_dict[RANDOMIZED_SEQUENCE_FOLDER_OPTION]
-    if not os.path.isdir(randomized_sequences_folder):
-        os.makedirs(randomized_sequences_folder)
+    if randomized_sequences_folder:
+        if not os.path.isdir(randomized_sequences_folder):
+            os.makedirs(randomized_sequences_folder)
+    elif not option_dict[DRY_RUN_OPTION]:
+        exit( "The path of the folder where the randomized fasta files have to be written has to be provided.")
      
      
     # Get the strain names
@@ -499,9 +760,55 @@ if __name__ == '__main__':
     else:
         max_files_per_process = DEFAULT_MAX_FILES_PER_PROCESS
     
+    # Get the format of the randomized sequences files
+    output_format = option_dict[OUTPUT_FORMAT_OPTION]
+    if output_format:
+        if ( output_format not in [OUTPUT_FORMAT_FASTA, OUTPUT_FORMAT_PACKED] ):
+            raise Exception( "The output format selected ("+ output_format + ") is not allowed.")
+    else:
+        output_format = DEFAULT_OUTPUT_FORMAT
+    
+    # Get the maximum number of residues to shuffle per process
+    max_residues_per_process = option_dict[MAXIMUM_RESIDUES_OPTION]
+    if max_residues_per_process:
+        try:
+            max_residues_per_process = int(max_residues_per_process)
+        except:
+            raise Exception( "The maximum number of residues shuffled by process must be an integer.")
+        else:
+            if ( max_residues_per_process <= 0 ):
+                raise Exception( "The maximum number of residues shuffled by process must be a positive integer.")
+    
+    dry_run = option_dict[DRY_RUN_OPTION]
+    
+    # Get the number of the first iteration to perform
+    first_iteration = option_dict[FIRST_ITERATION_OPTION]
+    if first_iteration:
+        try:
+            first_iteration = int(first_iteration)
+        except:
+            raise Exception( "The number of the first iteration must be an integer.")
+        else:
+            if ( first_iteration < 0 ):
+                raise Exception( "The number of the first iteration must be a positive integer.")
+    else:
+        first_iteration = 0
+    
+    # Get the path of the manifest file
+    # NB: The manifest is not written if this option is not provided.
+    manifest_file_path = option_dict[MANIFEST_FILE_OPTION]
+    if manifest_file_path:
+        basedir = os.path.dirname(manifest_file_path)
+        if basedir and not os.path.isdir(basedir):
+            os.makedirs(basedir)
+    
     ## main function is called.
     main( masked_fasta_input_folder, disorder_content_folder, randomized_sequences_folder, \
-          strains, iterations, background_code, thread_nb, max_files_per_process)
+          strains, iterations, background_code, thread_nb, max_files_per_process, output_format, \
+          max_residues_per_process, dry_run, first_iteration, manifest_file_path)
+    
+    if dry_run:
+        sys.exit( 0 )
     
     ## Create a placeholder empty file
     ## NB: This placeholder may be necessary to use the current script 
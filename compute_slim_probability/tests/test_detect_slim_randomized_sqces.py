@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'script' ) )
+
+from detect_slim_randomized_sqces import scan_sequence
+
+
+# get_motifs
+# ----------
+#
+# Compile the patterns the same way as parse_elm_motifs does.
+#
+def get_motifs( patterns ):
+    
+    return [ ( motif, pattern, re.compile( '(?=(' + pattern + '))' ) ) for ( motif, pattern ) in patterns ]
+
+
+
+def test_anchored_motifs_only_match_at_the_termini():
+    
+    motifs = get_motifs( [ ( 'NTERM', '^M..' ), ( 'CTERM', '..L$' ), ( 'SA', 'SA' ) ] )
+    occurrences = scan_sequence( 'MAAXXXXSAVXXXXMKKSAL', motifs )
+    
+    assert occurrences == [ ( 'NTERM', '^M..', 1, 3, 'MAA' ),
+                            ( 'CTERM', '..L$', 18, 20, 'SAL' ),
+                            ( 'SA', 'SA', 8, 9, 'SA' ),
+                            ( 'SA', 'SA', 18, 19, 'SA' ) ]
+
+
+
+def test_occurrences_overlapping_a_masked_residue_are_discarded():
+    
+    motifs = get_motifs( [ ( 'AXS', 'A.S' ), ( 'KK', 'K+' ) ] )
+    occurrences = scan_sequence( 'AXSKKXK', motifs )
+    
+    assert occurrences == [ ( 'KK', 'K+', 4, 5, 'KK' ),
+                            ( 'KK', 'K+', 5, 5, 'K' ),
+                            ( 'KK', 'K+', 7, 7, 'K' ) ]
@@ -86,6 +86,8 @@ echo "DEBUG :: Arguments provided $@"
 # 						 must have the same disorder state (minregion).
 # - iumethod: IUPred method to use (long/short).
 # - iucut: Float - Cut-off for IUPred results (iucut).
+# - iucache: String - Path to the folder used as cache for the IUPred 
+#                     scores (optional).
 OPTIONS_LIST=(
   "consMode"
   "motifs"
@@ -100,6 +102,7 @@ OPTIONS_LIST=(
   "minregion"
   "iumethod"
   "iucut"
+  "iucache"
 )
 
 # Parse the options
@@ -179,6 +182,11 @@ while [[ $# -gt 0 ]]; do
             shift 2
             ;;
 
+        --iucache)
+            iupred_cache_dir=$2
+            shift 2
+            ;;
+
         *)
             break
             ;;
@@ -198,6 +206,19 @@ export LANG=C.UTF-8
 export IUPred_PATH=/iupred
 export BLAST_PATH=/usr/ncbi-blast-2.7.1+/bin
 
+# Use the IUPred cache when a cache folder has been provided
+# NB: The cache is handled by a script run by SLiMProb in place 
+#     of the IUPred executable (see common/script/iupred/iupred_cache.py).
+#     As SLiMProb changes the working directory before running IUPred 
+#     (iuchdir option), the paths need to be absolute.
+iupred_executable=/$IUPred_PATH/iupred
+if [ -n "$iupred_cache_dir" ]; then
+  mkdir -p $iupred_cache_dir
+  export IUPRED_CACHE_FOLDER=$(cd $iupred_cache_dir && pwd)
+  export IUPRED_EXECUTABLE=$iupred_executable
+  iupred_executable=$(cd $(dirname $0)/../.. && pwd)/common/script/iupred/iupred_cache.py
+fi
+
 
 # Run SLiMProb
 # ------------
@@ -214,7 +235,8 @@ printf "SLiMProb will be run using the following options: \n\
              - maxseq: $maxseq \n\
              - minregion: $minregion \n\
              - iumethod: $iumethod \n\
-             - iucut: $iucut \n"
+             - iucut: $iucut \n\
+             - iucache: $iupred_cache_dir \n"
 
 if [ $conservation_mode ]
 then
@@ -231,7 +253,7 @@ then
     blastpath=$BLAST_PATH \
     blast+path=$BLAST_PATH \
     iuchdir=T \
-    iupath=/$IUPred_PATH/iupred \
+    iupath=$iupred_executable \
     walltime=0 \
     i=-1 \
     maxsize=$maxsize \
@@ -262,7 +284,7 @@ else
     blastpath=$BLAST_PATH \
     blast+path=$BLAST_PATH \
     iuchdir=T \
-    iupath=/$IUPred_PATH/iupred \
+    iupath=$iupred_executable \
     walltime=0 \
     i=-1 \
     maxsize=$maxsize \
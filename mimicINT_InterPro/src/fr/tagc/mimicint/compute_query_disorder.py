@@ -2,12 +2,35 @@
 # -*- coding: utf-8 -*-
 
 import os
+import itertools
+import concurrent.futures
+from collections import OrderedDict
 
+import numpy as np
+
+from fr.tagc.mimicint.parsing_scripts.fan_out_duplicate_sequences import get_headers_of_unique_sqce
 from fr.tagc.mimicint.util.option.OptionManager import *
 
 # This script allows to generate a file containing the
 # disordered propensity and amino acid disorder 
 # scores (IUPred) for all query sequences.
+#
+# The IUPred scores of the amino acids are written in the last
+# column of the tsv file (as comma-separated values rounded to 2
+# decimals), and may also be written in a binary file (NumPy npz
+# archive) containing the following arrays:
+#     - names: The names of the sequences.
+#     - entries: The index of the score vector of each sequence
+#                (sequences sharing the same sequence, see the
+#                deduplicate_fasta_file script, share the same
+#                score vector).
+#     - offsets: The offset of each score vector in the scores
+#                array (with one additional value, the length of
+#                the scores array), i.e. the scores of the vector i
+#                are scores[ offsets[ i ] : offsets[ i + 1 ] ].
+#     - scores: The scores of all the vectors, as integers equal
+#               to the score multiplied by IUSCORE_SCALE (IUPred
+#               provides the scores with 4 decimals).
 
 
 # ===========================================
@@ -17,6 +40,12 @@ from fr.tagc.mimicint.util.option.OptionManager import *
 # Extension at the end of the IUScore files generated by IUPred
 IUSCORE_FILE_EXTENSION = '.iupred.txt'
 
+# Factor applied to the scores registered in the binary file
+IUSCORE_SCALE = 10000
+
+# Number of IUScore files sent at once to each process
+IUSCORE_FILES_CHUNK_SIZE = 64
+
 
 # List of options allowed
 # -----------------------
@@ -29,12 +58,23 @@ SEQNAMES_FILE_OPTION = "SEQNAMES_FILE"
 DISORDER_PROP_FILE_OPTION = 'DISORDER_PROP_FILE'
 # Threshold used for the detection of disordered regions with SLiMProb
 IUSCORE_THRESHOLD_OPTION = 'IUSCORE_THRESHOLD'
+# Path to the binary file that will contain the IUPred scores
+IUSCORES_FILE_OPTION = 'IUSCORES_FILE'
+# Path to the file associating each header to the header of its unique sequence
+DUPLICATES_FILE_OPTION = 'DUPLICATES_FILE'
+# Number of processes used to parse the IUScore files
+PROCESSES_NB_OPTION = 'PROCESSES_NB'
 
 OPTION_LIST = [ [ '-i', '--iuscoredir', 'store', 'string', IUSCORE_FOLDER_OPTION, None, 'The path of the folder containing the IUPred scores files.' ],
                 [ '-n', '--seqNames', 'store', 'string', SEQNAMES_FILE_OPTION, None, 'The path to the file associating to each sequence name used by SLiMProb \
                                                                                       the original sequence name in the fasta file.' ],
                 [ '-o', '--output', 'store', 'string', DISORDER_PROP_FILE_OPTION, None, 'The path to the output file that will contain the disorder propensities.' ],
-                [ '-c', '--iucut', 'store', 'string', IUSCORE_THRESHOLD_OPTION, None, 'The threshold used for the detection of disordered regions with SLiMProb.' ] ]
+                [ '-c', '--iucut', 'store', 'string', IUSCORE_THRESHOLD_OPTION, None, 'The threshold used for the detection of disordered regions with SLiMProb.' ],
+                [ '-s', '--scores', 'store', 'string', IUSCORES_FILE_OPTION, None, 'The path to the binary (npz) file that will contain the IUPred scores \
+                                                                                    (optional, the scores are also written in the output file).' ],
+                [ '-d', '--duplicates', 'store', 'string', DUPLICATES_FILE_OPTION, None, 'The path to the file associating each header to the header of its \
+                                                                                          unique sequence, used to register the scores of all the headers in the binary file (optional).' ],
+                [ '-p', '--processes', 'store', 'int', PROCESSES_NB_OPTION, None, 'The number of processes used to parse the IUScore files [default: number of CPUs].' ] ]
  
 
 
@@ -42,6 +82,122 @@ OPTION_LIST = [ [ '-i', '--iuscoredir', 'store', 'string', IUSCORE_FOLDER_OPTION
 # Script
 # ===========================================
 
+# parse_iuscore_file
+# ------------------
+#
+# This function allows to parse an IUScore file and to compute the
+# number of amino acids having an IUPred score higher or equal to
+# the threshold.
+# NB: These files are expected to be space-separated values and
+#     to contain the sequence name as first value and the a float
+#     for each amino acid (in the same order as the sequence provided
+#     in the fasta file) revealing the propensity of the amino
+#     acid to be disordered.
+#
+# @param iuscore_file_path: String - The path to the IUScore file.
+# @param iuscore_threshold: Float - The threshold used when running SLiMProb ('iucut' option).
+#
+# @return seq: String - The name of the sequence (as used by SLiMProb).
+# @return scores: numpy.ndarray - The IUPred scores of the amino acids.
+# @return disordered_aa: Integer - The number of disordered amino acids.
+#
+def parse_iuscore_file( iuscore_file_path, iuscore_threshold ):
+
+    with open( iuscore_file_path, 'r' ) as iuscores:
+        iuscores_list = iuscores.read().split()
+
+    seq = iuscores_list[ 0 ]
+    scores = np.array( iuscores_list[ 1: ], dtype = np.float64 )
+    disordered_aa = int( np.count_nonzero( scores >= iuscore_threshold ) )
+
+    return ( seq, scores, disordered_aa )
+
+
+
+# format_iuscores
+# ---------------
+#
+# This function allows to format the IUPred scores rounded to 2
+# decimals, as str( round( score, 2 ) ) would (e.g. '0.5', '0.13').
+# NB: The '%.2f' format rounds the scores the same way as the round 
+#     function, then the trailing zeros are removed.
+#
+# @param scores: numpy.ndarray - The IUPred scores.
+#
+# @return formatted_scores: numpy.ndarray - The formatted scores (strings).
+#
+def format_iuscores( scores ):
+    
+    formatted_scores = np.char.rstrip( np.char.mod( '%.2f', scores ), '0' )
+    formatted_scores = np.where( np.char.endswith( formatted_scores, '.' ),
+                                 np.char.add( formatted_scores, '0' ),
+                                 formatted_scores )
+    
+    return formatted_scores
+
+
+
+# write_iuscores_file
+# -------------------
+#
+# This function allows to write the IUPred scores of the sequences
+# in a binary file (see the description of the script).
+#
+# @param iuscores_file_path: String - The path to the binary file.
+# @param names: List - The names of the sequences.
+# @param entries: List - The index of the score vector of each sequence.
+# @param scores_list: List - The score vectors (numpy.ndarray of floats).
+#
+def write_iuscores_file( iuscores_file_path, names, entries, scores_list ):
+
+    offsets = np.zeros( len( scores_list ) + 1, dtype = np.int64 )
+    np.cumsum( [ len( scores ) for scores in scores_list ], out = offsets[ 1: ] )
+
+    if scores_list:
+        scores = np.rint( np.concatenate( scores_list ) * IUSCORE_SCALE ).astype( np.uint16 )
+    else:
+        scores = np.zeros( 0, dtype = np.uint16 )
+
+    # NB: The file object is used so that NumPy does not add the
+    #     .npz extension to the file name
+    with open( iuscores_file_path, 'wb' ) as iuscores_file:
+        np.savez_compressed( iuscores_file,
+                             names = np.array( names, dtype = str ),
+                             entries = np.array( entries, dtype = np.int32 ),
+                             offsets = offsets,
+                             scores = scores )
+
+
+
+# read_iuscores_file
+# ------------------
+#
+# This function allows to read the IUPred scores of the sequences
+# from a binary file (see the description of the script).
+#
+# @param iuscores_file_path: String - The path to the binary file.
+#
+# @return iuscore_dict: OrderedDict - The dictionary that associates to each
+#                                     sequence name its IUPred scores (NumPy 
+#                                     array sharing the memory of the scores
+#                                     of all the sequences).
+#
+def read_iuscores_file( iuscores_file_path ):
+
+    with np.load( iuscores_file_path ) as iuscores_file:
+        names = iuscores_file[ 'names' ].tolist()
+        entries = iuscores_file[ 'entries' ]
+        offsets = iuscores_file[ 'offsets' ]
+        scores = iuscores_file[ 'scores' ] / float( IUSCORE_SCALE )
+
+    iuscore_dict = OrderedDict()
+    for ( name, entry ) in zip( names, entries ):
+        iuscore_dict[ name ] = scores[ offsets[ entry ] : offsets[ entry + 1 ] ]
+
+    return iuscore_dict
+
+
+
 # compute_query_disorder
 # ----------------------
 #
@@ -49,6 +205,7 @@ OPTION_LIST = [ [ '-i', '--iuscoredir', 'store', 'string', IUSCORE_FOLDER_OPTION
 # their general propensity to be disordered given the IUScores 
 # computed by IUPred when running SLiMProb and to write them in 
 # a file.
+# NB: The IUScore files are parsed concurrently by several processes.
 #
 # @param iuscore_folder_path: String - The path of the folder containing the IUPred scores
 #                                      for all sequences, as generated by SLiMProb.
@@ -56,8 +213,14 @@ OPTION_LIST = [ [ '-i', '--iuscoredir', 'store', 'string', IUSCORE_FOLDER_OPTION
 #                                      sequence its name in the original query fasta file.
 # @param disorder_prop_file_path: String - The path of the output file.
 # @param iuscore_threshold: Float - The threshold used when running SLiMProb ('iucut' option).
+# @param iuscores_file_path: String - The path to the binary file of IUPred scores (optional).
+#                                     If provided, the scores are not written in the output file.
+# @param duplicates_file_path: String - The path to the file associating each header to the
+#                                       header of its unique sequence (optional).
+# @param processes_nb: Integer - The number of processes used to parse the IUScore files.
 #
-def compute_query_disorder( iuscore_folder_path, seq_names_file_path, disorder_prop_file_path, iuscore_threshold ):
+def compute_query_disorder( iuscore_folder_path, seq_names_file_path, disorder_prop_file_path, iuscore_threshold,
+                            iuscores_file_path=None, duplicates_file_path=None, processes_nb=None ):
         
     # Get the association of sequence names generated by SLiMProb
     # with the sequence names as defined in the query fasta file
@@ -72,9 +235,20 @@ def compute_query_disorder( iuscore_folder_path, seq_names_file_path, disorder_p
         
     
     # Get the list of IUScore files contained in the iuscore folder
-    iuscore_files = os.listdir( iuscore_folder_path )
-    iuscore_files = [ file for file in iuscore_files if file.endswith( IUSCORE_FILE_EXTENSION ) ]
+    # NB: The files are sorted so that the output is reproducible
+    iuscore_files = sorted( os.listdir( iuscore_folder_path ) )
+    iuscore_files = [ os.path.join( iuscore_folder_path, file ) for file in iuscore_files if file.endswith( IUSCORE_FILE_EXTENSION ) ]
     
+    # Get the list of headers associated with each unique sequence
+    if duplicates_file_path:
+        headers_of_unique_sqce = get_headers_of_unique_sqce( duplicates_file_path )
+    else:
+        headers_of_unique_sqce = {}
+
+    # Lists used to build the binary file of IUPred scores
+    names = []
+    entries = []
+    scores_list = []
     
     # Create the output file as a tab-separated values file
     # that contains the following columns:
@@ -83,57 +257,50 @@ def compute_query_disorder( iuscore_folder_path, seq_names_file_path, disorder_p
     # [2] disorder_propensity: Float - The general disorder propensity of the sequence,
     #                                  i.e. the proportion of amino acids that have an
     #                                  IUPred score higher than the threshold value.
-    with open( disorder_prop_file_path, 'w' ) as disorder_prop_file:
+    # [3] iuscores: String - The IUPred scores of the amino acids.
+    with open( disorder_prop_file_path, 'w' ) as disorder_prop_file, \
+         concurrent.futures.ProcessPoolExecutor( max_workers = processes_nb ) as executor:
         
         # Add the header
         disorder_prop_file.write( '\t'.join( [ 'sequence', 'length', 'disorder_propensity', 'iuscores' ] ) + '\n' )
         
-        # Sequentially open the IUScore files
-        # These files are expected to be space-separated values and
-        # to contain the sequence name as first value and the a float
-        # for each amino acid (in the same order as the sequence provided
-        # in the fasta file) revealing the propensity of the amino 
-        # acid to be disordered.
-        for iuscore_file in iuscore_files:
+        # Parse the IUScore files concurrently
+        # NB: The results are provided in the order of the files
+        parsed_iuscore_files = executor.map( parse_iuscore_file,
+                                             iuscore_files,
+                                             itertools.repeat( iuscore_threshold ),
+                                             chunksize = IUSCORE_FILES_CHUNK_SIZE )
             
-            with open( os.path.join( iuscore_folder_path, iuscore_file ), 'r' ) as iuscores:
+        for ( seq, scores, disordered_aa ) in parsed_iuscore_files:
                 
-                # Read the whole file
-                iuscores_list = iuscores.read()        
-                iuscores_list = iuscores_list.replace( ' ', '\t' ).replace( '\n', '' ).split( '\t' )
+            # Get the name of the sequence
+            seqname = seq_names_asso_dict[ seq ]
                 
-                # If the file ends with a '\n', then remove it
-                if ( iuscores_list[ -1 ] == '\n' ):
-                    del iuscores_list[ -1 ]
+            # Get the length of the sequence
+            seq_len = len( scores )
                     
-                # Get the name of the sequence
-                seq = iuscores_list[ 0 ]
-                seqname = seq_names_asso_dict[ seq ]
-                
-                # Get the list of scores
-                scores = iuscores_list[ 1: ]
-                scores = list( map( float, scores ) )
-                
-                # Get the length of the sequence
-                seq_len = len( scores )
+            # Compute the general disorder propensity
+            # This propensity is computed as being the proportion of amino acid of the
+            # sequence that have an IUPred score higher of equal to the IUScore
+            # threshold selected for IUPred among the total number of amino acids
+            disorder_propensity = float( disordered_aa ) / float( seq_len )
                 
-                # Compute the general disorder propensity
-                # This propensity is computed as being the proportion of amino acid of the 
-                # sequence that have an IUPred score higher of equal to the IUScore 
-                # threshold selected for IUPred among the total number of amino acids
-                disordered_aa = 0
-                for score in scores:
-                    if ( score >= iuscore_threshold ):
-                        disordered_aa += 1
+            # Add the entry for this sequence in the output file
+            line_content = [ seqname, seq_len, disorder_propensity, ','.join( format_iuscores( scores ).tolist() ) ]
+            if iuscores_file_path:
+                for header in headers_of_unique_sqce.get( seqname, [ seqname ] ):
+                    names.append( header )
+                    entries.append( len( scores_list ) )
+                scores_list.append( scores )
+            disorder_prop_file.write( '\t'.join( map( str, line_content ) ) + '\n' )
                 
-                disorder_propensity = float( disordered_aa ) / float( seq_len )
+    if iuscores_file_path:
+        write_iuscores_file( iuscores_file_path = iuscores_file_path,
+                             names = names,
+                             entries = entries,
+                             scores_list = scores_list )
                 
-                # Add the entry for this sequence in the output file
-                disorder_prop_file.write( '\t'.join( map( str, [ seqname, 
-                                                                 seq_len, 
-                                                                 disorder_propensity, 
-                                                                 ','.join( map( lambda x: str(  round( x, 2 ) ), 
-                                                                                scores ) ) ] ) ) + '\n' )
+    print( 'INFO :: The IUPred scores of ' + str( len( iuscore_files ) ) + ' sequences have been parsed.' )
 
 
 
@@ -176,8 +343,23 @@ if __name__=='__main__':
              or ( iuscore_threshold > 1 ) ):
             raise Exception( 'The IUPred cut-off provided has to be an float between 0 and 1.' )
     
+    # Get the path to the binary file of IUPred scores
+    iuscores_file_path = get_option( option_dict = option_dict,
+                                     option_name = IUSCORES_FILE_OPTION )
+
+    # Get the path to the duplicates file
+    duplicates_file_path = get_option( option_dict = option_dict,
+                                       option_name = DUPLICATES_FILE_OPTION )
+
+    # Get the number of processes
+    processes_nb = get_option( option_dict = option_dict,
+                               option_name = PROCESSES_NB_OPTION )
+
     # Run the script    
     compute_query_disorder( iuscore_folder_path = iuscore_folder_path, 
                             seq_names_file_path = seq_names_file_path,
                             disorder_prop_file_path = disorder_prop_file_path, 
-                            iuscore_threshold = iuscore_threshold )
+                            iuscore_threshold = iuscore_threshold,
+                            iuscores_file_path = iuscores_file_path,
+                            duplicates_file_path = duplicates_file_path,
+                            processes_nb = processes_nb )
@@ -0,0 +1,298 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+
+
+from fr.tagc.mimicint.util.option.OptionManager import *
+from fr.tagc.mimicint.util.cache.CacheManager import read_fasta_file, write_cache_file
+
+# This script allows to use a persistent cache of the InterProScan
+# results computed for the query sequences, so that InterProScan is
+# only run on the sequences that have never been annotated before.
+#
+# The cache is a folder in which the InterProScan (tsv) results are
+# saved for each sequence, in a file named after the MD5 digest of
+# the sequence (in a subfolder named after the InterProScan version
+# and applications used), i.e.
+#
+#     <cache_folder>/<version>/<md5[:2]>/<md5>.tsv
+#
+# NB: A sequence for which InterProScan did not find any result is
+#     registered in the cache using an empty file.
+#
+# This script may be run in two modes:
+# - lookup: The results of the sequences found in the cache are written in
+#           a tsv file, and the other sequences are written in a fasta file
+#           on which InterProScan has to be run.
+# - update: The results computed by InterProScan are registered in the cache
+#           and merged with the results found in the cache.
+
+
+# ===========================================
+# Constants
+# ===========================================
+
+# Modes of the script
+MODE_LOOKUP = 'lookup'
+MODE_UPDATE = 'update'
+
+# Extension of the files of the cache
+CACHE_FILE_EXTENSION = '.tsv'
+
+# Index of the protein accession column in the InterProScan tsv files
+IPS_ACCESSION_INDEX = 0
+
+
+# List of options allowed
+# -----------------------
+# Mode of the script
+MODE_OPTION = 'MODE'
+# Path to the query fasta file
+QUERY_FASTA_FILE_OPTION = 'QUERY_FASTA_FILE'
+# Path to the cache folder
+CACHE_FOLDER_OPTION = 'CACHE_FOLDER'
+# Version of InterProScan (and applications) used
+IPS_VERSION_OPTION = 'IPS_VERSION'
+# Path to the fasta file of the sequences missing from the cache
+MISSING_FASTA_FILE_OPTION = 'MISSING_FASTA_FILE'
+# Path to the results found in the cache
+CACHED_RES_FILE_OPTION = 'CACHED_RES_FILE'
+# Path to the results computed by InterProScan
+NEW_RES_FILE_OPTION = 'NEW_RES_FILE'
+# Path to the merged results
+OUTPUT_FILE_OPTION = 'OUTPUT_FILE'
+
+OPTION_LIST = [ [ '-m', '--mode', 'store', 'choice', MODE_OPTION, [ MODE_LOOKUP, MODE_UPDATE ], None, 'The mode of the script (lookup / update).' ],
+                [ '-f', '--fastaFile', 'store', 'string', QUERY_FASTA_FILE_OPTION, None, 'The path to the query fasta file.' ],
+                [ '-c', '--cacheDir', 'store', 'string', CACHE_FOLDER_OPTION, None, 'The path to the cache folder. If not provided, no cache is used.' ],
+                [ '-v', '--ipsVersion', 'store', 'string', IPS_VERSION_OPTION, None, 'The version of InterProScan (and applications) used.' ],
+                [ '-u', '--missingFasta', 'store', 'string', MISSING_FASTA_FILE_OPTION, None, 'The path to the fasta file of the sequences missing from the cache.' ],
+                [ '-r', '--cachedRes', 'store', 'string', CACHED_RES_FILE_OPTION, None, 'The path to the file of the results found in the cache.' ],
+                [ '-n', '--newRes', 'store', 'string', NEW_RES_FILE_OPTION, None, 'The path to the file of the results computed by InterProScan (update mode).' ],
+                [ '-o', '--output', 'store', 'string', OUTPUT_FILE_OPTION, None, 'The path to the file of the merged results (update mode).' ] ]
+
+
+
+# ===========================================
+# Script
+# ===========================================
+
+## get_sqce_md5
+#  ------------
+#
+# This function allows to get the MD5 digest of a sequence 
+# (in upper case, without spaces).
+#
+# @param sequence_lines: List - The lines of the sequence.
+#
+# @return sequence_md5: String - The MD5 digest of the sequence.
+#
+def get_sqce_md5( sequence_lines ):
+
+    sequence = ''.join( ''.join( sequence_lines ).split() ).upper()
+    return hashlib.md5( sequence.encode( 'utf-8' ) ).hexdigest()
+
+
+
+## get_cache_file_path
+#  -------------------
+#
+# This function allows to get the path of the file of the cache
+# containing the InterProScan results of a sequence.
+#
+# @param cache_folder: String - The path to the cache folder.
+# @param ips_version: String - The version of InterProScan (and applications) used.
+# @param sequence_md5: String - The MD5 digest of the sequence.
+#
+# @return cache_file: String - The path to the file of the cache.
+#
+def get_cache_file_path( cache_folder, ips_version, sequence_md5 ):
+
+    return os.path.join( cache_folder, ips_version, sequence_md5[ :2 ], sequence_md5 + CACHE_FILE_EXTENSION )
+
+
+
+## rename_res_lines
+#  ----------------
+#
+# This function allows to replace the protein accession of InterProScan
+# result lines.
+#
+# @param res_lines: List - The InterProScan result lines.
+# @param accession: String - The protein accession to use.
+#
+# @return renamed_res_lines: List - The renamed result lines.
+#
+def rename_res_lines( res_lines, accession ):
+
+    renamed_res_lines = []
+    for res_line in res_lines:
+        res_line = res_line.split( '\t' )
+        res_line[ IPS_ACCESSION_INDEX ] = accession
+        renamed_res_lines.append( '\t'.join( res_line ) )
+
+    return renamed_res_lines
+
+
+
+## lookup_interproscan_cache
+#  -------------------------
+#
+# This function allows to get the results of the query sequences
+# registered in the cache, and to write the sequences that are
+# missing from the cache in a new fasta file.
+#
+# @param query_fasta_file_path: String - The path to the query fasta file.
+# @param cache_folder: String - The path to the cache folder (may be None).
+# @param ips_version: String - The version of InterProScan (and applications) used.
+# @param missing_fasta_file_path: String - The path to the fasta file of the missing sequences.
+# @param cached_res_file_path: String - The path to the file of the results found in the cache.
+#
+def lookup_interproscan_cache( query_fasta_file_path, cache_folder, ips_version, missing_fasta_file_path, cached_res_file_path ):
+
+    sequences = read_fasta_file( query_fasta_file_path, get_sqce_md5 )
+
+    hit_count = 0
+    with open( missing_fasta_file_path, 'w' ) as missing_fasta_file, \
+         open( cached_res_file_path, 'w' ) as cached_res_file:
+
+        for ( short_header, header_line, sequence_lines, sequence_md5 ) in sequences:
+
+            cache_file = None
+            if cache_folder:
+                cache_file = get_cache_file_path( cache_folder = cache_folder,
+                                                  ips_version = ips_version,
+                                                  sequence_md5 = sequence_md5 )
+
+            if ( cache_file and os.path.exists( cache_file ) ):
+                with open( cache_file, 'r' ) as cached_res:
+                    cached_res_file.writelines( rename_res_lines( res_lines = cached_res.readlines(),
+                                                                  accession = short_header ) )
+                hit_count += 1
+
+            else:
+                missing_fasta_file.write( header_line )
+                missing_fasta_file.writelines( sequence_lines )
+
+    print( 'INFO :: The results of ' + str( hit_count ) + ' sequences (out of ' + str( len( sequences ) ) +
+           ') have been found in the InterProScan cache.' )
+
+
+
+## update_interproscan_cache
+#  -------------------------
+#
+# This function allows to register in the cache the results computed
+# by InterProScan for the sequences that were missing, and to merge
+# these results with the ones found in the cache.
+#
+# @param missing_fasta_file_path: String - The path to the fasta file of the missing sequences.
+# @param cache_folder: String - The path to the cache folder (may be None).
+# @param ips_version: String - The version of InterProScan (and applications) used.
+# @param cached_res_file_path: String - The path to the file of the results found in the cache.
+# @param new_res_file_path: String - The path to the file of the results computed by InterProScan.
+# @param output_file_path: String - The path to the file of the merged results.
+#
+def update_interproscan_cache( missing_fasta_file_path, cache_folder, ips_version, cached_res_file_path, new_res_file_path, output_file_path ):
+
+    # Get the results computed by InterProScan for each sequence
+    new_res = {}
+    with open( new_res_file_path, 'r' ) as new_res_file:
+        for res_line in new_res_file:
+            accession = res_line.split( '\t' )[ IPS_ACCESSION_INDEX ]
+            new_res.setdefault( accession, [] ).append( res_line )
+
+    # Register these results in the cache
+    # NB: The sequences for which no result has been found are
+    #     registered too, so that they are not processed again
+    if cache_folder:
+        for ( short_header, header_line, sequence_lines, sequence_md5 ) in read_fasta_file( missing_fasta_file_path, get_sqce_md5 ):
+            cache_file = get_cache_file_path( cache_folder = cache_folder,
+                                              ips_version = ips_version,
+                                              sequence_md5 = sequence_md5 )
+            write_cache_file( cache_file = cache_file,
+                              lines = new_res.get( short_header, [] ) )
+
+    # Merge the results found in the cache with the new ones
+    with open( output_file_path, 'w' ) as output_file:
+        for res_file_path in [ cached_res_file_path, new_res_file_path ]:
+            with open( res_file_path, 'r' ) as res_file:
+                for res_line in res_file:
+                    output_file.write( res_line )
+
+
+
+# ===========================================
+# Parse command line arguments
+# and run script
+# ===========================================
+
+#### Code execution in the console ####
+if __name__ == '__main__':
+
+    # Parse the command-line arguments
+    option_dict = parse_arguments( OPTION_LIST )
+
+    # Get the mode
+    mode = get_option( option_dict = option_dict,
+                       option_name = MODE_OPTION,
+                       not_none = True )
+    if ( not mode ):
+        raise Exception( 'The mode (' + MODE_LOOKUP + ' / ' + MODE_UPDATE + ') has to be provided.' )
+
+    # Get the path to the cache folder
+    cache_folder = get_option( option_dict = option_dict,
+                               option_name = CACHE_FOLDER_OPTION,
+                               not_none = False )
+
+    # Get the version of InterProScan
+    ips_version = get_option( option_dict = option_dict,
+                              option_name = IPS_VERSION_OPTION,
+                              not_none = False )
+    if ( cache_folder and ( not ips_version ) ):
+        raise Exception( 'The version of InterProScan has to be provided when a cache folder is used.' )
+
+    # Get the path to the fasta file of the missing sequences
+    missing_fasta_file_path = get_option( option_dict = option_dict,
+                                          option_name = MISSING_FASTA_FILE_OPTION,
+                                          not_none = True )
+
+    # Get the path to the file of the results found in the cache
+    cached_res_file_path = get_option( option_dict = option_dict,
+                                       option_name = CACHED_RES_FILE_OPTION,
+                                       not_none = True )
+
+    # Run the script
+    if ( mode == MODE_LOOKUP ):
+
+        # Get the path to the query fasta file
+        query_fasta_file_path = get_option( option_dict = option_dict,
+                                            option_name = QUERY_FASTA_FILE_OPTION,
+                                            not_none = True )
+
+        lookup_interproscan_cache( query_fasta_file_path = query_fasta_file_path,
+                                   cache_folder = cache_folder,
+                                   ips_version = ips_version,
+                                   missing_fasta_file_path = missing_fasta_file_path,
+                                   cached_res_file_path = cached_res_file_path )
+
+    else:
+
+        # Get the path to the results computed by InterProScan
+        new_res_file_path = get_option( option_dict = option_dict,
+                                        option_name = NEW_RES_FILE_OPTION,
+                                        not_none = True )
+
+        # Get the path to the merged results
+        output_file_path = get_option( option_dict = option_dict,
+                                       option_name = OUTPUT_FILE_OPTION,
+                                       not_none = True )
+
+        update_interproscan_cache( missing_fasta_file_path = missing_fasta_file_path,
+                                   cache_folder = cache_folder,
+                                   ips_version = ips_version,
+                                   cached_res_file_path = cached_res_file_path,
+                                   new_res_file_path = new_res_file_path,
+                                   output_file_path = output_file_path )
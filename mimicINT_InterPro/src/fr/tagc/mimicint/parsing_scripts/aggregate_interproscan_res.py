@@ -0,0 +1,215 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import os
+import datetime
+
+
+from fr.tagc.mimicint.util.option.OptionManager import *
+
+# This script allows to aggregate several InterProScan
+# result files (tsv format) into one single file, checking
+# the content of these files on the way.
+
+
+# ===========================================
+# Constants
+# ===========================================
+
+# Minimal number of columns of the InterProScan tsv files
+# NB: The InterPro annotation, GO annotation and pathway
+#     columns are optional
+IPS_MIN_COLUMN_NB = 11
+
+# Index of the columns of the InterProScan tsv files
+IPS_ACCESSION_INDEX = 0
+IPS_START_INDEX = 6
+IPS_STOP_INDEX = 7
+IPS_SCORE_INDEX = 8
+
+
+# List of options allowed
+# -----------------------
+
+# List of paths to the input result files
+INPUT_RESULT_FILES_LIST_OPTION = 'INPUT_RESULT_FILES_LIST'
+
+# Path to the query fasta file
+QUERY_FASTA_FILE_OPTION = 'QUERY_FASTA_FILE'
+
+# Path to the output result file
+OUTPUT_RESULT_FILE_OPTION = 'OUTPUT_RESULT_FILE'
+
+OPTION_LIST = [ [ '-i', '--input', 'store', 'string', INPUT_RESULT_FILES_LIST_OPTION, None, 'The list of paths to the input result files.' ],
+                [ '-f', '--fastaFile', 'store', 'string', QUERY_FASTA_FILE_OPTION, None, 'The path to the fasta file of the sequences processed by InterProScan.' ],
+                [ '-o', '--output', 'store', 'string', OUTPUT_RESULT_FILE_OPTION, None, 'The path to the output result file.' ] ]
+
+
+
+# ===========================================
+# Script
+# ===========================================
+
+# get_fasta_accessions
+# --------------------
+#
+# This function allows to get the protein accessions used by
+# InterProScan for the sequences of a fasta file, i.e. the first
+# part of the headers (before the first space).
+#
+# @param query_fasta_file: String - The path to the fasta file.
+#
+# @return accessions: Set - The set of protein accessions.
+#
+def get_fasta_accessions( query_fasta_file ):
+
+    accessions = set()
+    with open( query_fasta_file, 'r' ) as query_fasta:
+        for line in query_fasta:
+            if line.startswith( '>' ):
+                header = line[ 1: ]
+                if header.startswith( ' ' ):
+                    header = header[ 1: ]
+                accessions.add( header.split( ' ' )[ 0 ].replace( '\n', '' ) )
+
+    return accessions
+
+
+
+# check_interproscan_line
+# -----------------------
+#
+# This function allows to check a line of an InterProScan result file.
+#
+# @param line: String - The line to check.
+# @param accessions: Set - The set of the protein accessions expected.
+#
+# @return error: String - The description of the error found, None if
+#                         the line is valid.
+#
+def check_interproscan_line( line, accessions ):
+
+    line_content = line.replace( '\n', '' ).split( '\t' )
+
+    if ( len( line_content ) < IPS_MIN_COLUMN_NB ):
+        return ( 'the line contains ' + str( len( line_content ) ) + ' columns instead of at least ' +
+                 str( IPS_MIN_COLUMN_NB ) )
+
+    if ( line_content[ IPS_ACCESSION_INDEX ] not in accessions ):
+        return 'the protein accession ' + line_content[ IPS_ACCESSION_INDEX ] + ' is not part of the query'
+
+    try:
+        int( line_content[ IPS_START_INDEX ] )
+        int( line_content[ IPS_STOP_INDEX ] )
+    except ValueError:
+        return 'the start and stop locations have to be integers'
+
+    # NB: The score is set to "-" by InterProScan for some applications
+    if ( line_content[ IPS_SCORE_INDEX ] != '-' ):
+        try:
+            float( line_content[ IPS_SCORE_INDEX ] )
+        except ValueError:
+            return 'the score has to be a float'
+
+    return None
+
+
+
+# aggregate_interproscan_res
+# --------------------------
+#
+# This function allows to aggregate several InterProScan
+# result files into one single file.
+#
+# @param input_res_files_list: List - The list of paths to the input result files.
+# @param query_fasta_file: String - The path to the fasta file of the sequences
+#                                   processed by InterProScan.
+# @param output_res_file: String - The path to the output result file.
+#
+# @raise Exception - When an input file is missing or contains an invalid line.
+#
+def aggregate_interproscan_res( input_res_files_list, query_fasta_file, output_res_file ):
+
+    print( 'INFO :: results from ' + str( len( input_res_files_list ) ) +
+           ' InterProScan result files will be aggregated together.' )
+
+    accessions = get_fasta_accessions( query_fasta_file )
+
+    # Check all the files exist before aggregating them
+    for input_res_file in input_res_files_list:
+        if ( not os.path.isfile( input_res_file ) ):
+            raise Exception( 'The InterProScan result file ' + input_res_file + ' does not exist.' )
+
+    annotated_accessions = set()
+    line_count = 0
+    with open( output_res_file, 'w' ) as output_res:
+
+        # Copy all the lines of all files
+        # NB: InterProScan tsv files do not contain any header
+        for input_res_file in input_res_files_list:
+            with open( input_res_file, 'r' ) as input_res:
+                line_nb = 0
+                for line in input_res:
+                    line_nb += 1
+                    if ( line.strip() == '' ):
+                        continue
+
+                    error = check_interproscan_line( line = line,
+                                                     accessions = accessions )
+                    if error:
+                        raise Exception( 'The line ' + str( line_nb ) + ' of the InterProScan result file ' +
+                                         input_res_file + ' is invalid: ' + error + '.' )
+
+                    if ( not line.endswith( '\n' ) ):
+                        line += '\n'
+                    output_res.write( line )
+
+                    annotated_accessions.add( line.split( '\t' )[ IPS_ACCESSION_INDEX ] )
+                    line_count += 1
+
+    print( 'INFO :: ' + str( line_count ) + ' InterProScan results have been aggregated for ' +
+           str( len( annotated_accessions ) ) + ' sequences (out of ' + str( len( accessions ) ) + ').' )
+
+
+
+# ===========================================
+# Parse command line arguments
+# and run script
+# ===========================================
+
+#### Code execution in the console ####
+if __name__ == '__main__':
+
+    # Parse the command-line arguments
+    option_dict = parse_arguments( OPTION_LIST )
+
+    # Get the list of paths to the input result files
+    input_res_files_list = get_option( option_dict = option_dict,
+                                       option_name = INPUT_RESULT_FILES_LIST_OPTION,
+                                       not_none = True )
+    try:
+        input_res_files_list = input_res_files_list.split( ',' )
+    except:
+        raise Exception( 'An error occurred during the conversion of paths of' +
+                         ' the input result files into a list.' )
+
+    # Get the path to the query fasta file
+    query_fasta_file = get_option( option_dict = option_dict,
+                                   option_name = QUERY_FASTA_FILE_OPTION,
+                                   not_none = True )
+
+    # Get the path to the output result file
+    output_res_file = get_option( option_dict = option_dict,
+                                  option_name = OUTPUT_RESULT_FILE_OPTION,
+                                  not_none = True )
+
+    print( datetime.datetime.now().strftime('%d-%m-%Y %H:%M:%S') +
+           ':: INFO :: Starting the aggregation of InterProScan result files.' )
+
+    # Run the script
+    aggregate_interproscan_res( input_res_files_list = input_res_files_list,
+                                query_fasta_file = query_fasta_file,
+                                output_res_file = output_res_file )
+
+    print( datetime.datetime.now().strftime('%d-%m-%Y %H:%M:%S') +
+           ':: INFO :: The aggregation of InterProScan result files has finished.' )
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import os
+import gzip
+import shutil
+import datetime
+
+
+from fr.tagc.mimicint.util.option.OptionManager import *
+
+# This script allows to aggregate several SLiMProb files
+# sharing the same header (result files or occurrence files)
+# into one single file. The header is written once and the
+# content of each file is copied by blocks, without parsing
+# the lines.
+
+
+# ===========================================
+# Constants
+# ===========================================
+
+# Size of the blocks copied at once (in bytes)
+COPY_BUFFER_SIZE = 16 * 1024 * 1024
+
+
+# List of options allowed
+# -----------------------
+
+# List of paths to the input files
+INPUT_FILES_LIST_OPTION = 'INPUT_FILES_LIST'
+
+# Path to the output file
+OUTPUT_FILE_OPTION = 'OUTPUT_FILE'
+
+# Should the output file be compressed?
+COMPRESS_OPTION = 'COMPRESS'
+
+OPTION_LIST = [ [ '-i', '--input', 'store', 'string', INPUT_FILES_LIST_OPTION, None, 'The list of paths to the input files (comma-separated).' ],
+                [ '-o', '--output', 'store', 'string', OUTPUT_FILE_OPTION, None, 'The path to the output file.' ],
+                [ '-c', '--compress', 'store_true', None, COMPRESS_OPTION, False, 'Should the output file be compressed (gzip)? [default: %default]' ] ]
+
+
+
+# ===========================================
+# Script
+# ===========================================
+
+# aggregate_slimprob_files
+# ------------------------
+#
+# This function allows to aggregate several SLiMProb
+# files into one single file.
+# NB: Empty files (e.g. the ones written for a chunk for which
+#     all the results have been found in the cache) are ignored.
+#
+# @param input_files_list: List - The list of paths to the input files.
+# @param output_file: String - The path to the output file.
+# @param compress: Boolean - Should the output file be compressed?
+#
+# @raise Exception - When the headers of the input files differ.
+#
+def aggregate_slimprob_files( input_files_list, output_file, compress ):
+
+    print( 'INFO :: ' + str( len( input_files_list ) ) +
+           ' SLiMProb files will be aggregated together.' )
+
+    if compress:
+        output = gzip.open( output_file, 'wb' )
+    else:
+        output = open( output_file, 'wb' )
+
+    header = None
+    empty_file_count = 0
+    with output:
+        for input_file in input_files_list:
+
+            if ( os.path.getsize( input_file ) == 0 ):
+                empty_file_count += 1
+                continue
+
+            with open( input_file, 'rb' ) as input:
+                # Check the header is the same in all files
+                # and write it only once
+                file_header = input.readline()
+                if ( header is None ):
+                    header = file_header
+                    output.write( header )
+                elif ( file_header != header ):
+                    raise Exception( 'The header of the file ' + input_file + ' differs from the header of' +
+                                     ' the previous files. These files cannot be aggregated.' )
+
+                # Copy the rest of the file
+                shutil.copyfileobj( input, output, COPY_BUFFER_SIZE )
+
+    print( 'INFO :: ' + str( len( input_files_list ) - empty_file_count ) + ' files have been aggregated' +
+           ' (' + str( empty_file_count ) + ' empty files ignored).' )
+
+
+
+# ===========================================
+# Parse command line arguments
+# and run script
+# ===========================================
+
+#### Code execution in the console ####
+if __name__ == '__main__':
+
+    # Parse the command-line arguments
+    option_dict = parse_arguments( OPTION_LIST )
+
+    # Get the list of paths to the input files
+    input_files_list = get_option( option_dict = option_dict,
+                                   option_name = INPUT_FILES_LIST_OPTION,
+                                   not_none = True )
+    try:
+        input_files_list = input_files_list.split( ',' )
+    except:
+        raise Exception( 'An error occurred during the conversion of paths of' +
+                         ' the input files into a list.' )
+
+    # Get the path to the output file
+    output_file = get_option( option_dict = option_dict,
+                              option_name = OUTPUT_FILE_OPTION,
+                              not_none = True )
+
+    # Should the output be compressed?
+    compress = get_option( option_dict = option_dict,
+                           option_name = COMPRESS_OPTION )
+
+    print( datetime.datetime.now().strftime('%d-%m-%Y %H:%M:%S') +
+           ':: INFO :: Starting the aggregation of SLiMProb files.' )
+
+    # Run the script
+    aggregate_slimprob_files( input_files_list = input_files_list,
+                              output_file = output_file,
+                              compress = compress )
+
+    print( datetime.datetime.now().strftime('%d-%m-%Y %H:%M:%S') +
+           ':: INFO :: The aggregation of SLiMProb files has finished.' )
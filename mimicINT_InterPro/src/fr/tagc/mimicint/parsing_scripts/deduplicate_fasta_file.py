@@ -0,0 +1,175 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+
+
+from fr.tagc.mimicint.util.option.OptionManager import *
+
+# This script allows to remove the duplicated sequences of a
+# fasta file, i.e. the identical sequences provided under
+# different headers. Only the first occurrence of each sequence
+# is kept in the new fasta file, and a tab-separated file is
+# written to associate each header of the original fasta file
+# to the header under which its sequence has been kept.
+# This allows to run the domain and SLiM detection on unique
+# sequences only, and to fan the results out to all the original
+# headers afterwards (see the fan_out_duplicate_sequences script).
+
+
+# ===========================================
+# Constants
+# ===========================================
+
+# Header of the duplicates file
+DUPLICATES_FILE_HEADER = [ 'Header', 'UniqueHeader' ]
+
+
+# List of options allowed
+# -----------------------
+
+# Path to the input fasta file
+INPUT_FASTA_FILE_OPTION = 'INPUT_FASTA_FILE'
+
+# Path to the output fasta file
+OUTPUT_FASTA_FILE_OPTION = 'OUTPUT_FASTA_FILE'
+
+# Path to the duplicates file
+DUPLICATES_FILE_OPTION = 'DUPLICATES_FILE'
+
+OPTION_LIST = [ [ '-i', '--input', 'store', 'string', INPUT_FASTA_FILE_OPTION, None, 'The path to the fasta file to deduplicate.' ],
+                [ '-o', '--output', 'store', 'string', OUTPUT_FASTA_FILE_OPTION, None, 'The path to the fasta file containing the unique sequences.' ],
+                [ '-d', '--duplicates', 'store', 'string', DUPLICATES_FILE_OPTION, None, 'The path to the file associating each header to the header of its unique sequence.' ] ]
+
+
+
+# ===========================================
+# Script
+# ===========================================
+
+# get_short_header
+# ----------------
+#
+# This function allows to get the "short" header of a sequence,
+# i.e. the first part of the header (before the first space),
+# which is used to identify the sequences in the outputs of
+# InterProScan and in the query_seqnames_match file.
+#
+# @param header_line: String - The header line (starting with '>').
+#
+# @return short_header: String - The short header.
+#
+def get_short_header( header_line ):
+
+    header = header_line[ 1: ]
+    if header.startswith( ' ' ):
+        header = header[ 1: ]
+    short_header = header.split( ' ' )[ 0 ]
+    short_header = short_header.replace( '\n', '' )
+
+    return short_header
+
+
+
+# deduplicate_fasta_file
+# ----------------------
+#
+# This function allows to write a new fasta file containing
+# only one occurrence of each sequence. The sequences are compared
+# using a hash of the sequence (in upper case, without spaces).
+#
+# @param input_fasta_file: String - The path to the input fasta file.
+# @param output_fasta_file: String - The path to the output fasta file.
+# @param duplicates_file: String - The path to the file associating each header
+#                                  to the header under which its sequence has been kept.
+#
+def deduplicate_fasta_file( input_fasta_file, output_fasta_file, duplicates_file ):
+
+    # Create the output directories if necessary
+    for output_file in [ output_fasta_file, duplicates_file ]:
+        output_dir = os.path.dirname( output_file )
+        if ( output_dir and ( not os.path.isdir( output_dir ) ) ):
+            os.makedirs( output_dir )
+
+    # Dictionary that associates to each sequence hash
+    # the short header under which the sequence is kept
+    unique_headers = {}
+
+    total_seq_nb = 0
+
+    with open( input_fasta_file, 'r' ) as input_fasta, \
+         open( output_fasta_file, 'w' ) as output_fasta, \
+         open( duplicates_file, 'w' ) as duplicates:
+
+        duplicates.write( '\t'.join( DUPLICATES_FILE_HEADER ) + '\n' )
+
+        line = input_fasta.readline()
+
+        # Skip the eventual lines preceding the first header
+        while ( ( line != '' )
+                and ( not line.startswith( '>' ) ) ):
+            line = input_fasta.readline()
+
+        while ( line != '' ):
+
+            # Get the header and the lines of the sequence
+            header_line = line
+            sequence_lines = []
+            line = input_fasta.readline()
+            while ( ( line != '' )
+                    and ( not line.startswith( '>' ) ) ):
+                sequence_lines.append( line )
+                line = input_fasta.readline()
+
+            total_seq_nb += 1
+
+            short_header = get_short_header( header_line )
+            sequence = ''.join( ''.join( sequence_lines ).split() ).upper()
+            sequence_hash = hashlib.sha1( sequence.encode( 'utf-8' ) ).hexdigest()
+
+            # Keep the first occurrence of each sequence
+            unique_header = unique_headers.get( sequence_hash )
+            if ( unique_header is None ):
+                unique_header = short_header
+                unique_headers[ sequence_hash ] = unique_header
+                output_fasta.write( header_line )
+                output_fasta.writelines( sequence_lines )
+
+            duplicates.write( '\t'.join( [ short_header, unique_header ] ) + '\n' )
+
+    print( 'INFO :: ' + str( len( unique_headers ) ) + ' unique sequences have been found among the ' +
+           str( total_seq_nb ) + ' sequences of the ' + input_fasta_file + ' file.' )
+
+
+
+# ===========================================
+# Parse command line arguments
+# and run script
+# ===========================================
+
+#### Code execution in the console ####
+if __name__ == '__main__':
+
+    # Parse the command-line arguments
+    option_dict = parse_arguments( OPTION_LIST )
+
+    # Get the path to the input fasta file
+    input_fasta_file = get_option( option_dict = option_dict,
+                                   option_name = INPUT_FASTA_FILE_OPTION,
+                                   not_none = True )
+
+    # Get the path to the output fasta file
+    output_fasta_file = get_option( option_dict = option_dict,
+                                    option_name = OUTPUT_FASTA_FILE_OPTION,
+                                    not_none = True )
+
+    # Get the path to the duplicates file
+    duplicates_file = get_option( option_dict = option_dict,
+                                  option_name = DUPLICATES_FILE_OPTION,
+                                  not_none = True )
+
+    # Run the script
+    deduplicate_fasta_file( input_fasta_file = input_fasta_file,
+                            output_fasta_file = output_fasta_file,
+                            duplicates_file = duplicates_file )
@@ -0,0 +1,173 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+from fr.tagc.mimicint.util.option.OptionManager import *
+
+# This script allows to fan the results computed on unique
+# sequences out to all the headers sharing the same sequence
+# (see the deduplicate_fasta_file script). Each line of the
+# input tab-separated file is copied once for each header
+# associated to the sequence it refers to, replacing the
+# sequence name by the header.
+
+
+# ===========================================
+# Constants
+# ===========================================
+
+# Index of the columns of the duplicates file
+DUPLICATES_HEADER_INDEX = 0
+DUPLICATES_UNIQUE_HEADER_INDEX = 1
+
+# Default index of the column containing the sequence names
+DEFAULT_SEQ_COLUMN_INDEX = 0
+
+
+# List of options allowed
+# -----------------------
+
+# Path to the input file
+INPUT_FILE_OPTION = 'INPUT_FILE'
+
+# Path to the duplicates file
+DUPLICATES_FILE_OPTION = 'DUPLICATES_FILE'
+
+# Path to the output file
+OUTPUT_FILE_OPTION = 'OUTPUT_FILE'
+
+# Index of the column containing the sequence names
+SEQ_COLUMN_INDEX_OPTION = 'SEQ_COLUMN_INDEX'
+
+OPTION_LIST = [ [ '-i', '--input', 'store', 'string', INPUT_FILE_OPTION, None, 'The path to the tab-separated file containing the results for the unique sequences.' ],
+                [ '-d', '--duplicates', 'store', 'string', DUPLICATES_FILE_OPTION, None, 'The path to the file associating each header to the header of its unique sequence.' ],
+                [ '-o', '--output', 'store', 'string', OUTPUT_FILE_OPTION, None, 'The path to the output file.' ],
+                [ '-c', '--column', 'store', 'string', SEQ_COLUMN_INDEX_OPTION, None, 'The index of the column containing the sequence names (0 by default).' ] ]
+
+
+
+# ===========================================
+# Script
+# ===========================================
+
+# get_headers_of_unique_sqce
+# --------------------------
+#
+# This function allows to get the list of headers associated with 
+# each unique sequence from the duplicates file.
+# NB: The unique header is always the first header of its list.
+#
+# @param duplicates_file_path: String - The path to the duplicates file.
+#
+# @return headers_of_unique_sqce: Dictionary - The dictionary that associates to each 
+#                                              unique header the list of its headers.
+#
+def get_headers_of_unique_sqce( duplicates_file_path ):
+
+    headers_of_unique_sqce = {}
+    with open( duplicates_file_path, 'r' ) as duplicates_file:
+        next( duplicates_file )
+        for line in duplicates_file:
+            line = line.replace( '\n', '' ).split( '\t' )
+            header = line[ DUPLICATES_HEADER_INDEX ]
+            unique_header = line[ DUPLICATES_UNIQUE_HEADER_INDEX ]
+            headers = headers_of_unique_sqce.setdefault( unique_header, [ unique_header ] )
+            if ( header != unique_header ):
+                headers.append( header )
+
+    return headers_of_unique_sqce
+
+
+
+# fan_out_duplicate_sequences
+# ---------------------------
+#
+# This function allows to copy the results computed for each unique
+# sequence to all the headers associated with this sequence.
+# NB: The first line of the input file is expected to be a header
+#     and is copied as is. The lines related to sequences that are
+#     not registered in the duplicates file are copied as is.
+#
+# @param input_file_path: String - The path to the input file.
+# @param duplicates_file_path: String - The path to the duplicates file.
+# @param output_file_path: String - The path to the output file.
+# @param seq_column_index: Integer - The index of the column containing the sequence names.
+#
+def fan_out_duplicate_sequences( input_file_path, duplicates_file_path, output_file_path, seq_column_index ):
+
+    # Get the list of headers associated with each unique sequence
+    headers_of_unique_sqce = get_headers_of_unique_sqce( duplicates_file_path )
+
+    # Copy the lines of the input file for all the headers
+    duplicated_line_nb = 0
+    with open( input_file_path, 'r' ) as input_file, \
+         open( output_file_path, 'w' ) as output_file:
+
+        # Copy the header of the file
+        output_file.write( input_file.readline() )
+
+        for line in input_file:
+            line_content = line.replace( '\n', '' ).split( '\t' )
+            headers = headers_of_unique_sqce.get( line_content[ seq_column_index ] )
+
+            if ( not headers ):
+                output_file.write( '\t'.join( line_content ) + '\n' )
+
+            else:
+                for header in headers:
+                    line_content[ seq_column_index ] = header
+                    output_file.write( '\t'.join( line_content ) + '\n' )
+                duplicated_line_nb += len( headers ) - 1
+
+    print( 'INFO :: ' + str( duplicated_line_nb ) + ' lines have been added to ' + output_file_path +
+           ' for the duplicated sequences.' )
+
+
+
+# ===========================================
+# Parse command line arguments
+# and run script
+# ===========================================
+
+#### Code execution in the console ####
+if __name__ == '__main__':
+
+    # Parse the command-line arguments
+    option_dict = parse_arguments( OPTION_LIST )
+
+    # Get the path to the input file
+    input_file_path = get_option( option_dict = option_dict,
+                                  option_name = INPUT_FILE_OPTION,
+                                  not_none = True )
+
+    # Get the path to the duplicates file
+    duplicates_file_path = get_option( option_dict = option_dict,
+                                       option_name = DUPLICATES_FILE_OPTION,
+                                       not_none = True )
+
+    # Get the path to the output file
+    output_file_path = get_option( option_dict = option_dict,
+                                   option_name = OUTPUT_FILE_OPTION,
+                                   not_none = True )
+
+    # Get the index of the column containing the sequence names
+    seq_column_index = get_option( option_dict = option_dict,
+                                   option_name = SEQ_COLUMN_INDEX_OPTION,
+                                   not_none = False )
+
+    if seq_column_index:
+        try:
+            seq_column_index = int( seq_column_index )
+        except:
+            raise Exception( 'The index of the column containing the sequence names has to be an integer.' )
+        else:
+            if ( seq_column_index < 0 ):
+                raise Exception( 'The index of the column containing the sequence names has to be a positive integer.' )
+    else:
+        seq_column_index = DEFAULT_SEQ_COLUMN_INDEX
+
+    # Run the script
+    fan_out_duplicate_sequences( input_file_path = input_file_path,
+                                 duplicates_file_path = duplicates_file_path,
+                                 output_file_path = output_file_path,
+                                 seq_column_index = seq_column_index )
@@ -1,12 +1,35 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 
+import os
 import json
+from collections import OrderedDict
+
+import numpy as np
 
 from fr.tagc.mimicint.util.option.OptionManager import *
 
 # This script allows to generate a json file of all 
-# inferred interactions compatible with Cytoscape
+# inferred interactions compatible with Cytoscape.
+#
+# The same graph may also be exported:
+# - as a compact JSON file (without indentation),
+# - as a columnar binary file (NumPy npz archive) where the nodes
+#   are identified by integers, containing the following arrays:
+#     - node_names: The names of the proteins.
+#     - node_types: The types of the nodes (0 for target, 1 for query).
+#     - node_degrees: The degrees of the nodes.
+#     - edge_sources: The index of the source node (target protein) of the edges.
+#     - edge_targets: The index of the target node (query protein) of the edges.
+#     - edge_types: The types of the edges (1, 2 or 3, see below).
+# - as a folder of pages, so that a viewer may load first the 
+#   proteins with the highest degrees and fetch the others lazily.
+#   The nodes are sorted by decreasing degree and split into pages
+#   of the same size. Each page (compact JSON, same format as the 
+#   JSON file) contains its nodes and the edges between these nodes 
+#   and the nodes of the same or previous pages, so that loading the 
+#   first pages provides the whole graph of the proteins they contain.
+#   The index.json file describes the pages.
 
 
 # ===========================================
@@ -39,6 +62,15 @@ SLIM_DOMAIN_INTERACTION_JSON_TYPE_2 = '2'
   # Both domain-domain SLiM-domain interactions
 BOTH_INTERACTIONS_JSON_TYPE_3 = '3'
 
+# Types of nodes registered in the binary file
+TARGET_NODE_TYPE = 0
+QUERY_NODE_TYPE = 1
+
+# Default number of nodes per page
+DEFAULT_PAGE_SIZE = 1000
+# Name of the file describing the pages
+PAGES_INDEX_FILENAME = 'index.json'
+
 
 # List of options allowed
 # -----------------------
@@ -48,10 +80,22 @@ INFERRED_ALL_INTERACTIONS_FILE_OPTION = 'INFERRED_ALL_INTERACTIONS_FILE'
 TARGET_DOMAIN_ANNOTATIONS_FILE_OPTION = 'TARGET_DOMAIN_ANNOTATIONS_FILE'
 # Path to the JSON file generated
 JSON_OUTPUT_FILE_OPTION = 'JSON_OUTPUT_FILE'
+# Path to the compact JSON file generated
+COMPACT_JSON_OUTPUT_FILE_OPTION = 'COMPACT_JSON_OUTPUT_FILE'
+# Path to the binary file generated
+BINARY_OUTPUT_FILE_OPTION = 'BINARY_OUTPUT_FILE'
+# Path to the folder of pages generated
+PAGES_OUTPUT_FOLDER_OPTION = 'PAGES_OUTPUT_FOLDER'
+# Number of nodes per page
+PAGE_SIZE_OPTION = 'PAGE_SIZE'
 
 OPTION_LIST = [ [ '-i', '--inferredInteractions', 'store', 'string', INFERRED_ALL_INTERACTIONS_FILE_OPTION, None, 'The path to the file containing all the inferred interactions.' ],
                 [ '-t', '--targetDomain', 'store', 'string', TARGET_DOMAIN_ANNOTATIONS_FILE_OPTION, None, 'The path to the file containing all the domains annotated in the target sequences.' ],
-                [ '-o', '--output', 'store', 'string', JSON_OUTPUT_FILE_OPTION, None, 'The path to the JSON file generated.' ] ]
+                [ '-o', '--output', 'store', 'string', JSON_OUTPUT_FILE_OPTION, None, 'The path to the JSON file generated.' ],
+                [ '-c', '--compactOutput', 'store', 'string', COMPACT_JSON_OUTPUT_FILE_OPTION, None, 'The path to the compact JSON file generated (optional).' ],
+                [ '-b', '--binaryOutput', 'store', 'string', BINARY_OUTPUT_FILE_OPTION, None, 'The path to the binary (npz) file generated (optional).' ],
+                [ '-p', '--pagesOutput', 'store', 'string', PAGES_OUTPUT_FOLDER_OPTION, None, 'The path to the folder of pages generated (optional).' ],
+                [ '-s', '--pageSize', 'store', 'int', PAGE_SIZE_OPTION, DEFAULT_PAGE_SIZE, 'The number of nodes per page [default: %default].' ] ]
 
 
 
@@ -59,6 +103,171 @@ OPTION_LIST = [ [ '-i', '--inferredInteractions', 'store', 'string', INFERRED_AL
 # Script
 # ===========================================
 
+# write_json_list
+# ---------------
+#
+# This function allows to write a list of dictionaries in a JSON file
+# one item at a time, so that the whole list never has to be built in
+# memory. The items are written with the same layout as json.dump 
+# with an indentation of 4 spaces, or without any whitespace.
+#
+# @param output_file: File - The JSON file (opened in writing mode).
+# @param key: String - The key associated to the list in the JSON object.
+# @param items: Iterable - The items (dictionaries) of the list.
+# @param is_last: Boolean - Is this list the last value of the JSON object?
+# @param compact: Boolean - Should the list be written without whitespace?
+#
+# @return item_count: Integer - The number of items written.
+#
+def write_json_list( output_file, key, items, is_last, compact=False ):
+    
+    if compact:
+        output_file.write( json.dumps( key ) + ':[' )
+    else:
+        output_file.write( '    ' + json.dumps( key ) + ': [' )
+    
+    item_count = 0
+    for item in items:
+        if ( item_count != 0 ):
+            output_file.write( ',' )
+        if compact:
+            output_file.write( json.dumps( item, separators=( ',', ':' ) ) )
+        else:
+            output_file.write( '\n        ' + json.dumps( item, indent=4 ).replace( '\n', '\n        ' ) )
+        item_count += 1
+    
+    if ( ( item_count != 0 ) and ( not compact ) ):
+        output_file.write( '\n    ' )
+    output_file.write( ']' )
+    if ( not is_last ):
+        output_file.write( ',' )
+    if ( not compact ):
+        output_file.write( '\n' )
+    
+    return item_count
+
+
+
+# write_json_graph
+# ----------------
+#
+# This function allows to write a graph (nodes and edges) in a 
+# JSON file compatible with Cytoscape.
+#
+# @param json_file: String - The path to the JSON file.
+# @param nodes: Iterable - The nodes (dictionaries) of the graph.
+# @param edges: Iterable - The edges (dictionaries) of the graph.
+# @param compact: Boolean - Should the file be written without whitespace?
+#
+def write_json_graph( json_file, nodes, edges, compact=False ):
+    
+    with open( json_file, 'w' ) as output_file:
+        output_file.write( '{' if compact else '{\n' )
+        write_json_list( output_file = output_file,
+                         key = 'nodes',
+                         items = nodes,
+                         is_last = False,
+                         compact = compact )
+        write_json_list( output_file = output_file,
+                         key = 'edges',
+                         items = edges,
+                         is_last = True,
+                         compact = compact )
+        output_file.write( '}' )
+
+
+
+# write_binary_graph
+# ------------------
+#
+# This function allows to write a graph in a columnar binary 
+# file (NumPy npz archive), where nodes are identified by their
+# index.
+#
+# @param binary_file: String - The path to the binary file.
+# @param nodes: List - The list of ( name, type, degree ) tuples of the nodes.
+# @param edges: List - The list of ( source index, target index, type ) tuples of the edges.
+#
+def write_binary_graph( binary_file, nodes, edges ):
+    
+    # NB: The file object is used so that NumPy does not add the 
+    #     .npz extension to the file name
+    with open( binary_file, 'wb' ) as output_file:
+        np.savez_compressed( output_file,
+                             node_names = np.array( [ node[ 0 ] for node in nodes ], dtype = str ),
+                             node_types = np.array( [ node[ 1 ] for node in nodes ], dtype = np.int8 ),
+                             node_degrees = np.array( [ node[ 2 ] for node in nodes ], dtype = np.int32 ),
+                             edge_sources = np.array( [ edge[ 0 ] for edge in edges ], dtype = np.int32 ),
+                             edge_targets = np.array( [ edge[ 1 ] for edge in edges ], dtype = np.int32 ),
+                             edge_types = np.array( [ int( edge[ 2 ] ) for edge in edges ], dtype = np.int8 ) )
+
+
+
+# write_json_pages
+# ----------------
+#
+# This function allows to write a graph in a folder of pages of
+# compact JSON files. The nodes are sorted by decreasing degree and
+# split into pages of page_size nodes. Each edge is written in the
+# page of the last of its two nodes.
+#
+# @param pages_folder: String - The path to the folder of pages.
+# @param nodes: List - The list of ( name, type, degree ) tuples of the nodes.
+# @param edges: List - The list of ( source index, target index, type ) tuples of the edges.
+# @param get_node_json: Function - The function returning the dictionary of a node
+#                                  from its index.
+# @param get_edge_json: Function - The function returning the dictionary of an edge
+#                                  from its index.
+# @param page_size: Integer - The number of nodes per page.
+#
+# @raise Exception - When the number of nodes per page is not positive.
+#
+def write_json_pages( pages_folder, nodes, edges, get_node_json, get_edge_json, page_size ):
+    
+    if ( page_size <= 0 ):
+        raise Exception( 'The number of nodes per page has to be positive.' )
+    
+    if ( not os.path.isdir( pages_folder ) ):
+        os.makedirs( pages_folder )
+    
+    # Sort the nodes by decreasing degree (keeping the order
+    # of the nodes for equal degrees) and get their page
+    sorted_node_indexes = sorted( range( len( nodes ) ), key = lambda node_index: -nodes[ node_index ][ 2 ] )
+    node_pages = [ 0 ] * len( nodes )
+    for ( rank, node_index ) in enumerate( sorted_node_indexes ):
+        node_pages[ node_index ] = rank // page_size
+    
+    # Get the edges of each page
+    page_nb = ( len( nodes ) + page_size - 1 ) // page_size
+    page_edges = [ [] for k in range( page_nb ) ]
+    for ( edge_index, ( source_index, target_index, edge_type ) ) in enumerate( edges ):
+        page_edges[ max( node_pages[ source_index ], node_pages[ target_index ] ) ].append( edge_index )
+    
+    # Write the pages
+    pages_index = []
+    for page in range( page_nb ):
+        page_node_indexes = sorted_node_indexes[ page * page_size : ( page + 1 ) * page_size ]
+        page_file = 'page_' + str( page ).zfill( 5 ) + '.json'
+        write_json_graph( json_file = os.path.join( pages_folder, page_file ),
+                          nodes = ( get_node_json( node_index ) for node_index in page_node_indexes ),
+                          edges = ( get_edge_json( edge_index ) for edge_index in page_edges[ page ] ),
+                          compact = True )
+        pages_index.append( OrderedDict( [ ( 'file', page_file ),
+                                           ( 'node_count', len( page_node_indexes ) ),
+                                           ( 'edge_count', len( page_edges[ page ] ) ),
+                                           ( 'max_degree', nodes[ page_node_indexes[ 0 ] ][ 2 ] ),
+                                           ( 'min_degree', nodes[ page_node_indexes[ -1 ] ][ 2 ] ) ] ) )
+    
+    # Write the index of the pages
+    with open( os.path.join( pages_folder, PAGES_INDEX_FILENAME ), 'w' ) as index_file:
+        json.dump( OrderedDict( [ ( 'page_size', page_size ),
+                                  ( 'node_count', len( nodes ) ),
+                                  ( 'edge_count', len( edges ) ),
+                                  ( 'pages', pages_index ) ] ), 
+                   index_file, indent=4 )
+
+
+
 # generate_json
 # -------------
 #
@@ -70,28 +279,37 @@ OPTION_LIST = [ [ '-i', '--inferredInteractions', 'store', 'string', INFERRED_AL
 #     2 - The SLiM-domain interactions
 #     3 - The proteins that interact through both domain-domain and
 #         SLiM-domain interactions
+# NB: The nodes and edges are written one at a time, hence the time and 
+#     memory spent are linear in the number of interactions.
+# NB: The same graph may also be written as a compact JSON file, 
+#     as a binary file and as a folder of pages.
 #
 # @param inferred_all_interactions_file: String - The path to the file containing all the 
 #                                                 inferred interactions.
 # @param target_domain_annotations_file: String - The path to the file containing all the domains 
 #                                                 annotated in the target sequences.
 # @param all_interactions_json_file: String - The path to the JSON file generated.
+# @param compact_json_file: String - The path to the compact JSON file generated (optional).
+# @param binary_file: String - The path to the binary (npz) file generated (optional).
+# @param pages_folder: String - The path to the folder of pages generated (optional).
+# @param page_size: Integer - The number of nodes per page.
 #
-def generate_json( inferred_all_interactions_file, target_domain_annotations_file, all_interactions_json_file ):
+def generate_json( inferred_all_interactions_file, target_domain_annotations_file, all_interactions_json_file,
+                   compact_json_file=None, binary_file=None, pages_folder=None, page_size=DEFAULT_PAGE_SIZE ):
     
-    # Get the list of target protein names from 
-    # the query_domain_parsed_file file
-    all_target_proteins_list = []
+    # Get the set of target protein names from 
+    # the target domain annotations file
+    # NB: Each protein is registered once, whatever
+    #     the number of domains annotated.
+    all_target_proteins_set = set()
     with open( target_domain_annotations_file, 'r' ) as target_domain_annot_file:
         # Skip headers
         next( target_domain_annot_file )
-        line = target_domain_annot_file.readline()
-        while ( line != '' ):
-            all_target_proteins_list.append( line.split( '\t' )[ DOMAIN_FILE_PROT_INDEX ] )
-            line = target_domain_annot_file.readline()
+        for line in target_domain_annot_file:
+            all_target_proteins_set.add( line.split( '\t', DOMAIN_FILE_PROT_INDEX + 1 )[ DOMAIN_FILE_PROT_INDEX ] )
     
     
-    # NB: All proteins which are not part of the all_target_proteins_list 
+    # NB: All proteins which are not part of the all_target_proteins_set 
     #     are then considered as query protein.
     # NB: If necessary, SLiM sequence names could be imported from the
     #     query_domain_parsed_file and query_slim_slimprob_parsed_file
@@ -102,9 +320,9 @@ def generate_json( inferred_all_interactions_file, target_domain_annotations_fil
     # interactions between target and query proteins.
     # Define a dictionary to register all the target proteins and their 
     # degrees and a dictionary to register all the query proteins and 
-    # their degrees.
-    target_protein_degrees = {}
-    query_protein_degress = {}
+    # their degrees (in the order in which they are found).
+    target_protein_degrees = OrderedDict()
+    query_protein_degrees = OrderedDict()
 
     # Defines a list that will register all the SLiM-domain interactions 
     # and a list that will register all the domain-domain interactions.
@@ -116,8 +334,7 @@ def generate_json( inferred_all_interactions_file, target_domain_annotations_fil
     with open( inferred_all_interactions_file, 'r' ) as all_interactions_file:
         # Skip headers
         next( all_interactions_file )
-        line = all_interactions_file.readline()
-        while ( line != '' ):
+        for line in all_interactions_file:
             line = line.split( '\t' )
             
             # Get the name of the proteins
@@ -125,27 +342,16 @@ def generate_json( inferred_all_interactions_file, target_domain_annotations_fil
             protein_2 = line[ ALL_INTER_FILE_PROT2_INDEX ]
             # Check which of the protein comes from the target
             # and which comes from the query
-            if ( protein_1 in all_target_proteins_list ):
+            if ( protein_1 in all_target_proteins_set ):
                 target_protein = protein_1
                 query_protein = protein_2
             else:
                 target_protein = protein_2
                 query_protein = protein_1
                 
-            # Add the target proteins to the dictionaries containing 
-            # the target nodes
-            if ( target_protein in target_protein_degrees.keys() ):
-                target_protein_degrees[ target_protein ] += 1
-            else:
-                target_protein_degrees[ target_protein ] = 1
-                
-            # Add the query proteins to the dictionaries containing 
-            # the query nodes
-            if ( query_protein in query_protein_degress.keys() ):
-                query_protein_degress[ query_protein ] += 1
-            else:
-                query_protein_degress[ query_protein ] = 1
-             
+            # Count the degrees of the target and query proteins
+            target_protein_degrees[ target_protein ] = target_protein_degrees.get( target_protein, 0 ) + 1
+            query_protein_degrees[ query_protein ] = query_protein_degrees.get( query_protein, 0 ) + 1
              
             # Get the type of interaction
             interaction_type = line[ ALL_INTER_FILE_INTER_TYPE_INDEX ]
@@ -154,69 +360,89 @@ def generate_json( inferred_all_interactions_file, target_domain_annotations_fil
                 slim_domain_interactions.append( ( target_protein, query_protein ) )
             elif ( interaction_type == DOMAIN_DOMAIN_INTERACTION + '\n' ):
                 domain_domain_interactions.append( ( target_protein, query_protein ) )
-            
-            # Get the next line
-            line = all_interactions_file.readline()
     
     # Get the couple of (target, query) proteins that interact together 
     # through both SLiM-domain and domain-domain interactions
-    domain_domain_interactions_set = set( domain_domain_interactions )
+    # NB: These couples are kept in the order of the domain-domain 
+    #     interactions, so that the file generated is reproducible.
     slim_domain_interactions_set = set( slim_domain_interactions )
-    both_interactions = list( domain_domain_interactions_set.intersection( slim_domain_interactions_set ) )
-        
+    both_interactions = OrderedDict()
+    for interaction in domain_domain_interactions:
+        if ( interaction in slim_domain_interactions_set ):
+            both_interactions[ interaction ] = True
     
-    # Prepare the lists of proteins and interactions to be exported as JSON file        
-    # Build the list of nodes
-    nodes_list = []
     
-    # Add the target proteins to the list of nodes
+    # Register the nodes and the edges
+    # -------------------------------
+    # The nodes (the target proteins, then the query proteins) are 
+    # registered as ( name, type, degree ) tuples and the edges (the
+    # domain-domain interactions, then the SLiM-domain interactions 
+    # and the interactions through both) are registered as ( source 
+    # node index, target node index, JSON type ) tuples.
+    nodes = []
+    target_node_indexes = {}
     for ( target_protein, degree ) in target_protein_degrees.items():
-        nodes_list.append( { "data": { "id": target_protein,
-                                       "type": "target",
-                                       "target_degree": str( degree ) } } )
-        
-    # Add the query proteins to the list of nodes
-    for ( query_protein, degree ) in query_protein_degress.items():
-        nodes_list.append( { "data": { "id": query_protein,
-                                       "type": "query",
-                                       "query_degree": str( degree ) } } )
-        
-    # Build the list of edges
-    edges_list = []
-    autoincrement_id = 1
-    
-    # Add the domain-domain interactions to the list of edges
-    for ( target_protein, query_protein ) in domain_domain_interactions:
-        edges_list.append( { "data": { "id": str( autoincrement_id ),
-                                       "source": target_protein,
-                                       "target": query_protein,
-                                       "type": DOMAIN_DOMAIN_INTERACTION_JSON_TYPE_1 } } )
-        autoincrement_id += 1
-        
-    # Add the slim-domain interactions to the list of edges
-    for ( target_protein, query_protein ) in slim_domain_interactions:
-        edges_list.append( { "data": { "id": str( autoincrement_id ),
-                                       "source": target_protein,
-                                       "target": query_protein,
-                                       "type": SLIM_DOMAIN_INTERACTION_JSON_TYPE_2 } } )
-        autoincrement_id += 1
-        
-    # Add the proteins that interact together through both domain-domain
-    # and SLiM-domain interactions to the list of edges
-    for ( target_protein, query_protein ) in both_interactions:
-        edges_list.append( { "data": { "id": str( autoincrement_id ),
-                                       "source": target_protein,
-                                       "target": query_protein,
-                                       "type": BOTH_INTERACTIONS_JSON_TYPE_3 } } )
-        autoincrement_id += 1
-        
-        
-    # Build the dictionary that will be written in the JSON file
-    json_dict = { "nodes": nodes_list,
-                  "edges": edges_list }
-    
-    with open( all_interactions_json_file, 'w' ) as output_file:
-        json.dump( json_dict, output_file, indent=4 )
+        target_node_indexes[ target_protein ] = len( nodes )
+        nodes.append( ( target_protein, TARGET_NODE_TYPE, degree ) )
+    query_node_indexes = {}
+    for ( query_protein, degree ) in query_protein_degrees.items():
+        query_node_indexes[ query_protein ] = len( nodes )
+        nodes.append( ( query_protein, QUERY_NODE_TYPE, degree ) )
+    
+    edges = []
+    for ( interactions, interaction_json_type ) in [ ( domain_domain_interactions, DOMAIN_DOMAIN_INTERACTION_JSON_TYPE_1 ),
+                                                     ( slim_domain_interactions, SLIM_DOMAIN_INTERACTION_JSON_TYPE_2 ),
+                                                     ( both_interactions.keys(), BOTH_INTERACTIONS_JSON_TYPE_3 ) ]:
+        for ( target_protein, query_protein ) in interactions:
+            edges.append( ( target_node_indexes[ target_protein ], 
+                            query_node_indexes[ query_protein ], 
+                            interaction_json_type ) )
+    
+    # Get the dictionary of a node from its index
+    def get_node_json( node_index ):
+        ( protein, node_type, degree ) = nodes[ node_index ]
+        if ( node_type == TARGET_NODE_TYPE ):
+            return { "data": { "id": protein,
+                               "type": "target",
+                               "target_degree": str( degree ) } }
+        else:
+            return { "data": { "id": protein,
+                               "type": "query",
+                               "query_degree": str( degree ) } }
+    
+    # Get the dictionary of an edge from its index
+    # NB: The edges are identified by an autoincrement starting at 1
+    def get_edge_json( edge_index ):
+        ( source_index, target_index, interaction_json_type ) = edges[ edge_index ]
+        return { "data": { "id": str( edge_index + 1 ),
+                           "source": nodes[ source_index ][ 0 ],
+                           "target": nodes[ target_index ][ 0 ],
+                           "type": interaction_json_type } }
+    
+    
+    # Write the nodes and the edges in the output files
+    # -------------------------------------------------
+    json_files = [ ( all_interactions_json_file, False ) ]
+    if compact_json_file:
+        json_files.append( ( compact_json_file, True ) )
+    for ( json_file, compact ) in json_files:
+        write_json_graph( json_file = json_file,
+                          nodes = ( get_node_json( node_index ) for node_index in range( len( nodes ) ) ),
+                          edges = ( get_edge_json( edge_index ) for edge_index in range( len( edges ) ) ),
+                          compact = compact )
+    
+    if binary_file:
+        write_binary_graph( binary_file = binary_file,
+                            nodes = nodes,
+                            edges = edges )
+    
+    if pages_folder:
+        write_json_pages( pages_folder = pages_folder,
+                          nodes = nodes,
+                          edges = edges,
+                          get_node_json = get_node_json,
+                          get_edge_json = get_edge_json,
+                          page_size = page_size )
 
 
 
@@ -245,8 +471,25 @@ if __name__=='__main__':
                                              option_name = JSON_OUTPUT_FILE_OPTION, 
                                              not_none = True )
     
+    # Get the paths to the optional outputs
+    compact_json_file = get_option( option_dict = option_dict, 
+                                    option_name = COMPACT_JSON_OUTPUT_FILE_OPTION )
+    binary_file = get_option( option_dict = option_dict, 
+                              option_name = BINARY_OUTPUT_FILE_OPTION )
+    pages_folder = get_option( option_dict = option_dict, 
+                               option_name = PAGES_OUTPUT_FOLDER_OPTION )
+    
+    # Get the number of nodes per page
+    page_size = get_option( option_dict = option_dict, 
+                            option_name = PAGE_SIZE_OPTION,
+                            not_none = True )
+    
     # Run the script    
     generate_json( inferred_all_interactions_file = inferred_all_interactions_file, 
                    target_domain_annotations_file = target_domain_annotations_file, 
-                   all_interactions_json_file = all_interactions_json_file )
+                   all_interactions_json_file = all_interactions_json_file,
+                   compact_json_file = compact_json_file,
+                   binary_file = binary_file,
+                   pages_folder = pages_folder,
+                   page_size = page_size )
     
\ No newline at end of file
@@ -1,13 +1,49 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 
+import os
 import json
+from collections import OrderedDict
 
+from fr.tagc.mimicint.compute_query_disorder import read_iuscores_file
 from fr.tagc.mimicint.util.option.OptionManager import *
 
 # This script allows to generate a json file containing
 # the features of all the query proteins necessary to
-# vizualise the proteins on browsers
+# vizualise the proteins on browsers.
+#
+# The disorder propensities (IUPred scores) of the residues
+# (IUPRED key) may be registered using the following encodings:
+# - points: A list of { "x": position, "y": score } objects,
+#           one per residue (verbose format).
+# - array: An object { "encoding": "array", "precision": 2,
+#          "values": [ score, ... ] } where the scores are rounded
+#          and the position of each score is implicit (the first 
+#          value is the score of the residue at position 1).
+# - rle: An object { "encoding": "rle", "precision": 2, 
+#        "values": [ [ score, count ], ... ] } where the rounded 
+#        scores are run-length encoded, i.e. each pair provides
+#        a score and the number of consecutive residues sharing it.
+# The file is written with an indentation of 4 spaces using the 
+# points encoding and without any whitespace using the other ones.
+# NB: The IUPred scores are read from the binary file written by the
+#     compute_query_disorder script when it is provided, and from the
+#     last column of the disorder propensities file otherwise. They are
+#     rounded to 2 decimals whatever the encoding.
+#
+# The features may also be written in a folder of shards, so that
+# the features of a protein may be loaded without reading the whole
+# file. Each shard (shard_00000.json, ...) is a JSON object (without
+# whitespace) containing the features of up to shard_size proteins,
+# with the same format as the JSON file. The index.json file of the
+# folder associates to each protein the file of its shard and the
+# offset and length (in bytes) of its features in this file, e.g.
+#     { "shard_size": 100, "protein_count": 1, 
+#       "shards": [ "shard_00000.json" ],
+#       "proteins": { "P1": { "shard": "shard_00000.json", 
+#                             "offset": 6, "length": 1234 } } }
+# so that the features of a protein can be parsed from the bytes
+# [ offset, offset + length ) of its shard.
 
 
 # ===========================================
@@ -33,6 +69,20 @@ QUERY_SLIM_PARSED_STOP_POS_INDEX = 4
 QUERY_DISORDER_PROPENSITIES_PROT_NAME_INDEX = 0
 QUERY_DISORDER_PROPENSITIES_VALUES_INDEX = 3
 
+# Encodings of the IUPred scores
+IUPRED_ENCODING_POINTS = 'points'
+IUPRED_ENCODING_ARRAY = 'array'
+IUPRED_ENCODING_RLE = 'rle'
+ALLOWED_IUPRED_ENCODINGS = [ IUPRED_ENCODING_POINTS, IUPRED_ENCODING_ARRAY, IUPRED_ENCODING_RLE ]
+DEFAULT_IUPRED_ENCODING = IUPRED_ENCODING_ARRAY
+# Number of decimals kept for the IUPred scores
+IUPRED_PRECISION = 2
+
+# Default number of proteins per shard
+DEFAULT_SHARD_SIZE = 100
+# Name of the file describing the shards
+SHARDS_INDEX_FILENAME = 'index.json'
+
 
 # List of options allowed
 # -----------------------
@@ -44,14 +94,27 @@ QUERY_DOMAIN_PARSED_FILE_OPTION = 'QUERY_DOMAIN_PARSED_FILE'
 QUERY_SLIMPROB_PARSED_FILE_OPTION = 'QUERY_SLIMPROB_PARSED_FILE'
 # Path to the disorder propensities file
 DISORDER_PROPENSITIES_FILE_OPTION = 'DISORDER_PROPENSITIES_FILE'
+# Path to the binary file of IUPred scores
+IUSCORES_FILE_OPTION = 'IUSCORES_FILE'
 # Path to the query features JSON file
 QUERY_FEATURES_JSON_FILE_OPTION = 'QUERY_FEATURES_JSON_FILE'
+# Encoding of the IUPred scores
+IUPRED_ENCODING_OPTION = 'IUPRED_ENCODING'
+# Path to the folder of query features shards
+QUERY_FEATURES_SHARDS_FOLDER_OPTION = 'QUERY_FEATURES_SHARDS_FOLDER'
+# Number of proteins per shard
+SHARD_SIZE_OPTION = 'SHARD_SIZE'
 
 OPTION_LIST = [ [ '-f', '--queryFasta', 'store', 'string', QUERY_FASTA_FILE_OPTION, None, '' ],
                 [ '-d', '--queryDomain', 'store', 'string', QUERY_DOMAIN_PARSED_FILE_OPTION, None, '' ],
                 [ '-m', '--querySlimprob', 'store', 'string', QUERY_SLIMPROB_PARSED_FILE_OPTION, None, '' ],
                 [ '-p', '--queryPropensities', 'store', 'string', DISORDER_PROPENSITIES_FILE_OPTION, None, '' ],
-                [ '-o', '--output', 'store', 'string', QUERY_FEATURES_JSON_FILE_OPTION, None, '' ] ]
+                [ '-i', '--queryScores', 'store', 'string', IUSCORES_FILE_OPTION, None, 'The path to the binary file of IUPred scores (optional).' ],
+                [ '-o', '--output', 'store', 'string', QUERY_FEATURES_JSON_FILE_OPTION, None, '' ],
+                [ '-e', '--iupredEncoding', 'store', 'choice', IUPRED_ENCODING_OPTION, ALLOWED_IUPRED_ENCODINGS, DEFAULT_IUPRED_ENCODING,
+                  'The encoding of the IUPred scores (must be one of ' + ', '.join( ALLOWED_IUPRED_ENCODINGS ) + ') [default: %default].' ],
+                [ '-s', '--shardsFolder', 'store', 'string', QUERY_FEATURES_SHARDS_FOLDER_OPTION, None, 'The path to the folder of query features shards (optional).' ],
+                [ '-z', '--shardSize', 'store', 'int', SHARD_SIZE_OPTION, DEFAULT_SHARD_SIZE, 'The number of proteins per shard [default: %default].' ] ]
 
 
 
@@ -59,153 +122,370 @@ OPTION_LIST = [ [ '-f', '--queryFasta', 'store', 'string', QUERY_FASTA_FILE_OPTI
 # Script
 # ===========================================
 
-## query_proteins_features_to_json
-#  -------------------------------
+## encode_iuscores
+#  ---------------
 #
-# This function allows to generate a JSON file resuming
-# the most important features of the query sequences.
+# This function allows to encode the IUPred scores of a protein
+# in order to register them in the JSON file.
+#
+# @param iuscores: Iterable - The IUPred scores (numbers) of the residues.
+# @param iupred_encoding: String - The encoding to use (points, array or rle).
+#
+# @return The IUPred scores encoded (List or Dictionary).
+#
+def encode_iuscores( iuscores, iupred_encoding ):
+    
+    rounded_iuscores = [ round( float( iuscore ), IUPRED_PRECISION ) for iuscore in iuscores ]
+    
+    if ( iupred_encoding == IUPRED_ENCODING_POINTS ):
+        return [ { 'x': aa_pos, 'y': iuscore } for ( aa_pos, iuscore ) in enumerate( rounded_iuscores, 1 ) ]
+    
+    if ( iupred_encoding == IUPRED_ENCODING_RLE ):
+        values = []
+        for iuscore in rounded_iuscores:
+            if ( values and ( values[ -1 ][ 0 ] == iuscore ) ):
+                values[ -1 ][ 1 ] += 1
+            else:
+                values.append( [ iuscore, 1 ] )
+    else:
+        values = rounded_iuscores
+    
+    return { 'encoding': iupred_encoding,
+             'precision': IUPRED_PRECISION,
+             'values': values }
+
+
+
+## write_features
+#  --------------
+#
+# This function allows to write the features of the query proteins in
+# a JSON file and / or in a folder of shards (with an index allowing to
+# find the features of each protein, see the description of the script).
+# The proteins are written one at a time in all the outputs, hence only
+# the features of one protein have to be held in memory by the caller.
+# The JSON file is written with the same layout as json.dump with an
+# indentation of 4 spaces, or without any whitespace.
+#
+# @param features_items: Iterable - The ( protein name, features ) tuples.
+# @param query_features_json_file: String - The path to the JSON file (optional).
+# @param compact: Boolean - Should the JSON file be written without whitespace?
+# @param shards_folder: String - The path to the folder of shards (optional).
+# @param shard_size: Integer - The number of proteins per shard.
+#
+# @raise Exception - When the number of proteins per shard is not positive.
+#
+def write_features( features_items, query_features_json_file=None, compact=True, \
+                    shards_folder=None, shard_size=DEFAULT_SHARD_SIZE ):
+    
+    if shards_folder:
+        if ( shard_size <= 0 ):
+            raise Exception( 'The number of proteins per shard has to be positive.' )
+        if ( not os.path.isdir( shards_folder ) ):
+            os.makedirs( shards_folder )
+    
+    shards = []
+    proteins_index = {}
+    query_features_json = None
+    shard_file = None
+    protein_count = 0
+    try:
+        if query_features_json_file:
+            query_features_json = open( query_features_json_file, 'w' )
+            query_features_json.write( '{' )
+        
+        for ( prot_name, features ) in features_items:
+            
+            # Write the features of the protein in the JSON file
+            if query_features_json:
+                if ( protein_count != 0 ):
+                    query_features_json.write( ',' )
+                if compact:
+                    query_features_json.write( json.dumps( prot_name ) + ':' + 
+                                               json.dumps( features, separators=( ',', ':' ) ) )
+                else:
+                    query_features_json.write( '\n    ' + json.dumps( prot_name ) + ': ' +
+                                               json.dumps( features, indent=4 ).replace( '\n', '\n    ' ) )
+            
+            # Write the features of the protein in its shard
+            if shards_folder:
+                # Open a new shard when necessary
+                if ( ( protein_count % shard_size ) == 0 ):
+                    if shard_file:
+                        shard_file.write( '}' )
+                        shard_file.close()
+                    shard_filename = 'shard_' + str( len( shards ) ).zfill( 5 ) + '.json'
+                    shards.append( shard_filename )
+                    shard_file = open( os.path.join( shards_folder, shard_filename ), 'w' )
+                    shard_file.write( '{' )
+                    offset = 1
+                else:
+                    shard_file.write( ',' )
+                    offset += 1
+                
+                # Register the location of the features
+                # NB: The strings are ASCII-encoded by json.dumps, hence their 
+                #     length equals their size in bytes.
+                prot_key = json.dumps( prot_name ) + ':'
+                prot_features = json.dumps( features, separators=( ',', ':' ) )
+                shard_file.write( prot_key + prot_features )
+                proteins_index[ prot_name ] = { 'shard': shard_filename,
+                                                'offset': offset + len( prot_key ),
+                                                'length': len( prot_features ) }
+                offset += len( prot_key ) + len( prot_features )
+            
+            protein_count += 1
+        
+        if query_features_json:
+            if ( ( protein_count != 0 ) and ( not compact ) ):
+                query_features_json.write( '\n' )
+            query_features_json.write( '}' )
+        if shard_file:
+            shard_file.write( '}' )
+    finally:
+        if query_features_json:
+            query_features_json.close()
+        if shard_file:
+            shard_file.close()
+    
+    # Write the index of the shards
+    if shards_folder:
+        with open( os.path.join( shards_folder, SHARDS_INDEX_FILENAME ), 'w' ) as index_file:
+            json.dump( { 'shard_size': shard_size,
+                         'protein_count': len( proteins_index ),
+                         'shards': shards,
+                         'proteins': proteins_index },
+                       index_file, separators=( ',', ':' ) )
+
+
+
+## write_features_shards
+#  ---------------------
+#
+# This function allows to write the features of the query proteins
+# in a folder of shards only (see write_features).
+#
+# @param features_items: Iterable - The ( protein name, features ) tuples.
+# @param shards_folder: String - The path to the folder of shards.
+# @param shard_size: Integer - The number of proteins per shard.
+#
+def write_features_shards( features_items, shards_folder, shard_size ):
+    
+    write_features( features_items = features_items,
+                    shards_folder = shards_folder,
+                    shard_size = shard_size )
+
+
+
+## read_fasta_sequences
+#  --------------------
+#
+# This function allows to get the sequences of the query fasta file,
+# one at a time. The lines of each sequence are joined once the whole
+# sequence has been read, hence the time spent is linear in the size
+# of the file.
 #
 # @param query_fasta_file: String - The path to the query sequences fasta file.
-# @param query_domain_parsed_file: String - The path to the query domain parsed file.
-# @param query_slim_parsed_file: String - The path to the query SLiMProb parsed file.
-# @param disorder_propensities_file: String - The path to the disorder propensities file.
-# @param query_features_json_file: String - The path to the query features JSON file (the output).
 #
-def query_proteins_features_to_json( query_fasta_file, query_domain_parsed_file, query_slim_parsed_file, \
-                                     disorder_propensities_file, query_features_json_file ):
-    
-    # Get all the query sequence names
-    # Ideally, the match_query_sqce_names rule succeed to associate 
-    # to each sequence name of SLiMProb output its actual sequence 
-    # name as provided in the query fasta file. Nevertheless, this
-    # can sometimes fail, resulting in key errors in the current 
-    # script when trying to access the dictionary with SLiMProb 
-    # sequence names. In order to avoid this, the sequences for which
-    # no match may be found are registered twice under both of their 
-    # name (meaning the information belonging to the smae protein will 
-    # unfortunatelly be registered in two "objects" of the json file).
-    sequences_dict = {}
-    
-    # Get all the query sequence names and sequences from the fasta file
+# @return Generator - The ( protein name, sequence ) tuples, in the order of the file.
+#
+def read_fasta_sequences( query_fasta_file ):
+    
+    protein_name = None
+    sequence_lines = []
     with open( query_fasta_file, 'r' ) as query_fasta:
-        line = query_fasta.readline().replace( '\n', '' )
-        while ( line != '' ):
+        for line in query_fasta:
+            line = line.replace( '\n', '' )
             if line.startswith( '>' ):
-                # Parse the header to get the name of the protein and 
-                # instantiate a string for this protein in the dictionary
-                line = line[1:]
-                protein_name = line.split( ' ' )[0]
-                sequences_dict[ protein_name ] = ''
-            else:
+                if ( protein_name is not None ):
+                    yield ( protein_name, ''.join( sequence_lines ) )
+                # Parse the header to get the name of the protein
+                protein_name = line[1:].split( ' ' )[0]
+                sequence_lines = []
+            elif ( protein_name is not None ):
                 # Add the line to the sequence
-                sequences_dict[ protein_name ] += line
-            line = query_fasta.readline().replace( '\n', '' )
-    
-    # Complete the dictionary of sequence nmaes
-    with open( disorder_propensities_file, 'r' ) as disorder_propensities:
-        # Skip headers
-        next( disorder_propensities )
-        line = disorder_propensities.readline().replace( '\n', '' )
-        while ( line != '' ):
-            # Parse the line to get information about the motif
-            line = line.split( '\t' )
-            protein_name = line[ QUERY_DISORDER_PROPENSITIES_PROT_NAME_INDEX ]
-            # If the protein name is not registered in the dictionary, add it
-            existing_protein_name = sequences_dict.get( protein_name )
-            if ( not existing_protein_name ): 
-                sequences_dict[ protein_name ] = ''
-    
-            line = disorder_propensities.readline().replace( '\n', '' )
+                sequence_lines.append( line )
     
+    if ( protein_name is not None ):
+        yield ( protein_name, ''.join( sequence_lines ) )
+
+
+
+## read_domains
+#  ------------
+#
+# This function allows to get all the domains detected on the query proteins.
+#
+# @param query_domain_parsed_file: String - The path to the query domain parsed file.
+#
+# @return domains_dict: OrderedDict - The dictionary that associates to each protein 
+#                                     name its list of domains.
+#
+def read_domains( query_domain_parsed_file ):
     
-    # Get all the domains detected on the query proteins
-    # Instantiate a dictionary that associate to each query
-    # protein its list of domains
-    domains_dict = { protein_name: [] for protein_name in sequences_dict.keys() }
+    domains_dict = OrderedDict()
     with open( query_domain_parsed_file, 'r' ) as query_domain_parsed:
         # Skip headers
         next( query_domain_parsed )
-        line = query_domain_parsed.readline().replace( '\n', '' )
-        while ( line != '' ):
+        for line in query_domain_parsed:
+            line = line.replace( '\n', '' )
+            if ( line == '' ):
+                continue
             # Parse the line to get information about the domain
             line = line.split( '\t' )
-            protein_name = line[ QUERY_DOMAIN_PARSED_PROT_NAME_INDEX ]
-            start_pos = line[ QUERY_DOMAIN_PARSED_START_POS_INDEX ]
-            stop_pos = line[ QUERY_DOMAIN_PARSED_STOP_POS_INDEX ]
-            description = line[ QUERY_DOMAIN_PARSED_DESCRIPTION_INDEX ]
-            signature_acc = line[ QUERY_DOMAIN_PARSED_SIGNATURE_ACC_INDEX ]
-            interpro_annot = line[ QUERY_DOMAIN_PARSED_IPS_ANNOT_INDEX ]
-            domain = { 'x': start_pos,
-                       'y': stop_pos,
-                       'description': description + '\n InterPro annotation:' + interpro_annot, 
-                       'id': signature_acc }
-            
-            # Append the entry to the list of domain for the protein
-            domains_dict[ protein_name ].append( domain )
+            domain = OrderedDict( [ ( 'x', line[ QUERY_DOMAIN_PARSED_START_POS_INDEX ] ),
+                                    ( 'y', line[ QUERY_DOMAIN_PARSED_STOP_POS_INDEX ] ),
+                                    ( 'description', line[ QUERY_DOMAIN_PARSED_DESCRIPTION_INDEX ] + 
+                                                     '\n InterPro annotation:' + line[ QUERY_DOMAIN_PARSED_IPS_ANNOT_INDEX ] ), 
+                                    ( 'id', line[ QUERY_DOMAIN_PARSED_SIGNATURE_ACC_INDEX ] ) ] )
             
-            line = query_domain_parsed.readline().replace( '\n', '' )
+            # Append the entry to the list of domains of the protein
+            domains_dict.setdefault( line[ QUERY_DOMAIN_PARSED_PROT_NAME_INDEX ], [] ).append( domain )
     
+    return domains_dict
+
+
+
+## read_motifs
+#  -----------
+#
+# This function allows to get all the motifs detected on the query proteins.
+#
+# @param query_slim_parsed_file: String - The path to the query SLiMProb parsed file.
+#
+# @return motifs_dict: OrderedDict - The dictionary that associates to each protein 
+#                                    name its list of SLiMs.
+#
+def read_motifs( query_slim_parsed_file ):
     
-    # Get all the motifs detected on the query proteins
-    # Instantiate a dictionary that associate to each query
-    # protein its list of SLiMs
-    motifs_dict = { protein_name: [] for protein_name in sequences_dict.keys() }
+    motifs_dict = OrderedDict()
     with open( query_slim_parsed_file, 'r' ) as query_slim_parsed:
         # Skip headers
         next( query_slim_parsed )
-        line = query_slim_parsed.readline().replace( '\n', '' )
-        while ( line != '' ):
+        for line in query_slim_parsed:
+            line = line.replace( '\n', '' )
+            if ( line == '' ):
+                continue
             # Parse the line to get information about the motif
             line = line.split( '\t' )
-            protein_name = line[ QUERY_SLIM_PARSED_PROT_NAME_INDEX ]
-            start_pos = line[ QUERY_SLIM_PARSED_START_POS_INDEX ]
-            stop_pos = line[ QUERY_SLIM_PARSED_STOP_POS_INDEX ]
-            description = line[ QUERY_SLIM_PARSED_DESCRIPTION_INDEX ]
-            motif_id = line[ QUERY_SLIM_PARSED_MOTIF_ID_INDEX ]
-            motif = { 'x': start_pos,
-                      'y': stop_pos,
-                      'description': description, 
-                      'id': motif_id }
+            motif = OrderedDict( [ ( 'x', line[ QUERY_SLIM_PARSED_START_POS_INDEX ] ),
+                                   ( 'y', line[ QUERY_SLIM_PARSED_STOP_POS_INDEX ] ),
+                                   ( 'description', line[ QUERY_SLIM_PARSED_DESCRIPTION_INDEX ] ), 
+                                   ( 'id', line[ QUERY_SLIM_PARSED_MOTIF_ID_INDEX ] ) ] )
             
-            # Append the entry to the list of domain for the protein
-            motifs_dict[ protein_name ].append( motif )
+            # Append the entry to the list of motifs of the protein
+            motifs_dict.setdefault( line[ QUERY_SLIM_PARSED_PROT_NAME_INDEX ], [] ).append( motif )
     
-            line = query_slim_parsed.readline().replace( '\n', '' )
+    return motifs_dict
+
+
+
+## read_iuscores
+#  -------------
+#
+# This function allows to get the disorder propensities (IUPred scores) 
+# of the amino acids of the query proteins.
+#
+# @param disorder_propensities_file: String - The path to the disorder propensities file.
+# @param iuscores_file: String - The path to the binary file of IUPred scores (optional).
+#
+# @return iuscore_dict: OrderedDict - The dictionary that associates to each protein 
+#                                     name its IUPred scores (list of floats, or
+#                                     NumPy array when read from the binary file).
+#
+def read_iuscores( disorder_propensities_file, iuscores_file=None ):
     
+    if iuscores_file:
+        return read_iuscores_file( iuscores_file )
     
-    # Get the disorder propensities of the amino acids 
-    # for each query protein sequence
-    # Instantiate a dictionary that associate to each query
-    # protein its list of IUPred scores
-    iuscore_dict = { protein_name: [] for protein_name in sequences_dict.keys() }
+    iuscore_dict = OrderedDict()
     with open( disorder_propensities_file, 'r' ) as disorder_propensities:
         # Skip headers
         next( disorder_propensities )
-        line = disorder_propensities.readline().replace( '\n', '' )
-        while ( line != '' ):
-            # Parse the line to get information about the motif
+        for line in disorder_propensities:
+            line = line.replace( '\n', '' )
+            if ( line == '' ):
+                continue
             line = line.split( '\t' )
-            protein_name = line[ QUERY_DISORDER_PROPENSITIES_PROT_NAME_INDEX ]
             iuscores = line[ QUERY_DISORDER_PROPENSITIES_VALUES_INDEX ].split( ',' )
-            aa_pos = 0
-            for iuscore in iuscores:
-                aa_pos += 1
-                iuscore_dict[ protein_name ].append( { 'x': aa_pos,
-                                                       'y': float( iuscore ) } )
+            iuscore_dict.setdefault( line[ QUERY_DISORDER_PROPENSITIES_PROT_NAME_INDEX ], [] ).extend( map( float, iuscores ) )
     
-            line = disorder_propensities.readline().replace( '\n', '' )
+    return iuscore_dict
+
 
-          
-    # Build the dictionary that will be written in the JSON file
-    json_dict = {}
-    for prot_name in sequences_dict.keys():
-        json_dict[ prot_name ]  = { 'sequence': sequences_dict.get( prot_name ),
-                                    'domains': domains_dict.get( prot_name ),
-                                    'motifs': motifs_dict.get( prot_name ),
-                                    'IUPRED': iuscore_dict.get( prot_name ) }
+
+## query_proteins_features_to_json
+#  -------------------------------
+#
+# This function allows to generate a JSON file resuming
+# the most important features of the query sequences.
+# NB: Each input file is read once. The domains, the motifs and the 
+#     IUPred scores are registered first, then the fasta file is read
+#     one sequence at a time and the features of each protein are 
+#     written in the JSON file (and in the shards) as soon as its 
+#     sequence has been read.
+#
+# @param query_fasta_file: String - The path to the query sequences fasta file.
+# @param query_domain_parsed_file: String - The path to the query domain parsed file.
+# @param query_slim_parsed_file: String - The path to the query SLiMProb parsed file.
+# @param disorder_propensities_file: String - The path to the disorder propensities file.
+# @param query_features_json_file: String - The path to the query features JSON file (the output).
+# @param iuscores_file: String - The path to the binary file of IUPred scores (optional).
+# @param iupred_encoding: String - The encoding of the IUPred scores (points, array or rle).
+# @param query_features_shards_folder: String - The path to the folder of query features
+#                                               shards (optional).
+# @param shard_size: Integer - The number of proteins per shard.
+#
+def query_proteins_features_to_json( query_fasta_file, query_domain_parsed_file, query_slim_parsed_file, \
+                                     disorder_propensities_file, query_features_json_file, \
+                                     iupred_encoding=DEFAULT_IUPRED_ENCODING, \
+                                     query_features_shards_folder=None, shard_size=DEFAULT_SHARD_SIZE, \
+                                     iuscores_file=None ):
+    
+    domains_dict = read_domains( query_domain_parsed_file )
+    motifs_dict = read_motifs( query_slim_parsed_file )
+    iuscore_dict = read_iuscores( disorder_propensities_file, iuscores_file )
     
-    with open( query_features_json_file, 'w' ) as query_features_json:
-        json.dump( json_dict, query_features_json, indent=4 )
+    # Get the features of a protein
+    def get_features( prot_name, sequence ):
+        return OrderedDict( [ ( 'sequence', sequence ),
+                              ( 'domains', domains_dict.get( prot_name, [] ) ),
+                              ( 'motifs', motifs_dict.get( prot_name, [] ) ),
+                              ( 'IUPRED', encode_iuscores( iuscores = iuscore_dict.get( prot_name, [] ),
+                                                           iupred_encoding = iupred_encoding ) ) ] )
+    
+    # Generate the features of each protein, in the order of the fasta file
+    # Ideally, all the sequence names used in the other files are
+    # the ones of the query fasta file. Nevertheless, in order to 
+    # avoid key errors when this is not the case, the proteins for 
+    # which no sequence may be found are registered afterwards with 
+    # an empty sequence (meaning the information belonging to the 
+    # same protein will unfortunatelly be registered in two "objects" 
+    # of the json file).
+    def get_features_items():
+        fasta_protein_names = set()
+        for ( prot_name, sequence ) in read_fasta_sequences( query_fasta_file ):
+            if ( prot_name in fasta_protein_names ):
+                print( 'WARNING :: The protein ' + prot_name + ' is found several times in the' +
+                       ' query fasta file, only its first sequence is registered.' )
+                continue
+            fasta_protein_names.add( prot_name )
+            yield ( prot_name, get_features( prot_name, sequence ) )
+        
+        other_protein_names = OrderedDict()
+        for features_dict in [ iuscore_dict, domains_dict, motifs_dict ]:
+            for prot_name in features_dict.keys():
+                if ( prot_name not in fasta_protein_names ):
+                    other_protein_names[ prot_name ] = True
+        for prot_name in other_protein_names.keys():
+            yield ( prot_name, get_features( prot_name, '' ) )
+    
+    # Write the features in the JSON file and the shards at once
+    write_features( features_items = get_features_items(),
+                    query_features_json_file = query_features_json_file,
+                    compact = ( iupred_encoding != IUPRED_ENCODING_POINTS ),
+                    shards_folder = query_features_shards_folder,
+                    shard_size = shard_size )
 
 
 
@@ -239,15 +519,37 @@ if __name__=='__main__':
                                              option_name = DISORDER_PROPENSITIES_FILE_OPTION, 
                                              not_none = True )
     
+    # Get the binary file of IUPred scores path
+    iuscores_file = get_option( option_dict = option_dict, 
+                                option_name = IUSCORES_FILE_OPTION )
+    
     # Get the query features JSON file path
     query_features_json_file = get_option( option_dict = option_dict, 
                                              option_name = QUERY_FEATURES_JSON_FILE_OPTION, 
                                              not_none = True )
     
+    # Get the encoding of the IUPred scores
+    iupred_encoding = get_option( option_dict = option_dict, 
+                                  option_name = IUPRED_ENCODING_OPTION, 
+                                  not_none = True )
+    
+    # Get the query features shards folder path
+    query_features_shards_folder = get_option( option_dict = option_dict, 
+                                               option_name = QUERY_FEATURES_SHARDS_FOLDER_OPTION )
+    
+    # Get the number of proteins per shard
+    shard_size = get_option( option_dict = option_dict, 
+                             option_name = SHARD_SIZE_OPTION, 
+                             not_none = True )
+    
     # Run the script
     query_proteins_features_to_json( query_fasta_file = query_fasta_file, 
                                      query_domain_parsed_file = query_domain_parsed_file, 
                                      query_slim_parsed_file = query_slim_parsed_file,
                                      disorder_propensities_file = disorder_propensities_file, 
-                                     query_features_json_file = query_features_json_file )
+                                     query_features_json_file = query_features_json_file,
+                                     iupred_encoding = iupred_encoding,
+                                     query_features_shards_folder = query_features_shards_folder,
+                                     shard_size = shard_size,
+                                     iuscores_file = iuscores_file )
     
\ No newline at end of file
@@ -2,12 +2,17 @@
 # -*- coding: utf-8 -*-
 
 import os
+import heapq
 
 
 from fr.tagc.mimicint.util.option.OptionManager import *
 
 # This script allows to parse a fasta file into
-# several smaller files
+# several smaller files. The sequences may be either
+# distributed in the files in the order they are found
+# in the input file (count mode), or distributed so that
+# all files contain approximately the same total number
+# of residues (residues mode).
 
 
 # ===========================================
@@ -17,6 +22,12 @@ from fr.tagc.mimicint.util.option.OptionManager import *
 # Default maxmimum number of sequences per file
 DEFAULT_MAX_SEQ_PER_FILE = 5000
 
+# Splitting modes
+SPLIT_MODE_COUNT = 'count'
+SPLIT_MODE_RESIDUES = 'residues'
+ALLOWED_SPLIT_MODES = [ SPLIT_MODE_COUNT, SPLIT_MODE_RESIDUES ]
+DEFAULT_SPLIT_MODE = SPLIT_MODE_COUNT
+
 
 # List of options allowed
 # -----------------------
@@ -30,9 +41,19 @@ OUTPUT_FASTA_DIRECTORY_OPTION = 'OUTPUT_FASTA_DIRECTORY'
 # Maxmimum number of sequences per file
 MAX_SEQ_PER_FILE_OPTION = 'MAX_SEQ_PER_FILE'
 
+# Splitting mode
+SPLIT_MODE_OPTION = 'SPLIT_MODE'
+
+# Number of files to generate
+FILE_NB_OPTION = 'FILE_NB'
+
 OPTION_LIST = [ [ '-i', '--input', 'store', 'string', INPUT_FASTA_FILE_OPTION, None, 'The path to the fasta file to split.' ],
                 [ '-o', '--outputDir', 'store', 'string', OUTPUT_FASTA_DIRECTORY_OPTION, None, 'The path to the output folder where to write the new fasta file.' ],
-                [ '-m', '--maxSeqPerFile', 'store', 'string', MAX_SEQ_PER_FILE_OPTION, None, 'The maximum number of sequences that may be stored in a fasta file.' ] ]
+                [ '-m', '--maxSeqPerFile', 'store', 'string', MAX_SEQ_PER_FILE_OPTION, None, 'The maximum number of sequences that may be stored in a fasta file.' ],
+                [ '-s', '--splitMode', 'store', 'choice', SPLIT_MODE_OPTION, ALLOWED_SPLIT_MODES, DEFAULT_SPLIT_MODE, 
+                  'The way the sequences are distributed in the files (must be one of ' + ', '.join( ALLOWED_SPLIT_MODES ) + ') [default: %default].' ],
+                [ '-n', '--fileNb', 'store', 'string', FILE_NB_OPTION, None, 'The number of files to generate (taken into account only when --splitMode option is set to "' + 
+                  SPLIT_MODE_RESIDUES + '"; more files may be generated if necessary to respect the maximum number of sequences per file).' ] ]
 
 
 
@@ -107,6 +128,99 @@ def split_fasta_file( input_fasta_file, output_fasta_dir, max_seq_per_file ):
             
 
 
+# split_fasta_file_by_residues
+# ----------------------------
+#
+# This function allows to split a fasta file into several smaller
+# fasta files containing approximately the same total number of 
+# residues. The sequences are sorted by decreasing length and each
+# of them is successively added to the file containing the lowest
+# number of residues (longest processing time first algorithm).
+# NB: Ties are broken using the position of the sequences in the
+#     input file and the index of the files, so the split is always
+#     the same for a given input file. The sequences are written in
+#     each file in the order they are found in the input file.
+#
+# @param input_fasta_file: String - The path to the input fasta file.
+# @param output_fasta_dir: String - The path to the directory where the new fasta files
+#                                   have to be written.
+# @param max_seq_per_file: Integer - The maximum number of sequences that can be stored in a file.
+# @param file_nb: Integer - The number of files to generate. If None, the number of files is
+#                           computed from the maximum number of sequences per file.
+#
+def split_fasta_file_by_residues( input_fasta_file, output_fasta_dir, max_seq_per_file, file_nb ):
+    
+    # Create the output directory if necessary
+    if ( not os.path.isdir( output_fasta_dir ) ):
+        os.makedirs( output_fasta_dir )
+        
+    # Get the name of the fasta file
+    fasta_filename = '.'.join( os.path.basename( input_fasta_file ).split('.')[:-1] )
+    
+    # Get the lines and the length of all the sequences
+    sequences = []
+    with open( input_fasta_file, 'r' ) as input_fasta:
+        
+        line = input_fasta.readline()
+        
+        while ( line != '' ):
+            
+            sequence_lines = [ line ]
+            residue_nb = 0
+            line = input_fasta.readline()
+            
+            while ( ( line != '' ) 
+                    and ( not line.startswith( '>' ) ) ):
+                sequence_lines.append( line )
+                residue_nb += len( line.strip() )
+                line = input_fasta.readline()
+                
+            sequences.append( ( sequence_lines, residue_nb ) )
+    
+    # Compute the number of files to generate
+    min_file_nb = - ( - len( sequences ) // max_seq_per_file )
+    if ( ( not file_nb ) or ( file_nb < min_file_nb ) ):
+        file_nb = min_file_nb
+    file_nb = min( file_nb, len( sequences ) )
+    
+    # Assign the sequences to the files, starting with the longest ones
+    # NB: The heap contains for each file the total number of residues 
+    #     it already contains and its index
+    files_heap = [ ( 0, file_index ) for file_index in range( file_nb ) ]
+    seq_indexes_of_file = [ [] for file_index in range( file_nb ) ]
+    
+    sorted_seq_indexes = sorted( range( len( sequences ) ), 
+                                 key = lambda seq_index: ( - sequences[ seq_index ][ 1 ], seq_index ) )
+    
+    for seq_index in sorted_seq_indexes:
+        # Get the file containing the lowest number of residues 
+        # that may still store a new sequence
+        ( file_residue_nb, file_index ) = heapq.heappop( files_heap )
+        seq_indexes_of_file[ file_index ].append( seq_index )
+        
+        if ( len( seq_indexes_of_file[ file_index ] ) < max_seq_per_file ):
+            heapq.heappush( files_heap, ( file_residue_nb + sequences[ seq_index ][ 1 ], file_index ) )
+    
+    # Write the files
+    total_seq_stored = 0
+    for file_index in range( file_nb ):
+        output_file_path = os.path.join( output_fasta_dir, 
+                                         fasta_filename + '_' + str( file_index ) + '.fasta' )
+        file_residue_nb = 0
+        with open( output_file_path, 'w' ) as output_file:
+            for seq_index in sorted( seq_indexes_of_file[ file_index ] ):
+                output_file.writelines( sequences[ seq_index ][ 0 ] )
+                file_residue_nb += sequences[ seq_index ][ 1 ]
+                
+        total_seq_stored += len( seq_indexes_of_file[ file_index ] )
+        print( 'INFO :: ' + str( len( seq_indexes_of_file[ file_index ] ) ) + ' sequences (' + 
+               str( file_residue_nb ) + ' residues) have been saved in the ' + output_file_path + ' file.' )
+
+    print( 'INFO :: ' + str( total_seq_stored ) + ' sequences have been saved in '+ 
+           str( file_nb ) + ' files of the ' + output_fasta_dir + ' directory.' )
+            
+
+
 # ===========================================
 # Parse command line arguments 
 # and run script
@@ -144,8 +258,33 @@ if __name__ == '__main__':
     else:
         max_seq_per_file = DEFAULT_MAX_SEQ_PER_FILE
     
+    # Get the splitting mode
+    split_mode = get_option( option_dict = option_dict,
+                             option_name = SPLIT_MODE_OPTION, 
+                             not_none = True )
+    
+    # Get the number of files to generate
+    file_nb = get_option( option_dict = option_dict,
+                          option_name = FILE_NB_OPTION, 
+                          not_none = False )
+    
+    if file_nb:
+        try:
+            file_nb = int( file_nb )
+        except:
+            raise Exception( 'The number of files to generate has to be an integer.' )
+        else:
+            if ( file_nb < 0 ):
+                raise Exception( 'The number of files to generate has to be a positive integer.' )
+    
     # Run the script
-    split_fasta_file( input_fasta_file = input_fasta_file, 
-                      output_fasta_dir = output_fasta_dir, 
-                      max_seq_per_file = max_seq_per_file )
+    if ( split_mode == SPLIT_MODE_RESIDUES ):
+        split_fasta_file_by_residues( input_fasta_file = input_fasta_file, 
+                                      output_fasta_dir = output_fasta_dir, 
+                                      max_seq_per_file = max_seq_per_file,
+                                      file_nb = file_nb )
+    else:
+        split_fasta_file( input_fasta_file = input_fasta_file, 
+                          output_fasta_dir = output_fasta_dir, 
+                          max_seq_per_file = max_seq_per_file )
     
\ No newline at end of file
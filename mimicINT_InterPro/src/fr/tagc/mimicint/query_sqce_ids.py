@@ -0,0 +1,158 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+
+
+from fr.tagc.mimicint.util.option.OptionManager import *
+
+# This script allows to generate the file associating each stable
+# sequence identifier provided to SLiMProb to its original sequence
+# name (as provided in the query fasta file).
+#
+# As SLiMProb rewrites the fasta headers it is provided with, the
+# query sequences are provided to SLiMProb under compact identifiers
+# computed from the sequence itself (see the slimprob_cache script),
+# which are left unchanged by SLiMProb, e.g.
+#
+#     >MQ3F786850E387550FDAB8
+#
+# These identifiers are stable (the same sequence always gets the
+# same identifier), hence the names used in the SLiMProb outputs can
+# be mapped back to the original headers with a simple lookup.
+
+
+# ===========================================
+# Constants
+# ===========================================
+#
+# Prefix of the identifiers provided to SLiMProb
+QUERY_SQCE_ID_PREFIX = 'MQ'
+# Number of characters of the SHA1 digest kept in the identifiers
+QUERY_SQCE_ID_DIGEST_LENGTH = 20
+
+
+# List of options allowed
+# -----------------------
+# Path to the query fasta file
+QUERY_FASTA_FILE_OPTION = 'QUERY_FASTA_FILE'
+# Path to the file associating to each sequence name used
+# by SLiMProb the original sequence name in the fasta file
+SEQNAMES_FILE_OPTION = 'SEQNAMES_FILE'
+
+OPTION_LIST = [ [ '-f', '--fastaFile', 'store', 'string', QUERY_FASTA_FILE_OPTION, None, 'The path to the query fasta file.' ],
+                [ '-n', '--seqNameFile', 'store', 'string', SEQNAMES_FILE_OPTION, None, 'The path to the file associating to each sequence name used by SLiMProb \
+                                                                                      the original sequence name in the fasta file.' ] ]
+
+
+
+# ===========================================
+# Script
+# ===========================================
+
+# get_query_sqce_id
+# -----------------
+#
+# This function allows to get the stable identifier of a sequence,
+# i.e. the prefix followed by the beginning of the SHA1 digest of
+# the sequence (in upper case, without spaces).
+#
+# @param sequence_lines: List - The lines of the sequence.
+#
+# @return sequence_id: String - The identifier of the sequence.
+#
+def get_query_sqce_id( sequence_lines ):
+
+    sequence = ''.join( ''.join( sequence_lines ).split() ).upper()
+    sequence_sha1 = hashlib.sha1( sequence.encode( 'utf-8' ) ).hexdigest()
+
+    return QUERY_SQCE_ID_PREFIX + sequence_sha1[ :QUERY_SQCE_ID_DIGEST_LENGTH ].upper()
+
+
+
+# write_query_sqce_ids
+# --------------------
+#
+# This function allows to write the file associating the identifier
+# provided to SLiMProb for each query sequence with its short header
+# in the query fasta file.
+#
+# @param query_fasta_file_path: String - The path to the fasta file containing the query sequences.
+# @param seq_names_file_path: String - The path to the file associating to each SLiMProb
+#                                      sequence its name in the original query fasta file.
+#
+# @raise Exception - When the same identifier is computed for two headers (i.e.
+#                    when the fasta file contains identical sequences).
+#
+def write_query_sqce_ids( query_fasta_file_path, seq_names_file_path ):
+
+    # Compute the identifier of all the sequences
+    # -------------------------------------------
+    # Dictionary that associates to each identifier
+    # the short header of the sequence
+    query_sqce_ids = {}
+
+    with open( query_fasta_file_path, 'r' ) as query_fasta_file:
+        line = query_fasta_file.readline()
+        while ( ( line != '' )
+                and ( not line.startswith( '>' ) ) ):
+            line = query_fasta_file.readline()
+
+        while ( line != '' ):
+            # Get the first part of the header
+            header = line[ 1: ]
+            if header.startswith( ' ' ):
+                header = header[ 1: ]
+            header = header.split( ' ' )[ 0 ]
+            header = header.replace( '\n', '' )
+
+            sequence_lines = []
+            line = query_fasta_file.readline()
+            while ( ( line != '' )
+                    and ( not line.startswith( '>' ) ) ):
+                sequence_lines.append( line )
+                line = query_fasta_file.readline()
+
+            sequence_id = get_query_sqce_id( sequence_lines )
+            if ( sequence_id in query_sqce_ids ):
+                raise Exception( 'The headers "' + query_sqce_ids[ sequence_id ] + '" and "' + header +
+                                 '" share the same sequence. The query fasta file is expected to' +
+                                 ' contain unique sequences (see the deduplicate_fasta_file script).' )
+            query_sqce_ids[ sequence_id ] = header
+
+
+    # Write these associations in a tsv file
+    # --------------------------------------
+    with open( seq_names_file_path, 'w' ) as seq_names_file:
+        seq_names_file.write( '\t'.join( [ 'SlimprobSeqName', 'Seq' + '\n' ] ) )
+        for ( sequence_id, header ) in query_sqce_ids.items():
+            seq_names_file.write( '\t'.join( [ sequence_id, header + '\n' ] ) )
+
+    print( 'INFO :: The identifiers of ' + str( len( query_sqce_ids ) ) + ' query sequences have been written.' )
+
+
+
+# ===========================================
+# Parse command line arguments
+# and run script
+# ===========================================
+
+#### Code execution in the console ####
+if __name__ == '__main__':
+
+    # Parse the command-line arguments
+    option_dict = parse_arguments( OPTION_LIST )
+
+    # Get the path to the query fasta file
+    query_fasta_file_path = get_option( option_dict = option_dict,
+                                        option_name = QUERY_FASTA_FILE_OPTION,
+                                        not_none = True )
+
+    # Get the path to the output file
+    seq_names_file_path = get_option( option_dict = option_dict,
+                                      option_name = SEQNAMES_FILE_OPTION,
+                                      not_none = True )
+
+    # Run the script
+    write_query_sqce_ids( query_fasta_file_path = query_fasta_file_path,
+                          seq_names_file_path = seq_names_file_path )
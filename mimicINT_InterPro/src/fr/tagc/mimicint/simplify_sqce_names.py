@@ -3,9 +3,14 @@
 
 import os
 import json
+import concurrent.futures
+from collections import OrderedDict
+
+import numpy as np
 
 
 import fr.tagc.mimicint.parsing_scripts.interaction_all_to_json as interaction_all_to_json
+import fr.tagc.mimicint.parsing_scripts.query_proteins_features_to_json as query_proteins_features_to_json
 from fr.tagc.mimicint.util.option.OptionManager import *
 
 # This script allows to generate short sequence names from 
@@ -35,19 +40,22 @@ QUERY_DISORDER_PROP_SEQUENCE_INDEX = 0
 
 # Index of the columns of the domain-domain interactions file
 DDI_QUERY_SEQUENCE_INDEX = 0
-DDI_TARGET_SEQUENCE_INDEX = 5
 
 # Index of the columns of the domain-motif interactions file
 DMI_QUERY_SEQUENCE_INDEX = 0
-DMI_TARGET_SEQUENCE_INDEX = 5
 
 # Index of the columns of the file containing all the interactions
 ALL_INTER_QUERY_SEQUENCE_INDEX = 0
-ALL_INTER_TARGET_SEQUENCE_INDEX = 1
 
 # Index of the columns of the file containing the binary interactions
 BINARY_INTER_QUERY_SEQUENCE_INDEX = 0
-BINARY_INTER_TARGET_SEQUENCE_INDEX = 1
+
+# Size of the buffers used to read and write the files (in bytes)
+RENAME_BUFFER_SIZE = 16 * 1024 * 1024
+
+# Indentation of the elements (nodes and edges) in the JSON file of
+# all interactions (see write_json_list in interaction_all_to_json)
+JSON_ELEMENT_INDENT = '        '
 
 # Sequence identifiers used in dictionaries
 FULL_FASTA_SEQNAME = 'FULL_HEADER'
@@ -113,6 +121,9 @@ BINARY_INTERACTIONS_FILE_OPTION = 'BINARY_INTERACTIONS_FILE'
 # Path to binary interactions with sequences renamed
 BINARY_INTERACTIONS_RENAMED_SQCES_FILE_OPTION = 'BINARY_INTERACTIONS_RENAMED_SQCES_FILE'
 
+# Path to the JSON file with all interactions
+ALL_INTERACTIONS_JSON_FILE_OPTION = 'ALL_INTERACTIONS_JSON_FILE'
+
 # Path to the JSON file with all interactions with sequences renamed
 ALL_INTERACTIONS_JSON_RENAMED_SQCES_FILE_OPTION = 'ALL_INTERACTIONS_JSON_RENAMED_SQCES_FILE'
 
@@ -122,6 +133,21 @@ QUERY_FEATURES_JSON_FILE_OPTION = 'QUERY_FEATURES_JSON_FILE'
 # Path to the JSON file with query features with sequences renamed
 QUERY_FEATURES_JSON_RENAMED_SQCES_FILE_OPTION = 'QUERY_FEATURES_JSON_RENAMED_SQCES_FILE'
 
+# Path to the folder of query features shards
+QUERY_FEATURES_SHARDS_FOLDER_OPTION = 'QUERY_FEATURES_SHARDS_FOLDER'
+
+# Path to the folder of query features shards with sequences renamed
+QUERY_FEATURES_SHARDS_RENAMED_SQCES_FOLDER_OPTION = 'QUERY_FEATURES_SHARDS_RENAMED_SQCES_FOLDER'
+
+# Path to the binary file of IUPred scores
+QUERY_DISORDER_SCORES_FILE_OPTION = 'QUERY_DISORDER_SCORES_FILE'
+
+# Path to the binary file of IUPred scores with sequences renamed
+QUERY_DISORDER_SCORES_RENAMED_SQCES_FILE_OPTION = 'QUERY_DISORDER_SCORES_RENAMED_SQCES_FILE'
+
+# Number of processes used to rename the files
+PROCESSES_NB_OPTION = 'PROCESSES_NB'
+
 
 OPTION_LIST = [ [ '-b', '--queryFasta', 'store', 'string', QUERY_FATA_FILE_OPTION, None, 'Path to the query fasta file.' ],
                 [ '-c', '--queryMatch', 'store', 'string', QUERY_SQCE_NAMES_MATCH_FILE_OPTION, None, 'Path to the files where correspondences between query sequences names provided by the fasta and used by SLiMProb are registered.' ],
@@ -133,6 +159,7 @@ OPTION_LIST = [ [ '-b', '--queryFasta', 'store', 'string', QUERY_FATA_FILE_OPTIO
                 [ '-j', '--dmi', 'store', 'string', DMI_FILE_OPTION, None, 'Path to the domain-motif interactions file.' ],
                 [ '-k', '--allInteractions', 'store', 'string', ALL_INTERACTIONS_FILE_OPTION, None, 'Path to all interactions file.' ],
                 [ '-x', '--binaryInteractions', 'store', 'string', BINARY_INTERACTIONS_FILE_OPTION, None, 'Path to binary interactions file.' ],
+                [ '-a', '--allInteractionsJson', 'store', 'string', ALL_INTERACTIONS_JSON_FILE_OPTION, None, 'Path to the JSON file with all interactions.' ],
                 [ '-l', '--queryFeatures', 'store', 'string', QUERY_FEATURES_JSON_FILE_OPTION, None, 'Path to the JSON file with query features.' ],
                 [ '-m', '--seqNames', 'store', 'string', SQCE_NAMES_MATCH_FILE_OPTION, None, 'Path to the files where correspondences between sequence names are registered.' ],
                 [ '-o', '--queryDomainOut', 'store', 'string', PARSED_QUERY_DOMAIN_RENAMED_SQCES_FILE_OPTION, None, 'Path to the parsed query domain file with sequences renamed.' ],
@@ -143,7 +170,12 @@ OPTION_LIST = [ [ '-b', '--queryFasta', 'store', 'string', QUERY_FATA_FILE_OPTIO
                 [ '-t', '--allInteractionsOut', 'store', 'string', ALL_INTERACTIONS_FILE_RENAMED_SQCES_FILE_OPTION, None, 'Path to all interactions file with sequences renamed.' ],
                 [ '-y', '--binaryInteractionsOut', 'store', 'string', BINARY_INTERACTIONS_RENAMED_SQCES_FILE_OPTION, None, 'Path to binary interactions file with sequences renamed.' ],
                 [ '-u', '--allInteractionsJsonOut', 'store', 'string', ALL_INTERACTIONS_JSON_RENAMED_SQCES_FILE_OPTION, None, 'Path to the JSON file with all interactions with sequences renamed.' ],
-                [ '-w', '--queryFeaturesOut', 'store', 'string', QUERY_FEATURES_JSON_RENAMED_SQCES_FILE_OPTION, None, 'Path to the JSON file with query features with sequences renamed.' ] ]
+                [ '-w', '--queryFeaturesOut', 'store', 'string', QUERY_FEATURES_JSON_RENAMED_SQCES_FILE_OPTION, None, 'Path to the JSON file with query features with sequences renamed.' ],
+                [ '-n', '--queryFeaturesShards', 'store', 'string', QUERY_FEATURES_SHARDS_FOLDER_OPTION, None, 'Path to the folder of query features shards (optional).' ],
+                [ '-v', '--queryFeaturesShardsOut', 'store', 'string', QUERY_FEATURES_SHARDS_RENAMED_SQCES_FOLDER_OPTION, None, 'Path to the folder of query features shards with sequences renamed (optional).' ],
+                [ '-A', '--queryDisorderScores', 'store', 'string', QUERY_DISORDER_SCORES_FILE_OPTION, None, 'Path to the binary file of IUPred scores (optional).' ],
+                [ '-B', '--queryDisorderScoresOut', 'store', 'string', QUERY_DISORDER_SCORES_RENAMED_SQCES_FILE_OPTION, None, 'Path to the binary file of IUPred scores with sequences renamed (optional).' ],
+                [ '-z', '--processes', 'store', 'int', PROCESSES_NB_OPTION, None, 'Number of processes used to rename the files concurrently [default: one per file].' ] ]
 
 
 
@@ -279,295 +311,204 @@ def simplify_sqce_names( query_fasta_file_path, query_sqce_names_match_file_path
     
 
 # ===========================================
-# Simplify InterProScan outputs
+# Simplify tabulated files
 # ===========================================
 
-# simplify_parsed_domain_interpro
-# -------------------------------
+# get_renamed_sqces_dict
+# ----------------------
 #
-# This function allows to "simplify" the sequence names of the files
-# parsed_target_domain_interpro.tsv and parsed_query_domain_interpro.tsv.
-# 
-# @param parsed_domain_file_path: String - The path to the parsed domain InterProScan file.
-# @param parsed_domain_renamed_sqces_file_path: String - The path to the parsed domain InterProScan file
-#                                                        where sequences have been renamed.
-# @param sqce_dict: Dictionary - The dictionary that associates the "short" fasta headers
-#                                to the sequence names.
-# 
-def simplify_parsed_domain_interpro( parsed_domain_file_path, parsed_domain_renamed_sqces_file_path, sqce_dict ):
+# This function allows to get the dictionary that associates to
+# each "short" fasta header the name to use in the output files.
+# When no sequence name has been computed for a header, the 
+# header is kept as it is.
+#
+# @param query_sqces: Dictionary - The dictionary that associates the "short" fasta headers
+#                                  to the sequence names for the query sequences.
+#
+# @return renamed_sqces: Dictionary - The dictionary that associates the "short" fasta
+#                                     headers to the names to use.
+#
+def get_renamed_sqces_dict( query_sqces ):
     
-    with open( parsed_domain_file_path, 'r' ) as parsed_domain_file, \
-         open( parsed_domain_renamed_sqces_file_path, 'w' ) as parsed_domain_renamed_sqces_file:
-        
-        # Copy headers
-        line = parsed_domain_file.readline()
-        parsed_domain_renamed_sqces_file.write( line )
-        line = parsed_domain_file.readline()
-        
-        while ( line != '' ):
-            line = line.split( '\t' )
-            # Get the sequence name to use
-            parsed_seq_name = line[ PARSED_DOMAIN_SEQUENCE_INDEX ]
-            seq_name = sqce_dict.get( parsed_seq_name ).get( SEQNAME )
-            # Copy the line
-            parsed_domain_renamed_sqces_file.write( '\t'.join( line[ :PARSED_DOMAIN_SEQUENCE_INDEX ] +
-                                                               [ seq_name ] + 
-                                                               line[ PARSED_DOMAIN_SEQUENCE_INDEX+1: ] ) )
-            line = parsed_domain_file.readline()
-            
+    renamed_sqces = {}
+    for ( short_header, query_sqces_entry ) in query_sqces.items():
+        seq_name = query_sqces_entry.get( SEQNAME )
+        if ( seq_name == '' ):
+            seq_name = short_header
+        renamed_sqces[ short_header ] = seq_name
+    
+    return renamed_sqces
 
-# ===========================================
-# Simplify SLiMProb outputs
-# ===========================================
 
-# simplify_parsed_slimprob_occ
-# ----------------------------
-#
-# This function allows to "simplify" the sequence names of the parsed
-# occurrence file (output of SLiMProb).
-# 
-# @param parsed_slimprob_occ_file_path: String - The path to the parsed SLiMProb occurrence file.
-# @param parsed_slimprob_occ_renamed_sqces_file_path: String - The path to the parsed SLiMProb occurrence 
-#                                                              file where sequences have been renamed.
-# @param sqce_dict: Dictionary - The dictionary that associates the "short" fasta headers
-#                                to the sequence names.
-# 
-def simplify_parsed_slimprob_occ( parsed_slimprob_occ_file_path, parsed_slimprob_occ_renamed_sqces_file_path, sqce_dict ):
-    
-    with open( parsed_slimprob_occ_file_path, 'r' ) as parsed_slimprob_occ_file, \
-         open( parsed_slimprob_occ_renamed_sqces_file_path, 'w' ) as parsed_slimprob_occ_renamed_sqces_file:
-        
-        # Copy headers
-        line = parsed_slimprob_occ_file.readline()
-        parsed_slimprob_occ_renamed_sqces_file.write( line )
-        line = parsed_slimprob_occ_file.readline()
-        
-        while ( line != '' ):
-            line = line.split( '\t' )
-            # Get the sequence name to use
-            parsed_seq_name = line[ PARSED_SLIMRPOB_OCC_SEQUENCE_INDEX ]
-            seq_name = sqce_dict.get( parsed_seq_name ).get( SEQNAME )
-            # Copy the line
-            if ( seq_name != '' ):
-                parsed_slimprob_occ_renamed_sqces_file.write( '\t'.join( line[ :PARSED_SLIMRPOB_OCC_SEQUENCE_INDEX ] +
-                                                                         [ seq_name ] + 
-                                                                         line[ PARSED_SLIMRPOB_OCC_SEQUENCE_INDEX+1: ] ) )
-            else:
-                parsed_slimprob_occ_renamed_sqces_file.write( '\t'.join( line ) )
-            line = parsed_slimprob_occ_file.readline()
-            
 
-# simplify_query_disorder_prop
-# ----------------------------
+# rename_sqces_in_file
+# --------------------
 #
-# This function allows to "simplify" the sequence names of the parsed
-# occurrence file (output of SLiMProb).
+# This function allows to "simplify" the sequence names of one of the
+# columns of a tabulated file (outputs of InterProScan, SLiMProb and 
+# interaction inference). The file is read and written in one pass, 
+# using large buffers.
 # 
-# @param query_disorder_prop_file_path: String - The path to the file containing the query disorder scores.
-# @param query_disorder_prop_renamed_sqces_file_path: String - The path to the file containing the query disorder 
-#                                                              scores where sequences have been renamed.
-# @param sqce_dict: Dictionary - The dictionary that associates the "short" fasta headers
-#                                to the sequence names.
+# @param input_file_path: String - The path to the tabulated file.
+# @param output_file_path: String - The path to the tabulated file where sequences 
+#                                   have been renamed.
+# @param seq_column_index: Integer - The index of the column containing the sequence names.
+# @param has_header: Boolean - Does the file start with a header line?
+# @param renamed_sqces: Dictionary - The dictionary that associates the "short" fasta headers
+#                                    to the names to use.
+#
+# @return output_file_path: String - The path to the tabulated file where sequences 
+#                                    have been renamed.
+#
+# @throw Exception - When a sequence name of the file is not part of the query.
 # 
-def simplify_query_disorder_prop( query_disorder_prop_file_path, query_disorder_prop_renamed_sqces_file_path, sqce_dict ):
+def rename_sqces_in_file( input_file_path, output_file_path, seq_column_index, has_header, renamed_sqces ):
     
-    with open( query_disorder_prop_file_path, 'r' ) as query_disorder_prop_file, \
-         open( query_disorder_prop_renamed_sqces_file_path, 'w' ) as query_disorder_prop_renamed_sqces_file:
+    with open( input_file_path, 'r', buffering = RENAME_BUFFER_SIZE ) as input_file, \
+         open( output_file_path, 'w', buffering = RENAME_BUFFER_SIZE ) as output_file:
         
         # Copy headers
-        line = query_disorder_prop_file.readline()
-        query_disorder_prop_renamed_sqces_file.write( line )
-        line = query_disorder_prop_file.readline()
+        if has_header:
+            output_file.write( input_file.readline() )
         
-        while (line != '' ):
+        for line in input_file:
             line = line.split( '\t' )
             # Get the sequence name to use
-            file_seq_name = line[ QUERY_DISORDER_PROP_SEQUENCE_INDEX ]
-            seq_name = sqce_dict.get( file_seq_name ).get( SEQNAME )
+            file_seq_name = line[ seq_column_index ]
+            seq_name = renamed_sqces.get( file_seq_name )
+            if ( seq_name is None ):
+                raise Exception( 'The sequence ' + file_seq_name + ' of the file ' + input_file_path +
+                                 ' has not been found in the query fasta file.' )
             # Copy the line
-            if ( seq_name != '' ):
-                query_disorder_prop_renamed_sqces_file.write( '\t'.join( line[ :QUERY_DISORDER_PROP_SEQUENCE_INDEX ] +
-                                                                         [ seq_name ] +
-                                                                         line[ QUERY_DISORDER_PROP_SEQUENCE_INDEX+1: ] ) )
-            else:
-                query_disorder_prop_renamed_sqces_file.write( '\t'.join( line ) )
-            line = query_disorder_prop_file.readline()
+            line[ seq_column_index ] = seq_name
+            output_file.write( '\t'.join( line ) )
     
+    return output_file_path
+
 
-            
-# ===========================================
-# Simplify interaction inference outputs
-# ===========================================
 
-# simplify_inferred_ddi
-# ---------------------
+# rename_sqces_in_iuscores_file
+# -----------------------------
 #
-# This function allows to "simplify" the sequence names of the 
-# domain-domain interactions file.
+# This function allows to "simplify" the sequence names of the binary
+# file of IUPred scores (as written by the compute_query_disorder
+# script). Only the array of names is updated, the scores are copied.
 # 
-# @param ddi_file_path: String - The path to the file containing the domain-domain interactions.
-# @param ddi_renamed_sqces_file_path: String - The path to the file containing the domain-domain interactions
-#                                              where sequences have been renamed.
-# @param query_sqces: Dictionary - The dictionary that associates the "short" fasta headers
-#                                  to the sequence names for the query sequences.
+# @param input_file_path: String - The path to the binary file of IUPred scores.
+# @param output_file_path: String - The path to the binary file of IUPred scores
+#                                   where sequences have been renamed.
+# @param renamed_sqces: Dictionary - The dictionary that associates the "short" fasta headers
+#                                    to the names to use.
+#
+# @return output_file_path: String - The path to the binary file where sequences have been renamed.
+#
+# @throw Exception - When a sequence name of the file is not part of the query.
 # 
-def simplify_inferred_ddi( ddi_file_path, ddi_renamed_sqces_file_path, query_sqces ):
+def rename_sqces_in_iuscores_file( input_file_path, output_file_path, renamed_sqces ):
     
-    with open( ddi_file_path, 'r' ) as ddi_file, \
-         open( ddi_renamed_sqces_file_path, 'w' ) as ddi_renamed_sqces_file:
-        
-        # Copy headers
-        line = ddi_file.readline()
-        ddi_renamed_sqces_file.write( line )
-        line = ddi_file.readline()
-        
-        while (line != '' ):
-            line = line.split( '\t' )
-            # Get the query sequence name to use
-            file_query_seq_name = line[ DDI_QUERY_SEQUENCE_INDEX ]
-            query_seq_name = query_sqces.get( file_query_seq_name ).get( SEQNAME )
-            if ( query_seq_name == '' ):
-                query_seq_name = file_query_seq_name
-            
-            # Get the target sequence name to use
-            file_target_seq_name = line[ DDI_TARGET_SEQUENCE_INDEX ]
-            
-            # Copy the line
-            ddi_renamed_sqces_file.write( '\t'.join( line[ : DDI_QUERY_SEQUENCE_INDEX ] +
-                                                     [ query_seq_name ] +
-                                                     line[ DDI_QUERY_SEQUENCE_INDEX+1 : DDI_TARGET_SEQUENCE_INDEX ] +
-                                                     [ file_target_seq_name ] +
-                                                     line[ DDI_TARGET_SEQUENCE_INDEX+1 : ] ) )
-            line = ddi_file.readline()
-
+    with np.load( input_file_path ) as input_file:
+        iuscores_content = { key: input_file[ key ] for key in input_file.files }
+    
+    seq_names = []
+    for file_seq_name in iuscores_content[ 'names' ].tolist():
+        seq_name = renamed_sqces.get( file_seq_name )
+        if ( seq_name is None ):
+            raise Exception( 'The sequence ' + file_seq_name + ' of the file ' + input_file_path +
+                             ' has not been found in the query fasta file.' )
+        seq_names.append( seq_name )
+    iuscores_content[ 'names' ] = np.array( seq_names, dtype = str )
+    
+    # NB: The file object is used so that NumPy does not add the
+    #     .npz extension to the file name
+    with open( output_file_path, 'wb' ) as output_file:
+        np.savez_compressed( output_file, **iuscores_content )
+    
+    return output_file_path
 
 
-# simplify_inferred_dmi
-# ---------------------
-#
-# This function allows to "simplify" the sequence names of the 
-# domain-motif interactions file.
-# 
-# @param dmi_file_path: String - The path to the file containing the domain-motif interactions.
-# @param dmi_renamed_sqces_file_path: String - The path to the file containing the domain-motif interactions
-#                                              where sequences have been renamed.
-# @param query_sqces: Dictionary - The dictionary that associates the "short" fasta headers
-#                                  to the sequence names for the query sequences.
-# 
-def simplify_inferred_dmi( dmi_file_path, dmi_renamed_sqces_file_path, query_sqces ):
-    
-    with open( dmi_file_path, 'r' ) as dmi_file, \
-         open( dmi_renamed_sqces_file_path, 'w' ) as dmi_renamed_sqces_file:
-        
-        # Copy headers
-        line = dmi_file.readline()
-        dmi_renamed_sqces_file.write( line )
-        line = dmi_file.readline()
-        
-        while (line != '' ):
-            line = line.split( '\t' )
-            # Get the query sequence name to use
-            file_query_seq_name = line[ DMI_QUERY_SEQUENCE_INDEX ]
-            query_seq_name = query_sqces.get( file_query_seq_name ).get( SEQNAME )
-            if ( query_seq_name == '' ):
-                query_seq_name = file_query_seq_name
-            
-            # Get the target sequence name to use
-            file_target_seq_name = line[ DMI_TARGET_SEQUENCE_INDEX ]
-            
-            # Copy the line
-            dmi_renamed_sqces_file.write( '\t'.join( line[ : DMI_QUERY_SEQUENCE_INDEX ] +
-                                                     [ query_seq_name ] +
-                                                     line[ DMI_QUERY_SEQUENCE_INDEX+1 : DMI_TARGET_SEQUENCE_INDEX ] +
-                                                     [ file_target_seq_name ] +
-                                                     line[ DMI_TARGET_SEQUENCE_INDEX+1 : ] ) )
-            line = dmi_file.readline()
 
 
+# ===========================================
+# Simplify JSON files
+# ===========================================
 
-# simplify_inferred_all
-# ---------------------
+# rename_sqces_in_json_file
+# -------------------------
 #
-# This function allows to "simplify" the sequence names of the 
-# file containing all inferred interactions.
+# This function allows to "simplify" the sequence names of the JSON
+# file containing all the interactions (as written by the 
+# interaction_all_to_json script), without building the graph again.
+# The file is read line by line and each element (node or edge) is
+# parsed on its own, so the order of its keys does not matter. Only the
+# "id" of the query nodes and the "target" of the edges (which is always
+# the query protein) are renamed. The "id" of the edges and the target
+# nodes are left unchanged.
+# NB: The elements are expected to be written with an indentation of
+#     4 spaces, one element starting on each "{" line at the level of
+#     the elements (see write_json_list in interaction_all_to_json).
 # 
-# @param all_inter_file_path: String - The path to the file containing all the inferred interactions.
-# @param all_inter_renamed_sqces_file_path: String - The path to the file containing all the inferred interactions
-#                                                    where sequences have been renamed.
-# @param query_sqces: Dictionary - The dictionary that associates the "short" fasta headers
-#                                  to the sequence names for the query sequences.
+# @param input_file_path: String - The path to the JSON file containing all the interactions.
+# @param output_file_path: String - The path to the JSON file containing all the interactions
+#                                   where sequences have been renamed.
+# @param renamed_sqces: Dictionary - The dictionary that associates the "short" fasta headers
+#                                    to the names to use.
+#
+# @return output_file_path: String - The path to the JSON file where sequences have been renamed.
+#
+# @throw Exception - When an element of the file is incomplete.
 # 
-def simplify_inferred_all( all_inter_file_path, all_inter_renamed_sqces_file_path, query_sqces ):
-    
-    with open( all_inter_file_path, 'r' ) as all_inter_file, \
-         open( all_inter_renamed_sqces_file_path, 'w' ) as all_inter_renamed_sqces_file:
+def rename_sqces_in_json_file( input_file_path, output_file_path, renamed_sqces ):
+    
+    # Rename the protein of an element (node or edge) from its text
+    def rename_json_element( element_text ):
+        element = json.loads( element_text, object_pairs_hook = OrderedDict )
+        element_data = element.get( 'data' )
+        if ( ( not isinstance( element_data, dict ) )
+             or ( 'id' not in element_data ) 
+             or ( 'type' not in element_data ) 
+             or ( ( 'source' in element_data ) != ( 'target' in element_data ) ) ):
+            raise Exception( 'The element ' + json.dumps( element ) + ' of the file ' + input_file_path + 
+                             ' is incomplete (an "id" and a "type" are expected for the nodes,' +
+                             ' and a "source" and a "target" for the edges).' )
         
-        # Copy headers
-        line = all_inter_file.readline()
-        all_inter_renamed_sqces_file.write( line )
-        line = all_inter_file.readline()
+        if ( 'source' in element_data ):
+            renamed_key = 'target'
+        elif ( element_data[ 'type' ] == 'query' ):
+            renamed_key = 'id'
+        else:
+            return element_text
+        element_data[ renamed_key ] = renamed_sqces.get( element_data[ renamed_key ], element_data[ renamed_key ] )
         
-        while (line != '' ):
-            line = line.split( '\t' )
-            # Get the query sequence name to use
-            file_query_seq_name = line[ ALL_INTER_QUERY_SEQUENCE_INDEX ]
-            query_seq_name = query_sqces.get( file_query_seq_name ).get( SEQNAME )
-            if ( query_seq_name == '' ):
-                query_seq_name = file_query_seq_name
-            
-            # Get the target sequence name to use
-            file_target_seq_name = line[ ALL_INTER_TARGET_SEQUENCE_INDEX ]
-            
-            # Copy the line
-            all_inter_renamed_sqces_file.write( '\t'.join( line[ : ALL_INTER_QUERY_SEQUENCE_INDEX ] +
-                                                           [ query_seq_name ] +
-                                                           line[ ALL_INTER_QUERY_SEQUENCE_INDEX+1 : ALL_INTER_TARGET_SEQUENCE_INDEX ] +
-                                                           [ file_target_seq_name ] +
-                                                           line[ ALL_INTER_TARGET_SEQUENCE_INDEX+1 : ] ) )
-            line = all_inter_file.readline()
-
-
-
-# simplify_inferred_binary
-# ------------------------
-#
-# This function allows to "simplify" the sequence names of the 
-# file containing binary inferred interactions.
-# 
-# @param binary_inter_file_path: String - The path to the file containing the binary inferred interactions.
-# @param binary_inter_renamed_sqces_file_path: String - The path to the file containing the binary inferred 
-#                                                       interactions where sequences have been renamed.
-# @param query_sqces: Dictionary - The dictionary that associates the "short" fasta headers
-#                                  to the sequence names for the query sequences.
-# 
-def simplify_inferred_binary( binary_inter_file_path, binary_inter_renamed_sqces_file_path, query_sqces ):
+        return JSON_ELEMENT_INDENT + json.dumps( element, indent=4 ).replace( '\n', '\n' + JSON_ELEMENT_INDENT )
     
-    with open( binary_inter_file_path, 'r' ) as binary_inter_file, \
-         open( binary_inter_renamed_sqces_file_path, 'w' ) as binary_inter_renamed_sqces_file:
-        
-        line = binary_inter_file.readline()
+    with open( input_file_path, 'r', buffering = RENAME_BUFFER_SIZE ) as input_file, \
+         open( output_file_path, 'w', buffering = RENAME_BUFFER_SIZE ) as output_file:
         
-        while (line != '' ):
-            line = line.split( '\t' )
-            # Get the query sequence name to use
-            file_query_seq_name = line[ BINARY_INTER_QUERY_SEQUENCE_INDEX ]
-            query_seq_name = query_sqces.get( file_query_seq_name ).get( SEQNAME )
-            if ( query_seq_name == '' ):
-                query_seq_name = file_query_seq_name
+        # Lines of the current element
+        element_lines = []
+        for line in input_file:
+            stripped_line = line.rstrip( '\n' )
+            if ( ( not element_lines ) and ( stripped_line != JSON_ELEMENT_INDENT + '{' ) ):
+                output_file.write( line )
             
-            # Get the target sequence name to use
-            file_target_seq_name = line[ BINARY_INTER_TARGET_SEQUENCE_INDEX ]
+            # The closing line of an element may be followed by 
+            # the comma separating it from the next element
+            elif ( stripped_line.rstrip( ',' ) == JSON_ELEMENT_INDENT + '}' ):
+                element_lines.append( JSON_ELEMENT_INDENT + '}' )
+                output_file.write( rename_json_element( ''.join( element_lines ) ) )
+                output_file.write( stripped_line[ len( JSON_ELEMENT_INDENT ) + 1: ] + '\n' )
+                element_lines = []
             
-            # Copy the line
-            binary_inter_renamed_sqces_file.write( '\t'.join( line[ : BINARY_INTER_QUERY_SEQUENCE_INDEX ] +
-                                                              [ query_seq_name ] +
-                                                              line[ BINARY_INTER_QUERY_SEQUENCE_INDEX+1 : BINARY_INTER_TARGET_SEQUENCE_INDEX ] +
-                                                              [ file_target_seq_name ] +
-                                                              line[ BINARY_INTER_TARGET_SEQUENCE_INDEX+1 : ] ) )
-            line = binary_inter_file.readline()
+            else:
+                element_lines.append( line )
+        
+        if element_lines:
+            raise Exception( 'The file ' + input_file_path + ' ends within an element.' )
     
+    return output_file_path
+
+
 
-            
 # ===========================================
 # Simplify summary files
 # ===========================================
@@ -599,8 +540,53 @@ def simplify_query_features_json( query_features_json_file_path, query_features_
         # Update the sequence name
         json_content_renamed_seq[ seq_name ] = json_content.get( file_seq_name )
             
+    # NB: The file is written without whitespace if the IUPred scores
+    #     are registered using a compact encoding (i.e. as an object
+    #     instead of a list of points, see query_proteins_features_to_json)
+    compact = any( [ isinstance( features.get( 'IUPRED' ), dict ) for features in json_content_renamed_seq.values() ] )
     with open( query_features_json_renamed_sqces_file_path, 'w' ) as query_features_json_renamed_sqces_file:
-        json.dump( json_content_renamed_seq, query_features_json_renamed_sqces_file, indent=4 )
+        if compact:
+            json.dump( json_content_renamed_seq, query_features_json_renamed_sqces_file, separators=( ',', ':' ) )
+        else:
+            json.dump( json_content_renamed_seq, query_features_json_renamed_sqces_file, indent=4 )
+
+
+
+# simplify_query_features_shards
+# ------------------------------
+#
+# This function allows to "simplify" the sequence names of the 
+# query features shards (see query_proteins_features_to_json).
+# NB: The shards are read one at a time, hence only the features
+#     of the proteins of one shard are held in memory.
+# 
+# @param query_features_shards_folder_path: String - The path to the folder of shards.
+# @param query_features_shards_renamed_sqces_folder_path: String - The path to the folder of shards
+#                                                                  where sequences have been renamed.
+# @param query_sqces: Dictionary - The dictionary that associates the "short" fasta headers
+#                                  to the sequence names for the query sequences.
+# 
+def simplify_query_features_shards( query_features_shards_folder_path, query_features_shards_renamed_sqces_folder_path, query_sqces ):
+    
+    with open( os.path.join( query_features_shards_folder_path, 
+                             query_proteins_features_to_json.SHARDS_INDEX_FILENAME ), 'r' ) as index_file:
+        shards_index = json.load( index_file )
+    
+    # Get the features of the proteins (in the order of the shards) 
+    # under their new sequence name
+    def get_renamed_features():
+        for shard_filename in shards_index[ 'shards' ]:
+            with open( os.path.join( query_features_shards_folder_path, shard_filename ), 'r' ) as shard_file:
+                shard_content = json.load( shard_file, object_pairs_hook = OrderedDict )
+            for ( file_seq_name, features ) in shard_content.items():
+                seq_name = query_sqces.get( file_seq_name ).get( SEQNAME )
+                if ( seq_name == '' ):
+                    seq_name = file_seq_name
+                yield ( seq_name, features )
+    
+    query_proteins_features_to_json.write_features_shards( features_items = get_renamed_features(),
+                                                           shards_folder = query_features_shards_renamed_sqces_folder_path,
+                                                           shard_size = shards_index[ 'shard_size' ] )
     
             
 
@@ -626,13 +612,16 @@ if __name__=='__main__':
     query_sqce_names_match_file_path = get_option( option_dict = option_dict, option_name = QUERY_SQCE_NAMES_MATCH_FILE_OPTION, not_none = True )
     parsed_slimprob_occ_file_path = get_option( option_dict = option_dict, option_name = PARSED_SLIMPROB_OCC_FILE_OPTION, not_none = True )
     query_disorder_prop_file_path = get_option( option_dict = option_dict, option_name = QUERY_DISORDER_PROP_FILE_OPTION, not_none = True )
+    query_disorder_scores_file_path = get_option( option_dict = option_dict, option_name = QUERY_DISORDER_SCORES_FILE_OPTION, not_none = False )
     
     ddi_file_path = get_option( option_dict = option_dict, option_name = DDI_FILE_OPTION, not_none = True )
     dmi_file_path = get_option( option_dict = option_dict, option_name = DMI_FILE_OPTION, not_none = True )
     all_inter_file_path = get_option( option_dict = option_dict, option_name = ALL_INTERACTIONS_FILE_OPTION, not_none = True )
     binary_inter_file_path = get_option( option_dict = option_dict, option_name = BINARY_INTERACTIONS_FILE_OPTION, not_none = True )
+    all_interactions_json_file_path = get_option( option_dict = option_dict, option_name = ALL_INTERACTIONS_JSON_FILE_OPTION, not_none = True )
     
     query_features_json_file_path = get_option( option_dict = option_dict, option_name = QUERY_FEATURES_JSON_FILE_OPTION, not_none = True )
+    query_features_shards_folder_path = get_option( option_dict = option_dict, option_name = QUERY_FEATURES_SHARDS_FOLDER_OPTION, not_none = False )
     
     
     # Outputs
@@ -642,6 +631,10 @@ if __name__=='__main__':
     
     parsed_slimprob_occ_renamed_sqces_file_path = get_option( option_dict = option_dict, option_name = PARSED_SLIMPROB_OCC_RENAMED_SQCES_FILE_OPTION, not_none = True )
     query_disorder_prop_renamed_sqces_file_path = get_option( option_dict = option_dict, option_name = QUERY_DISORDER_PROP_RENAMED_SQCES_FILE_OPTION, not_none = True )
+    query_disorder_scores_renamed_sqces_file_path = get_option( option_dict = option_dict, option_name = QUERY_DISORDER_SCORES_RENAMED_SQCES_FILE_OPTION, not_none = False )
+    if ( bool( query_disorder_scores_file_path ) != bool( query_disorder_scores_renamed_sqces_file_path ) ):
+        raise Exception( 'The paths to both the binary file of IUPred scores and the binary file of' +
+                         ' IUPred scores with sequences renamed have to be provided.' )
     
     ddi_renamed_sqces_file_path = get_option( option_dict = option_dict, option_name = DDI_FILE_RENAMED_SQCES_FILE_OPTION, not_none = True )
     dmi_renamed_sqces_file_path = get_option( option_dict = option_dict, option_name = DMI_FILE_RENAMED_SQCES_FILE_OPTION, not_none = True )
@@ -650,6 +643,14 @@ if __name__=='__main__':
     all_interactions_renamed_sqces_json_file_path = get_option( option_dict = option_dict, option_name = ALL_INTERACTIONS_JSON_RENAMED_SQCES_FILE_OPTION, not_none = True )
     
     query_features_json_renamed_sqces_file_path = get_option( option_dict = option_dict, option_name = QUERY_FEATURES_JSON_RENAMED_SQCES_FILE_OPTION, not_none = True )
+    query_features_shards_renamed_sqces_folder_path = get_option( option_dict = option_dict, option_name = QUERY_FEATURES_SHARDS_RENAMED_SQCES_FOLDER_OPTION, not_none = False )
+    if ( bool( query_features_shards_folder_path ) != bool( query_features_shards_renamed_sqces_folder_path ) ):
+        raise Exception( 'The paths to both the folder of query features shards and the folder of' +
+                         ' query features shards with sequences renamed have to be provided.' )
+        
+    
+    # Number of processes used to rename the files
+    processes_nb = get_option( option_dict = option_dict, option_name = PROCESSES_NB_OPTION, not_none = False )
         
     
     # Run the scripts
@@ -659,53 +660,74 @@ if __name__=='__main__':
     query_sqces = simplify_sqce_names( query_fasta_file_path = query_fasta_file_path,
                                        query_sqce_names_match_file_path = query_sqce_names_match_file_path,
                                        sqce_names_match_file_path = sqce_names_match_file_path )
+    renamed_sqces = get_renamed_sqces_dict( query_sqces )
+    
+    # List of the tabulated files to "simplify", as 
+    # ( input file, output file, index of the column
+    #   containing the sequence names, has header? )
+    rename_table = [ # Outputs of InterProScan (query sequences)
+                     ( parsed_query_domain_file_path, parsed_query_domain_renamed_sqces_file_path, PARSED_DOMAIN_SEQUENCE_INDEX, True ),
+                     # Outputs of SLiMProb (occurrences and disorder propensities)
+                     ( parsed_slimprob_occ_file_path, parsed_slimprob_occ_renamed_sqces_file_path, PARSED_SLIMRPOB_OCC_SEQUENCE_INDEX, True ),
+                     ( query_disorder_prop_file_path, query_disorder_prop_renamed_sqces_file_path, QUERY_DISORDER_PROP_SEQUENCE_INDEX, True ),
+                     # Inferred interactions files (the target sequence names are kept)
+                     ( ddi_file_path, ddi_renamed_sqces_file_path, DDI_QUERY_SEQUENCE_INDEX, True ),
+                     ( dmi_file_path, dmi_renamed_sqces_file_path, DMI_QUERY_SEQUENCE_INDEX, True ),
+                     ( all_inter_file_path, all_inter_renamed_sqces_file_path, ALL_INTER_QUERY_SEQUENCE_INDEX, True ),
+                     ( binary_inter_file_path, binary_inter_renamed_sqces_file_path, BINARY_INTER_QUERY_SEQUENCE_INDEX, False ) ]
+    
+    # "Simplify" all the files concurrently, so that the time spent is
+    # about the time necessary to read and write the largest file
+    if ( not processes_nb ):
+        processes_nb = len( rename_table ) + 1
+    
+    with concurrent.futures.ProcessPoolExecutor( max_workers = processes_nb ) as executor:
+        
+        rename_futures = {}
+        for ( input_file_path, output_file_path, seq_column_index, has_header ) in rename_table:
+            rename_futures[ output_file_path ] = executor.submit( rename_sqces_in_file,
+                                                                  input_file_path = input_file_path,
+                                                                  output_file_path = output_file_path,
+                                                                  seq_column_index = seq_column_index,
+                                                                  has_header = has_header,
+                                                                  renamed_sqces = renamed_sqces )
+        if query_disorder_scores_file_path:
+            rename_futures[ query_disorder_scores_renamed_sqces_file_path ] = executor.submit( rename_sqces_in_iuscores_file,
+                                                                                              input_file_path = query_disorder_scores_file_path,
+                                                                                              output_file_path = query_disorder_scores_renamed_sqces_file_path,
+                                                                                              renamed_sqces = renamed_sqces )
+        
+        # "Simplify" the summary files
+        query_features_future = executor.submit( simplify_query_features_json,
+                                                 query_features_json_file_path = query_features_json_file_path,
+                                                 query_features_json_renamed_sqces_file_path = query_features_json_renamed_sqces_file_path, 
+                                                 query_sqces = query_sqces )
+        summary_futures = [ query_features_future ]
+        if query_features_shards_folder_path:
+            summary_futures.append( executor.submit( simplify_query_features_shards,
+                                                     query_features_shards_folder_path = query_features_shards_folder_path,
+                                                     query_features_shards_renamed_sqces_folder_path = query_features_shards_renamed_sqces_folder_path,
+                                                     query_sqces = query_sqces ) )
+        
+        # Rename the query proteins in the Json file containing all the interactions
+        # NB: When several query sequences get the same name, the nodes have
+        #     to be merged, hence the Json file is re-built from the file
+        #     containing all the interactions once it has been renamed.
+        if ( len( set( renamed_sqces.values() ) ) == len( renamed_sqces.keys() ) ):
+            all_interactions_json_future = executor.submit( rename_sqces_in_json_file,
+                                                            input_file_path = all_interactions_json_file_path,
+                                                            output_file_path = all_interactions_renamed_sqces_json_file_path,
+                                                            renamed_sqces = renamed_sqces )
+        else:
+            print( 'INFO :: Several query sequences share the same name, the JSON file of all' +
+                   ' the interactions will be re-built.' )
+            rename_futures[ all_inter_renamed_sqces_file_path ].result()
+            all_interactions_json_future = executor.submit( interaction_all_to_json.generate_json,
+                                                            inferred_all_interactions_file = all_inter_renamed_sqces_file_path, 
+                                                            target_domain_annotations_file = target_domain_annotations_file_path,
+                                                            all_interactions_json_file = all_interactions_renamed_sqces_json_file_path )
         
-    # "Simplify" the outputs of InterProScan
-      # Query sequences
-    simplify_parsed_domain_interpro( parsed_domain_file_path = parsed_query_domain_file_path, 
-                                     parsed_domain_renamed_sqces_file_path = parsed_query_domain_renamed_sqces_file_path, 
-                                     sqce_dict = query_sqces )
-    
-    # "Simplify" the outputs of SLiMProb
-      # Occurrences file
-    simplify_parsed_slimprob_occ( parsed_slimprob_occ_file_path = parsed_slimprob_occ_file_path, 
-                                  parsed_slimprob_occ_renamed_sqces_file_path = parsed_slimprob_occ_renamed_sqces_file_path, 
-                                  sqce_dict = query_sqces )
-      # Disorder propensities file
-    simplify_query_disorder_prop( query_disorder_prop_file_path = query_disorder_prop_file_path,
-                                  query_disorder_prop_renamed_sqces_file_path = query_disorder_prop_renamed_sqces_file_path, 
-                                  sqce_dict = query_sqces )
-    
-    # Inferred interactions files
-      # Domain-domain interactions file
-    simplify_inferred_ddi( ddi_file_path = ddi_file_path, 
-                           ddi_renamed_sqces_file_path = ddi_renamed_sqces_file_path, 
-                           query_sqces = query_sqces )
-    
-      # Domain-motif interactions file
-    simplify_inferred_dmi( dmi_file_path = dmi_file_path,
-                           dmi_renamed_sqces_file_path = dmi_renamed_sqces_file_path,
-                           query_sqces = query_sqces )
-         
-      # All interactions file
-    simplify_inferred_all( all_inter_file_path = all_inter_file_path,
-                           all_inter_renamed_sqces_file_path = all_inter_renamed_sqces_file_path,
-                           query_sqces = query_sqces )
-    
-      # Binary interactions file
-    simplify_inferred_binary( binary_inter_file_path = binary_inter_file_path,
-                              binary_inter_renamed_sqces_file_path = binary_inter_renamed_sqces_file_path,
-                              query_sqces = query_sqces )
-    
-      # Re-built the Json file containing all the interactions
-      # NB: This is quicker than parsing the file and changing the name
-      #     and would make maintenance of the current script easier.
-    interaction_all_to_json.generate_json( inferred_all_interactions_file = all_inter_renamed_sqces_file_path, 
-                                           target_domain_annotations_file = target_domain_annotations_file_path,
-                                           all_interactions_json_file = all_interactions_renamed_sqces_json_file_path )
-    
-    # "Simplify" the summary files
-    simplify_query_features_json( query_features_json_file_path = query_features_json_file_path,
-                                  query_features_json_renamed_sqces_file_path = query_features_json_renamed_sqces_file_path, 
-                                  query_sqces = query_sqces )
-    
\ No newline at end of file
+        # Wait for all the tasks to complete
+        # NB: This raises the exceptions that occurred in the tasks
+        for future in list( rename_futures.values() ) + summary_futures + [ all_interactions_json_future ]:
+            future.result()
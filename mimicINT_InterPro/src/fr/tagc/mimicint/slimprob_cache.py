@@ -0,0 +1,429 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import hashlib
+
+
+from fr.tagc.mimicint.util.option.OptionManager import *
+from fr.tagc.mimicint.util.cache.CacheManager import read_fasta_file, write_cache_file
+from fr.tagc.mimicint.query_sqce_ids import QUERY_SQCE_ID_PREFIX, get_query_sqce_id
+
+# This script allows to use a persistent cache of the SLiMProb
+# results computed for the query sequences, so that SLiMProb is
+# only run on the sequences that have never been processed with
+# the same motifs and the same parameters.
+#
+# The sequences are provided to SLiMProb under their stable identifier
+# (see the query_sqce_ids script), which is computed from the sequence
+# only, hence the SLiMProb outputs do not depend on the fasta headers.
+#
+# The cache is a folder in which the SLiMProb occurrences and the
+# IUPred scores are saved for each sequence, in files named after
+# the identifier of the sequence (in a subfolder named after the
+# SHA1 digest of the motif file, of the SLiMProb parameters and of the
+# size and modification time of the ortholog database), i.e.
+#
+#     <cache_folder>/<params_sha1>/<id[2:4]>/<id>.occ.tsv
+#     <cache_folder>/<params_sha1>/<id[2:4]>/<id>.iupred.txt
+#
+# NB: The header of the occurrence files is saved in the
+#     <cache_folder>/<params_sha1>/occ_header.tsv file.
+#
+# This script may be run in two modes:
+# - lookup: The occurrences and IUPred scores of the sequences found in the
+#           cache are written in an occurrence file and an IUScore folder,
+#           and the other sequences are written (under their identifier)
+#           in a fasta file on which SLiMProb has to be run.
+# - update: The results computed by SLiMProb are registered in the cache
+#           and merged with the results found in the cache.
+
+
+# ===========================================
+# Constants
+# ===========================================
+
+# Modes of the script
+MODE_LOOKUP = 'lookup'
+MODE_UPDATE = 'update'
+
+# Extension of the files of the cache
+CACHE_OCC_FILE_EXTENSION = '.occ.tsv'
+CACHE_IUSCORE_FILE_EXTENSION = '.iupred.txt'
+# Name of the file containing the header of the occurrence files
+CACHE_OCC_HEADER_FILENAME = 'occ_header.tsv'
+
+# Extension at the end of the IUScore files generated by IUPred
+IUSCORE_FILE_EXTENSION = '.iupred.txt'
+
+# Index of the sequence name column in the SLiMProb occurrence files
+SLIMPROB_OCC_SEQ_INDEX = 4
+
+
+# List of options allowed
+# -----------------------
+# Mode of the script
+MODE_OPTION = 'MODE'
+# Path to the query fasta file
+QUERY_FASTA_FILE_OPTION = 'QUERY_FASTA_FILE'
+# Path to the cache folder
+CACHE_FOLDER_OPTION = 'CACHE_FOLDER'
+# Path to the motif file provided to SLiMProb
+MOTIFS_FILE_OPTION = 'MOTIFS_FILE'
+# Parameters provided to SLiMProb
+SLIMPROB_PARAMS_OPTION = 'SLIMPROB_PARAMS'
+# Path to the ortholog database provided to SLiMProb
+ORTHODB_FILE_OPTION = 'ORTHODB_FILE'
+# Path to the fasta file of the sequences missing from the cache
+MISSING_FASTA_FILE_OPTION = 'MISSING_FASTA_FILE'
+# Path to the occurrences found in the cache
+CACHED_OCC_FILE_OPTION = 'CACHED_OCC_FILE'
+# Path to the folder of the IUPred scores found in the cache
+CACHED_IUSCORE_FOLDER_OPTION = 'CACHED_IUSCORE_FOLDER'
+# Path to the occurrences computed by SLiMProb
+NEW_OCC_FILE_OPTION = 'NEW_OCC_FILE'
+# Path to the folder of the IUPred scores computed by SLiMProb
+NEW_IUSCORE_FOLDER_OPTION = 'NEW_IUSCORE_FOLDER'
+# Path to the merged occurrences
+OUTPUT_OCC_FILE_OPTION = 'OUTPUT_OCC_FILE'
+# Path to the folder of the merged IUPred scores
+OUTPUT_IUSCORE_FOLDER_OPTION = 'OUTPUT_IUSCORE_FOLDER'
+
+OPTION_LIST = [ [ '-m', '--mode', 'store', 'choice', MODE_OPTION, [ MODE_LOOKUP, MODE_UPDATE ], None, 'The mode of the script (lookup / update).' ],
+                [ '-f', '--fastaFile', 'store', 'string', QUERY_FASTA_FILE_OPTION, None, 'The path to the query fasta file (lookup mode).' ],
+                [ '-c', '--cacheDir', 'store', 'string', CACHE_FOLDER_OPTION, None, 'The path to the cache folder. If not provided, no cache is used.' ],
+                [ '-e', '--motifs', 'store', 'string', MOTIFS_FILE_OPTION, None, 'The path to the motif file provided to SLiMProb.' ],
+                [ '-p', '--slimprobParams', 'store', 'string', SLIMPROB_PARAMS_OPTION, None, 'The parameters provided to SLiMProb (as a string).' ],
+                [ '-b', '--orthodb', 'store', 'string', ORTHODB_FILE_OPTION, None, 'The path to the ortholog database fasta file provided to SLiMProb (optional).' ],
+                [ '-u', '--missingFasta', 'store', 'string', MISSING_FASTA_FILE_OPTION, None, 'The path to the fasta file of the sequences missing from the cache.' ],
+                [ '-r', '--cachedOcc', 'store', 'string', CACHED_OCC_FILE_OPTION, None, 'The path to the file of the occurrences found in the cache.' ],
+                [ '-s', '--cachedIuscoredir', 'store', 'string', CACHED_IUSCORE_FOLDER_OPTION, None, 'The path to the folder of the IUPred scores found in the cache.' ],
+                [ '-n', '--newOcc', 'store', 'string', NEW_OCC_FILE_OPTION, None, 'The path to the file of the occurrences computed by SLiMProb (update mode).' ],
+                [ '-i', '--newIuscoredir', 'store', 'string', NEW_IUSCORE_FOLDER_OPTION, None, 'The path to the folder of the IUPred scores computed by SLiMProb (update mode).' ],
+                [ '-o', '--outputOcc', 'store', 'string', OUTPUT_OCC_FILE_OPTION, None, 'The path to the file of the merged occurrences (update mode).' ],
+                [ '-d', '--outputIuscoredir', 'store', 'string', OUTPUT_IUSCORE_FOLDER_OPTION, None, 'The path to the folder of the merged IUPred scores (update mode).' ] ]
+
+
+
+# ===========================================
+# Script
+# ===========================================
+
+## get_params_folder
+#  -----------------
+#
+# This function allows to get the path of the subfolder of the cache
+# dedicated to a motif file, a set of SLiMProb parameters and an
+# ortholog database.
+# NB: The ortholog database is identified by its size and its last
+#     modification time (rather than by its path or its content, 
+#     which would be long to hash), so that replacing the file
+#     invalidates the results registered in the cache.
+#
+# @param cache_folder: String - The path to the cache folder.
+# @param motifs_file_path: String - The path to the motif file.
+# @param slimprob_params: String - The parameters provided to SLiMProb.
+# @param orthodb_file_path: String - The path to the ortholog database (may be None).
+#
+# @return params_folder: String - The path to the subfolder of the cache.
+#
+def get_params_folder( cache_folder, motifs_file_path, slimprob_params, orthodb_file_path=None ):
+
+    params_sha1 = hashlib.sha1()
+    with open( motifs_file_path, 'rb' ) as motifs_file:
+        params_sha1.update( motifs_file.read() )
+    params_sha1.update( str( slimprob_params ).encode( 'utf-8' ) )
+    if orthodb_file_path:
+        orthodb_stat = os.stat( orthodb_file_path )
+        params_sha1.update( ( ';orthodb_size=' + str( orthodb_stat.st_size ) +
+                              ';orthodb_mtime=' + str( orthodb_stat.st_mtime_ns ) ).encode( 'utf-8' ) )
+
+    return os.path.join( cache_folder, params_sha1.hexdigest() )
+
+
+
+## get_cache_file_path
+#  -------------------
+#
+# This function allows to get the path of a file of the cache.
+#
+# @param params_folder: String - The path to the subfolder of the cache.
+# @param sequence_id: String - The identifier of the sequence.
+# @param extension: String - The extension of the file.
+#
+# @return cache_file: String - The path to the file of the cache.
+#
+def get_cache_file_path( params_folder, sequence_id, extension ):
+
+    subfolder = sequence_id[ len( QUERY_SQCE_ID_PREFIX ) : len( QUERY_SQCE_ID_PREFIX ) + 2 ]
+    return os.path.join( params_folder, subfolder, sequence_id + extension )
+
+
+
+## lookup_slimprob_cache
+#  ---------------------
+#
+# This function allows to get the occurrences and IUPred scores of the
+# query sequences registered in the cache, and to write the sequences
+# that are missing from the cache in a new fasta file, under their
+# stable identifier.
+#
+# @param query_fasta_file_path: String - The path to the query fasta file.
+# @param params_folder: String - The path to the subfolder of the cache (may be None).
+# @param missing_fasta_file_path: String - The path to the fasta file of the missing sequences.
+# @param cached_occ_file_path: String - The path to the file of the occurrences found in the cache.
+# @param cached_iuscore_folder_path: String - The path to the folder of the IUPred scores
+#                                             found in the cache.
+#
+# @raise Exception - When the same identifier is computed for two sequences.
+#
+def lookup_slimprob_cache( query_fasta_file_path, params_folder, missing_fasta_file_path, cached_occ_file_path, cached_iuscore_folder_path ):
+
+    sequences = read_fasta_file( query_fasta_file_path, get_query_sqce_id )
+
+    if ( not os.path.isdir( cached_iuscore_folder_path ) ):
+        os.makedirs( cached_iuscore_folder_path )
+
+    hit_count = 0
+    sequence_ids = set()
+    with open( missing_fasta_file_path, 'w' ) as missing_fasta_file, \
+         open( cached_occ_file_path, 'w' ) as cached_occ_file:
+
+        for ( short_header, header_line, sequence_lines, sequence_id ) in sequences:
+
+            if ( sequence_id in sequence_ids ):
+                raise Exception( 'The sequence of the header "' + short_header + '" has been found twice' +
+                                 ' in the ' + query_fasta_file_path + ' file. The fasta file is expected' +
+                                 ' to contain unique sequences.' )
+            sequence_ids.add( sequence_id )
+
+            cache_occ_file = None
+            if params_folder:
+                cache_occ_file = get_cache_file_path( params_folder = params_folder,
+                                                      sequence_id = sequence_id,
+                                                      extension = CACHE_OCC_FILE_EXTENSION )
+                cache_iuscore_file = get_cache_file_path( params_folder = params_folder,
+                                                          sequence_id = sequence_id,
+                                                          extension = CACHE_IUSCORE_FILE_EXTENSION )
+
+            # NB: The occurrence file is always written after the IUPred
+            #     score file, hence its existence is used as a marker
+            if ( cache_occ_file and os.path.exists( cache_occ_file ) ):
+                with open( cache_occ_file, 'r' ) as cached_occ:
+                    cached_occ_file.writelines( cached_occ.readlines() )
+                shutil.copy( cache_iuscore_file,
+                             os.path.join( cached_iuscore_folder_path, sequence_id + IUSCORE_FILE_EXTENSION ) )
+                hit_count += 1
+
+            else:
+                missing_fasta_file.write( '>' + sequence_id + '\n' )
+                missing_fasta_file.writelines( sequence_lines )
+
+    print( 'INFO :: The results of ' + str( hit_count ) + ' sequences (out of ' + str( len( sequences ) ) +
+           ') have been found in the SLiMProb cache.' )
+
+
+
+## update_slimprob_cache
+#  ---------------------
+#
+# This function allows to register in the cache the occurrences and
+# IUPred scores computed by SLiMProb for the sequences that were missing,
+# and to merge these results with the ones found in the cache.
+#
+# @param missing_fasta_file_path: String - The path to the fasta file of the missing sequences.
+# @param params_folder: String - The path to the subfolder of the cache (may be None).
+# @param cached_occ_file_path: String - The path to the file of the occurrences found in the cache.
+# @param cached_iuscore_folder_path: String - The path to the folder of the IUPred scores
+#                                             found in the cache.
+# @param new_occ_file_path: String - The path to the file of the occurrences computed by SLiMProb.
+# @param new_iuscore_folder_path: String - The path to the folder of the IUPred scores
+#                                          computed by SLiMProb.
+# @param output_occ_file_path: String - The path to the file of the merged occurrences.
+# @param output_iuscore_folder_path: String - The path to the folder of the merged IUPred scores.
+#
+# @raise Exception - When the header of the occurrence files is unknown.
+#
+def update_slimprob_cache( missing_fasta_file_path, params_folder, cached_occ_file_path, cached_iuscore_folder_path,
+                           new_occ_file_path, new_iuscore_folder_path, output_occ_file_path, output_iuscore_folder_path ):
+
+    # Get the occurrences computed by SLiMProb for each sequence
+    occ_header = None
+    new_occ = {}
+    if ( os.path.exists( new_occ_file_path )
+         and ( os.path.getsize( new_occ_file_path ) != 0 ) ):
+        with open( new_occ_file_path, 'r' ) as new_occ_file:
+            occ_header = new_occ_file.readline()
+            for occ_line in new_occ_file:
+                slimprob_seq_name = occ_line.split( '\t' )[ SLIMPROB_OCC_SEQ_INDEX ]
+                new_occ.setdefault( slimprob_seq_name, [] ).append( occ_line )
+
+    # Get the IUPred score file computed by SLiMProb for each sequence
+    new_iuscore_files = {}
+    if os.path.isdir( new_iuscore_folder_path ):
+        for iuscore_file in os.listdir( new_iuscore_folder_path ):
+            if iuscore_file.endswith( IUSCORE_FILE_EXTENSION ):
+                with open( os.path.join( new_iuscore_folder_path, iuscore_file ), 'r' ) as iuscores:
+                    slimprob_seq_name = iuscores.read().replace( '\n', ' ' ).split( ' ' )[ 0 ]
+                new_iuscore_files[ slimprob_seq_name ] = os.path.join( new_iuscore_folder_path, iuscore_file )
+
+    # Register these results in the cache
+    # NB: As the missing sequences have been provided to SLiMProb
+    #     under their identifier, SLiMProb uses this identifier
+    #     as sequence name
+    if ( params_folder and new_iuscore_files ):
+
+        if occ_header:
+            write_cache_file( cache_file = os.path.join( params_folder, CACHE_OCC_HEADER_FILENAME ),
+                              lines = [ occ_header ] )
+
+        registered_count = 0
+        for ( short_header, header_line, sequence_lines, sequence_id ) in read_fasta_file( missing_fasta_file_path, get_query_sqce_id ):
+            if new_iuscore_files.get( sequence_id ):
+                with open( new_iuscore_files[ sequence_id ], 'r' ) as iuscores:
+                    write_cache_file( cache_file = get_cache_file_path( params_folder = params_folder,
+                                                                        sequence_id = sequence_id,
+                                                                        extension = CACHE_IUSCORE_FILE_EXTENSION ),
+                                      lines = iuscores.readlines() )
+                # NB: The sequences without any occurrence are registered
+                #     too, so that they are not processed again
+                write_cache_file( cache_file = get_cache_file_path( params_folder = params_folder,
+                                                                    sequence_id = sequence_id,
+                                                                    extension = CACHE_OCC_FILE_EXTENSION ),
+                                  lines = new_occ.get( sequence_id, [] ) )
+                registered_count += 1
+
+        print( 'INFO :: The results of ' + str( registered_count ) + ' sequences have been registered in the SLiMProb cache.' )
+
+    # Get the header of the occurrence file from the
+    # cache if SLiMProb has not been run
+    if ( ( not occ_header ) and params_folder
+         and os.path.exists( os.path.join( params_folder, CACHE_OCC_HEADER_FILENAME ) ) ):
+        with open( os.path.join( params_folder, CACHE_OCC_HEADER_FILENAME ), 'r' ) as occ_header_file:
+            occ_header = occ_header_file.readline()
+    if ( not occ_header ):
+        raise Exception( 'The header of the SLiMProb occurrence file could not be found.' )
+
+    # Merge the occurrences found in the cache with the new ones
+    with open( output_occ_file_path, 'w' ) as output_occ_file:
+        output_occ_file.write( occ_header )
+        with open( cached_occ_file_path, 'r' ) as cached_occ_file:
+            for occ_line in cached_occ_file:
+                output_occ_file.write( occ_line )
+        for slimprob_seq_name in new_occ.keys():
+            output_occ_file.writelines( new_occ[ slimprob_seq_name ] )
+
+    # Merge the IUPred scores found in the cache with the new ones
+    if ( not os.path.isdir( output_iuscore_folder_path ) ):
+        os.makedirs( output_iuscore_folder_path )
+    for iuscore_folder_path in [ cached_iuscore_folder_path, new_iuscore_folder_path ]:
+        if os.path.isdir( iuscore_folder_path ):
+            for iuscore_file in os.listdir( iuscore_folder_path ):
+                if iuscore_file.endswith( IUSCORE_FILE_EXTENSION ):
+                    shutil.copy( os.path.join( iuscore_folder_path, iuscore_file ),
+                                 os.path.join( output_iuscore_folder_path, iuscore_file ) )
+
+
+
+# ===========================================
+# Parse command line arguments
+# and run script
+# ===========================================
+
+#### Code execution in the console ####
+if __name__ == '__main__':
+
+    # Parse the command-line arguments
+    option_dict = parse_arguments( OPTION_LIST )
+
+    # Get the mode
+    mode = get_option( option_dict = option_dict,
+                       option_name = MODE_OPTION,
+                       not_none = True )
+    if ( not mode ):
+        raise Exception( 'The mode (' + MODE_LOOKUP + ' / ' + MODE_UPDATE + ') has to be provided.' )
+
+    # Get the path to the cache folder
+    cache_folder = get_option( option_dict = option_dict,
+                               option_name = CACHE_FOLDER_OPTION,
+                               not_none = False )
+
+    # Get the subfolder of the cache dedicated
+    # to the motifs and SLiMProb parameters used
+    if cache_folder:
+        motifs_file_path = get_option( option_dict = option_dict,
+                                       option_name = MOTIFS_FILE_OPTION,
+                                       not_none = True )
+        slimprob_params = get_option( option_dict = option_dict,
+                                      option_name = SLIMPROB_PARAMS_OPTION,
+                                      not_none = False )
+        orthodb_file_path = get_option( option_dict = option_dict,
+                                        option_name = ORTHODB_FILE_OPTION,
+                                        not_none = False )
+        params_folder = get_params_folder( cache_folder = cache_folder,
+                                           motifs_file_path = motifs_file_path,
+                                           slimprob_params = slimprob_params,
+                                           orthodb_file_path = orthodb_file_path )
+    else:
+        params_folder = None
+
+    # Get the path to the fasta file of the missing sequences
+    missing_fasta_file_path = get_option( option_dict = option_dict,
+                                          option_name = MISSING_FASTA_FILE_OPTION,
+                                          not_none = True )
+
+    # Get the path to the occurrences found in the cache
+    cached_occ_file_path = get_option( option_dict = option_dict,
+                                       option_name = CACHED_OCC_FILE_OPTION,
+                                       not_none = True )
+
+    # Get the path to the IUPred scores found in the cache
+    cached_iuscore_folder_path = get_option( option_dict = option_dict,
+                                             option_name = CACHED_IUSCORE_FOLDER_OPTION,
+                                             not_none = True )
+
+    # Run the script
+    if ( mode == MODE_LOOKUP ):
+
+        # Get the path to the query fasta file
+        query_fasta_file_path = get_option( option_dict = option_dict,
+                                            option_name = QUERY_FASTA_FILE_OPTION,
+                                            not_none = True )
+
+        lookup_slimprob_cache( query_fasta_file_path = query_fasta_file_path,
+                               params_folder = params_folder,
+                               missing_fasta_file_path = missing_fasta_file_path,
+                               cached_occ_file_path = cached_occ_file_path,
+                               cached_iuscore_folder_path = cached_iuscore_folder_path )
+
+    else:
+
+        # Get the path to the occurrences computed by SLiMProb
+        new_occ_file_path = get_option( option_dict = option_dict,
+                                        option_name = NEW_OCC_FILE_OPTION,
+                                        not_none = True )
+
+        # Get the path to the IUPred scores computed by SLiMProb
+        new_iuscore_folder_path = get_option( option_dict = option_dict,
+                                              option_name = NEW_IUSCORE_FOLDER_OPTION,
+                                              not_none = True )
+
+        # Get the path to the merged occurrences
+        output_occ_file_path = get_option( option_dict = option_dict,
+                                           option_name = OUTPUT_OCC_FILE_OPTION,
+                                           not_none = True )
+
+        # Get the path to the merged IUPred scores
+        output_iuscore_folder_path = get_option( option_dict = option_dict,
+                                                 option_name = OUTPUT_IUSCORE_FOLDER_OPTION,
+                                                 not_none = True )
+
+        update_slimprob_cache( missing_fasta_file_path = missing_fasta_file_path,
+                               params_folder = params_folder,
+                               cached_occ_file_path = cached_occ_file_path,
+                               cached_iuscore_folder_path = cached_iuscore_folder_path,
+                               new_occ_file_path = new_occ_file_path,
+                               new_iuscore_folder_path = new_iuscore_folder_path,
+                               output_occ_file_path = output_occ_file_path,
+                               output_iuscore_folder_path = output_iuscore_folder_path )
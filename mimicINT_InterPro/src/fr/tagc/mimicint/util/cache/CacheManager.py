@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+
+
+# The functions of this module help to read the query sequences
+# and to write the files of the persistent caches of the results
+# computed for these sequences (see the interproscan_cache and
+# slimprob_cache scripts).
+
+
+# Extension of the files being written in the cache
+CACHE_TMP_EXTENSION = '.tmp'
+
+
+## read_fasta_file
+#  ---------------
+#
+# This function allows to get the sequences of a fasta file.
+#
+# @param fasta_file_path: String - The path to the fasta file.
+# @param get_sequence_id: Function - The function computing the identifier
+#                                    of a sequence from its lines.
+#
+# @return sequences: List - The list of (short header, header line, sequence lines,
+#                           sequence identifier) tuples, in the order of the file.
+#
+def read_fasta_file( fasta_file_path, get_sequence_id ):
+
+    sequences = []
+    with open( fasta_file_path, 'r' ) as fasta_file:
+
+        line = fasta_file.readline()
+        while ( ( line != '' )
+                and ( not line.startswith( '>' ) ) ):
+            line = fasta_file.readline()
+
+        while ( line != '' ):
+
+            header_line = line
+            sequence_lines = []
+            line = fasta_file.readline()
+            while ( ( line != '' )
+                    and ( not line.startswith( '>' ) ) ):
+                sequence_lines.append( line )
+                line = fasta_file.readline()
+
+            # Get the first part of the header
+            short_header = header_line[ 1: ]
+            if short_header.startswith( ' ' ):
+                short_header = short_header[ 1: ]
+            short_header = short_header.split( ' ' )[ 0 ].replace( '\n', '' )
+
+            sequences.append( ( short_header, header_line, sequence_lines, get_sequence_id( sequence_lines ) ) )
+
+    return sequences
+
+
+
+## write_cache_file
+#  ----------------
+#
+# This function allows to write a file of the cache. The content is
+# first written in a temporary file which is then renamed, so that
+# concurrent jobs never read an incomplete file.
+#
+# @param cache_file: String - The path to the file of the cache.
+# @param lines: List - The lines to write.
+#
+def write_cache_file( cache_file, lines ):
+
+    cache_subfolder = os.path.dirname( cache_file )
+    if ( not os.path.isdir( cache_subfolder ) ):
+        try:
+            os.makedirs( cache_subfolder )
+        except OSError:
+            # The folder may have been created by an other job in the meantime
+            if ( not os.path.isdir( cache_subfolder ) ):
+                raise
+
+    ( tmp_file_descriptor, tmp_file ) = tempfile.mkstemp( suffix = CACHE_TMP_EXTENSION,
+                                                          dir = cache_subfolder )
+    with os.fdopen( tmp_file_descriptor, 'w' ) as cache_tmp_file:
+        cache_tmp_file.writelines( lines )
+    os.rename( tmp_file, cache_file )
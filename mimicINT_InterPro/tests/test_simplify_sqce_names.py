@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+from collections import OrderedDict
+
+import pytest
+
+sys.path.insert( 0, os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'src' ) )
+
+from fr.tagc.mimicint.parsing_scripts.interaction_all_to_json import generate_json, write_json_list
+from fr.tagc.mimicint.simplify_sqce_names import rename_sqces_in_json_file
+
+
+
+def test_rename_sqces_in_json_file_with_numeric_query_headers( tmpdir ):
+    
+    # Target proteins named as the edges ids and the query headers
+    target_domain_annotations_file = str( tmpdir.join( 'target_domains.tsv' ) )
+    with open( target_domain_annotations_file, 'w' ) as annotations_file:
+        annotations_file.write( 'Protein\tDomain\n' )
+        annotations_file.write( 'T1\tIPR000001\n' )
+        annotations_file.write( '3\tIPR000002\n' )
+    
+    all_interactions_file = str( tmpdir.join( 'all_interactions.tsv' ) )
+    with open( all_interactions_file, 'w' ) as interactions_file:
+        interactions_file.write( 'Protein1\tProtein2\tType\n' )
+        interactions_file.write( 'T1\t1\tdomain-domain\n' )
+        interactions_file.write( '2\t3\tslim-domain\n' )
+    
+    all_interactions_json_file = str( tmpdir.join( 'all_interactions.json' ) )
+    generate_json( inferred_all_interactions_file = all_interactions_file,
+                   target_domain_annotations_file = target_domain_annotations_file,
+                   all_interactions_json_file = all_interactions_json_file )
+    
+    renamed_json_file = str( tmpdir.join( 'all_interactions_renamed.json' ) )
+    rename_sqces_in_json_file( input_file_path = all_interactions_json_file,
+                               output_file_path = renamed_json_file,
+                               renamed_sqces = { '1': 'VP35', '2': 'VP40', '3': 'GP' } )
+    
+    with open( renamed_json_file, 'r' ) as json_file:
+        json_content = json.load( json_file )
+    
+    assert [ node[ 'data' ] for node in json_content[ 'nodes' ] ] == [ { 'id': 'T1', 'type': 'target', 'target_degree': '1' },
+                                                                      { 'id': '3', 'type': 'target', 'target_degree': '1' },
+                                                                      { 'id': 'VP35', 'type': 'query', 'query_degree': '1' },
+                                                                      { 'id': 'VP40', 'type': 'query', 'query_degree': '1' } ]
+    assert [ edge[ 'data' ] for edge in json_content[ 'edges' ] ] == [ { 'id': '1', 'source': 'T1', 'target': 'VP35', 'type': '1' },
+                                                                      { 'id': '2', 'source': '3', 'target': 'VP40', 'type': '2' } ]
+
+
+
+# write_json_elements
+# -------------------
+#
+# Write the nodes and edges provided in a JSON file with the layout
+# of the interaction_all_to_json script.
+#
+def write_json_elements( json_file_path, nodes, edges ):
+    
+    with open( json_file_path, 'w' ) as json_file:
+        json_file.write( '{\n' )
+        write_json_list( json_file, 'nodes', nodes, False )
+        write_json_list( json_file, 'edges', edges, True )
+        json_file.write( '}' )
+
+
+
+def test_rename_sqces_in_json_file_with_reordered_keys( tmpdir ):
+    
+    # Elements with the "type" before the "id" (as may be written 
+    # when the order of the keys of the dictionaries is arbitrary)
+    all_interactions_json_file = str( tmpdir.join( 'all_interactions.json' ) )
+    write_json_elements( all_interactions_json_file,
+                         nodes = [ OrderedDict( [ ( 'data', OrderedDict( [ ( 'type', 'target' ), ( 'target_degree', '1' ), ( 'id', '2' ) ] ) ) ] ),
+                                   OrderedDict( [ ( 'data', OrderedDict( [ ( 'query_degree', '1' ), ( 'type', 'query' ), ( 'id', '1' ) ] ) ) ] ) ],
+                         edges = [ OrderedDict( [ ( 'data', OrderedDict( [ ( 'type', '1' ), ( 'target', '1' ), ( 'source', '2' ), ( 'id', '1' ) ] ) ) ] ) ] )
+    
+    renamed_json_file = str( tmpdir.join( 'all_interactions_renamed.json' ) )
+    rename_sqces_in_json_file( input_file_path = all_interactions_json_file,
+                               output_file_path = renamed_json_file,
+                               renamed_sqces = { '1': 'VP35', '2': 'VP40' } )
+    
+    with open( renamed_json_file, 'r' ) as json_file:
+        json_content = json.load( json_file )
+    
+    assert [ node[ 'data' ] for node in json_content[ 'nodes' ] ] == [ { 'id': '2', 'type': 'target', 'target_degree': '1' },
+                                                                      { 'id': 'VP35', 'type': 'query', 'query_degree': '1' } ]
+    assert [ edge[ 'data' ] for edge in json_content[ 'edges' ] ] == [ { 'id': '1', 'source': '2', 'target': 'VP35', 'type': '1' } ]
+
+
+
+def test_rename_sqces_in_json_file_with_incomplete_element( tmpdir ):
+    
+    all_interactions_json_file = str( tmpdir.join( 'all_interactions.json' ) )
+    write_json_elements( all_interactions_json_file,
+                         nodes = [ { 'data': { 'id': '1', 'type': 'query', 'query_degree': '1' } } ],
+                         edges = [ { 'data': { 'id': '1', 'source': '2', 'type': '1' } } ] )
+    
+    with pytest.raises( Exception ):
+        rename_sqces_in_json_file( input_file_path = all_interactions_json_file,
+                                   output_file_path = str( tmpdir.join( 'all_interactions_renamed.json' ) ),
+                                   renamed_sqces = { '1': 'VP35' } )